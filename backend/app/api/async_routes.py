@@ -0,0 +1,214 @@
+import json
+import time
+import functools
+from aiohttp import web
+
+from backend.app.workflows.graph import async_app as sigma_agent
+from backend.app.api.routes import _build_feed_inputs, _feed_cache_key
+from backend.app.services.llm_cache import llm_cache
+from backend.app.services.llm_client import retry_after_header
+from backend.app.services.feed_cache import feed_cache
+from backend.app.services.registry import resources
+from backend.app.services.metrics import metrics
+from backend.app.services.capture import traffic_capture
+from backend.app.services.prefetch import encode_cursor, decode_cursor, InvalidCursor
+
+# asyncio server routes (main.py --async). Same contract as the Flask /api
+# endpoints, but every request is a coroutine on one event loop.
+routes = web.RouteTableDef()
+
+
+def _feed_params(request):
+    """(category, query, page) from ?cursor=... if given, else the plain query params."""
+    cursor = request.query.get('cursor')
+    if cursor:
+        return decode_cursor(cursor)
+    return (
+        request.query.get('category', 'all'),
+        request.query.get('query', ''),
+        int(request.query.get('page', 1))
+    )
+
+
+def _is_limit_error(error_msg):
+    return "429" in error_msg or "limit reached" in error_msg.lower()
+
+
+async def _compute_feed(inputs):
+    result = await sigma_agent.ainvoke(inputs)
+    return result.get("feed_items", [])
+
+
+def _with_trace(handler):
+    """With `X-Debug-Trace: 1`, the JSON response also carries this request's timing spans."""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        if request.headers.get('X-Debug-Trace', '').lower() not in ("1", "true"):
+            return await handler(request)
+
+        started = time.perf_counter()
+        with metrics.tracing() as spans:
+            response = await handler(request)
+        if isinstance(response, web.Response) and response.content_type == "application/json":
+            body = json.loads(response.body)
+            if isinstance(body, dict):
+                body["trace"] = {"total_ms": round((time.perf_counter() - started) * 1000, 1), "spans": spans}
+                response.text = json.dumps(body)
+        return response
+    return wrapper
+
+
+def _captured_feed(handler):
+    """With capture on, logs each /api/feed request and its outcome for the replay benchmark."""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        if not traffic_capture.wants("feed"):
+            return await handler(request)
+
+        started = time.perf_counter()
+        response = await handler(request)
+        body = json.loads(response.body) if isinstance(response, web.Response) and response.body else {}
+        traffic_capture.record("feed", dict(request.query), {
+            "status": response.status,
+            "cache": body.get("cache"),
+            "stories": len(body.get("feed") or [])
+        }, ms=(time.perf_counter() - started) * 1000)
+        return response
+    return wrapper
+
+
+@routes.get('/api/metrics')
+async def get_metrics(request):
+    return web.Response(text=metrics.render(), content_type="text/plain", headers={"X-Metrics-Format": "0.0.4"})
+
+
+@routes.get('/api/health')
+async def health_check(request):
+    return web.json_response({
+        "status": "healthy",
+        "service": "Sigma Intelligence Engine",
+        "version": "2.1.0",
+        "server": "asyncio",
+        "feed_cache": feed_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "resources": resources.stats(),
+        "dedup": resources.get("deduper").stats(),
+        "capture": traffic_capture.stats()
+    })
+
+
+@routes.get('/api/feed')
+@_with_trace
+@_captured_feed
+async def get_news_feed(request):
+    try:
+        category, query, page = _feed_params(request)
+    except (InvalidCursor, ValueError):
+        return web.json_response({"error": "Invalid cursor or page.", "code": "BAD_CURSOR"}, status=400)
+
+    try:
+        inputs = _build_feed_inputs(category, query, page)
+        feed, cache_status = await feed_cache.aget_or_compute(
+            _feed_cache_key(inputs), lambda: _compute_feed(inputs)
+        )
+        metrics.cache_events.inc(cache="feed", result=cache_status)
+
+        return web.json_response({
+            "feed": feed,
+            "status": "success",
+            "page": page,
+            "mode": inputs["mode"],
+            "cache": cache_status,
+            "next_cursor": encode_cursor(category, query, page + 1) if feed else None
+        })
+
+    except Exception as e:
+        error_msg = str(e)
+        if _is_limit_error(error_msg):
+            print("🛑 [CRITICAL] All Groq API Keys have reached their limits.")
+            return web.json_response({
+                "error": "Intelligence capacity reached for the day.",
+                "code": "LIMIT_EXHAUSTED"
+            }, status=429, headers={"Retry-After": retry_after_header(e)})
+
+        print(f"❌ [API Error]: {error_msg}")
+        return web.json_response({"error": "Internal synchronization error."}, status=500)
+
+
+@routes.get('/api/feed/stream')
+async def stream_news_feed(request):
+    """NDJSON stream, same events as the Flask /feed/stream."""
+    try:
+        category, query, page = _feed_params(request)
+    except (InvalidCursor, ValueError):
+        return web.json_response({"error": "Invalid cursor or page.", "code": "BAD_CURSOR"}, status=400)
+    inputs = _build_feed_inputs(category, query, page)
+    next_cursor = encode_cursor(category, query, page + 1)
+    cache_key = _feed_cache_key(inputs)
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "application/x-ndjson",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    await response.prepare(request)
+
+    async def send(event):
+        await response.write((json.dumps(event) + "\n").encode("utf-8"))
+
+    await send({"event": "start", "page": page, "mode": inputs["mode"]})
+
+    cached = feed_cache.peek(cache_key)
+    if cached is not None:
+        for idx, story in enumerate(cached):
+            await send({"event": "story", "index": idx, "story": story, "cached": True})
+        await send({"event": "done", "next_cursor": next_cursor if cached else None})
+        return response
+
+    has_stories = False
+    try:
+        async for stream_mode, chunk in sigma_agent.astream(inputs, stream_mode=["updates", "custom"]):
+            if stream_mode == "custom":
+                await send(chunk)
+                continue
+            if "process" in chunk:
+                feed_items = chunk["process"].get("feed_items", [])
+                has_stories = bool(feed_items)
+                feed_cache.put(cache_key, feed_items)
+            for stage, update in chunk.items():
+                count = next((len(v) for v in (update or {}).values() if isinstance(v, list)), 0)
+                await send({"event": "stage", "stage": stage, "count": count})
+        await send({"event": "done", "next_cursor": next_cursor if has_stories else None})
+    except Exception as e:
+        error_msg = str(e)
+        code = "LIMIT_EXHAUSTED" if _is_limit_error(error_msg) else "PIPELINE_ERROR"
+        print(f"❌ [Stream Error]: {error_msg}")
+        event = {"event": "error", "code": code, "error": "Internal synchronization error."}
+        if code == "LIMIT_EXHAUSTED":
+            event["retry_after"] = int(retry_after_header(e))
+        await send(event)
+    return response
+
+
+@routes.post('/api/analyze')
+@_with_trace
+async def run_analysis(request):
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    topic = (data or {}).get("topic", "Global Intelligence")
+
+    try:
+        result = await sigma_agent.ainvoke({
+            "query": topic,
+            "category": "",
+            "page": 1,
+            "mode": "search",
+            "raw_articles": [],
+            "feed_items": []
+        })
+        return web.json_response({"feed": result.get("feed_items", []), "status": "success"})
+    except Exception as e:
+        print(f"❌ [Analysis Error]: {e}")
+        return web.json_response({"error": "Failed to process deep analysis."}, status=500)
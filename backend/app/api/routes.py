@@ -1,7 +1,9 @@
 import sys
 import os
 import json
-from flask import Blueprint, request, jsonify
+import time
+import functools
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 
 # 1. Define the Blueprint
 api_bp = Blueprint('api', __name__)
@@ -15,6 +17,17 @@ try:
 except ImportError:
     from backend.app.workflows.graph import app as sigma_agent
 
+from backend.app.services.llm_cache import llm_cache
+from backend.app.services.llm_client import retry_after_header
+from backend.app.services.jobs import job_manager, JobQueueFull
+from backend.app.services.feed_cache import feed_cache
+from backend.app.services.scheduler import feed_scheduler
+from backend.app.services.registry import resources
+from backend.app.services.metrics import metrics
+from backend.app.services.capture import traffic_capture
+from backend.app.services.prefetch import feed_prefetcher, encode_cursor, decode_cursor, InvalidCursor
+from backend.config import Config
+
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
@@ -22,20 +35,63 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "service": "Sigma Intelligence Engine",
-        "version": "2.1.0"
+        "version": "2.1.0",
+        "feed_cache": feed_cache.stats(),
+        "prefetch": feed_prefetcher.stats(),
+        "scheduler": feed_scheduler.stats(),
+        "llm_cache": llm_cache.stats(),
+        "jobs": job_manager.stats(),
+        "resources": resources.stats(),
+        "dedup": resources.get("deduper").stats(),
+        "capture": traffic_capture.stats()
     })
 
 
-@api_bp.route('/feed', methods=['GET'])
-def get_news_feed():
-    """
-    Primary data endpoint for Categories and Search.
-    Orchestrates the multi-key AI pipeline via LangGraph.
-    """
-    category = request.args.get('category', 'all')
-    query = request.args.get('query', '')
-    page = int(request.args.get('page', 1))
+@api_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of pipeline timings, tokens, scrape volume, caches and key rotations."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def _with_trace(view):
+    """With `X-Debug-Trace: 1`, the JSON response also carries this request's timing spans."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.headers.get('X-Debug-Trace', '').lower() not in ("1", "true"):
+            return view(*args, **kwargs)
 
+        started = time.perf_counter()
+        with metrics.tracing() as spans:
+            response = current_app.make_response(view(*args, **kwargs))
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            body["trace"] = {"total_ms": round((time.perf_counter() - started) * 1000, 1), "spans": spans}
+            response.set_data(json.dumps(body))
+        return response
+    return wrapper
+
+
+def _captured_feed(view):
+    """With capture on, logs each /feed request and its outcome for the replay benchmark."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not traffic_capture.wants("feed"):
+            return view(*args, **kwargs)
+
+        started = time.perf_counter()
+        response = current_app.make_response(view(*args, **kwargs))
+        body = response.get_json(silent=True) or {}
+        traffic_capture.record("feed", request.args.to_dict(), {
+            "status": response.status_code,
+            "cache": body.get("cache"),
+            "stories": len(body.get("feed") or [])
+        }, ms=(time.perf_counter() - started) * 1000)
+        return response
+    return wrapper
+
+
+def _build_feed_inputs(category, query, page):
+    """Turns /feed query params into the LangGraph input state."""
     # Determine mode to prevent NameError
     current_mode = "search" if query else "feed"
 
@@ -54,35 +110,134 @@ def get_news_feed():
 
     print(f"\n📡 [API] Fetching {search_intent} | Mode: {current_mode} | Page: {page}")
 
+    # Use the boosted search_intent to provide the agent with high-relevance data
+    if normalized_category == "india" and not query:
+        return {
+            "query": search_intent, # Boosted keywords
+            "category": "india",
+            "page": page,
+            "mode": "feed",
+            "raw_articles": [],
+            "feed_items": []
+        }
+
+    return {
+        "query": query,
+        "category": category,
+        "page": page,
+        "mode": current_mode,
+        "raw_articles": [],
+        "feed_items": []
+    }
+
+
+def _feed_cache_key(inputs):
+    """(mode, normalized category, query, page) - what makes two feed requests identical."""
+    return (
+        inputs["mode"],
+        (inputs["category"] or "").strip().lower(),
+        (inputs["query"] or "").strip().lower(),
+        inputs["page"]
+    )
+
+
+def _compute_feed(inputs):
+    result = sigma_agent.invoke(inputs)
+    return result.get("feed_items", [])
+
+
+def _scheduled_feed(category):
+    """Precomputes page 1 of a category on the scheduler thread."""
+    return _compute_feed(_build_feed_inputs(category, "", 1))
+
+
+def _feed_params():
+    """(category, query, page) from ?cursor=... if given, else the plain query params."""
+    cursor = request.args.get('cursor')
+    if cursor:
+        return decode_cursor(cursor)
+    return request.args.get('category', 'all'), request.args.get('query', ''), int(request.args.get('page', 1))
+
+
+def _prefetch_next_pages(category, query, page):
+    """Warms pages page+1..page+k into the feed cache for this client."""
+    try:
+        depth = int(request.args.get('prefetch', Config.FEED_PREFETCH_PAGES))
+    except ValueError:
+        depth = Config.FEED_PREFETCH_PAGES
+    depth = max(0, min(depth, Config.FEED_PREFETCH_MAX_PAGES))
+    if not depth:
+        return 0
+
+    pages = []
+    for next_page in range(page + 1, page + 1 + depth):
+        inputs = _build_feed_inputs(category, query, next_page)
+        pages.append((_feed_cache_key(inputs), lambda inputs=inputs: _compute_feed(inputs)))
+
+    # Capped per peer address: a client-supplied id could be rotated to dodge the cap
+    return feed_prefetcher.prefetch(request.remote_addr or "anonymous", pages)
+
+
+@api_bp.route('/feed', methods=['GET'])
+@_with_trace
+@_captured_feed
+def get_news_feed():
+    """
+    Primary data endpoint for Categories and Search.
+    Orchestrates the multi-key AI pipeline via LangGraph.
+    Returns `next_cursor`; the next page(s) are warmed in the background
+    (?prefetch=k, 0 disables) so "load more" is usually a cache hit.
+    """
+    try:
+        category, query, page = _feed_params()
+    except (InvalidCursor, ValueError):
+        return jsonify({"error": "Invalid cursor or page.", "code": "BAD_CURSOR"}), 400
+
+    if not query:
+        feed_scheduler.record_hit(category)
+        if Config.SCHEDULER_ENABLED:
+            # Started by the first request so only the serving process runs it
+            feed_scheduler.start(_scheduled_feed)
+
+            # Precomputed category feed -> plain lookup, no pipeline run
+            stored = feed_scheduler.lookup(category) if page == 1 else None
+            if stored is not None:
+                metrics.cache_events.inc(cache="feed", result="scheduled")
+                feed, computed_at = stored
+                prefetching = _prefetch_next_pages(category, query, page)
+                return jsonify({
+                    "feed": feed,
+                    "status": "success",
+                    "page": page,
+                    "mode": "feed",
+                    "cache": "scheduled",
+                    "computed_at": computed_at,
+                    "next_cursor": encode_cursor(category, query, page + 1),
+                    "prefetching": prefetching
+                })
+
     try:
-        # Use the boosted search_intent to provide the agent with high-relevance data
-        if normalized_category == "india" and not query:
-            inputs = {
-                "query": search_intent, # Boosted keywords
-                "category": "india",
-                "page": page,
-                "mode": "feed",
-                "raw_articles": [],
-                "feed_items": []
-            }
-        else:
-            inputs = {
-                "query": query,
-                "category": category,
-                "page": page,
-                "mode": current_mode,
-                "raw_articles": [],
-                "feed_items": []
-            }
-
-        # The agent nodes (Extraction/Compression) Sam logic (PRESERVED)
-        result = sigma_agent.invoke(inputs)
+        inputs = _build_feed_inputs(category, query, page)
+
+        # The agent nodes (Extraction/Compression) Sam logic (PRESERVED),
+        # behind the coalescing stale-while-revalidate cache
+        feed, cache_status = feed_cache.get_or_compute(
+            _feed_cache_key(inputs), lambda: _compute_feed(inputs)
+        )
+        metrics.cache_events.inc(cache="feed", result=cache_status)
+
+        # An empty page means we ran past the end of the results
+        next_cursor = encode_cursor(category, query, page + 1) if feed else None
+        prefetching = _prefetch_next_pages(category, query, page) if feed else 0
 
         return jsonify({
-            "feed": result.get("feed_items", []),
+            "feed": feed,
             "status": "success",
             "page": page,
-            "mode": inputs["mode"]
+            "mode": inputs["mode"],
+            "cache": cache_status,
+            "next_cursor": next_cursor,
+            "prefetching": prefetching
         })
 
     except Exception as e:
@@ -92,33 +247,137 @@ def get_news_feed():
             return jsonify({
                 "error": "Intelligence capacity reached for the day.",
                 "code": "LIMIT_EXHAUSTED"
-            }), 429
+            }), 429, {"Retry-After": retry_after_header(e)}
 
         print(f"❌ [API Error]: {error_msg}")
         return jsonify({"error": "Internal synchronization error."}), 500
 
 
+@api_bp.route('/feed/stream', methods=['GET'])
+def stream_news_feed():
+    """
+    Streaming variant of /feed (NDJSON, one event per line).
+    Emits a 'stage' event as each pipeline node finishes and a 'story' event
+    the moment each story is summarized, so the first card renders early.
+    """
+    try:
+        category, query, page = _feed_params()
+    except (InvalidCursor, ValueError):
+        return jsonify({"error": "Invalid cursor or page.", "code": "BAD_CURSOR"}), 400
+    inputs = _build_feed_inputs(category, query, page)
+    next_cursor = encode_cursor(category, query, page + 1)
+
+    def line(event):
+        return json.dumps(event) + "\n"
+
+    cache_key = _feed_cache_key(inputs)
+
+    def generate():
+        yield line({"event": "start", "page": page, "mode": inputs["mode"]})
+
+        # A fresh cached feed streams out immediately
+        cached = feed_cache.peek(cache_key)
+        if cached is not None:
+            for idx, story in enumerate(cached):
+                yield line({"event": "story", "index": idx, "story": story, "cached": True})
+            yield line({"event": "done", "next_cursor": next_cursor if cached else None})
+            return
+
+        has_stories = False
+        try:
+            for stream_mode, chunk in sigma_agent.stream(inputs, stream_mode=["updates", "custom"]):
+                if stream_mode == "custom":
+                    yield line(chunk)
+                    continue
+                if "process" in chunk:
+                    feed_items = chunk["process"].get("feed_items", [])
+                    has_stories = bool(feed_items)
+                    feed_cache.put(cache_key, feed_items)
+                # 'updates' chunks look like {node_name: {state_key: [...]}}
+                for stage, update in chunk.items():
+                    count = next((len(v) for v in (update or {}).values() if isinstance(v, list)), 0)
+                    yield line({"event": "stage", "stage": stage, "count": count})
+            yield line({"event": "done", "next_cursor": next_cursor if has_stories else None})
+        except Exception as e:
+            error_msg = str(e)
+            code = "LIMIT_EXHAUSTED" if "429" in error_msg or "limit reached" in error_msg.lower() else "PIPELINE_ERROR"
+            print(f"❌ [Stream Error]: {error_msg}")
+            event = {"event": "error", "code": code, "error": "Internal synchronization error."}
+            if code == "LIMIT_EXHAUSTED":
+                event["retry_after"] = int(retry_after_header(e))
+            yield line(event)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _run_analysis(topic):
+    inputs = {
+        "query": topic,
+        "category": "",
+        "page": 1,
+        "mode": "search",
+        "raw_articles": [],
+        "feed_items": []
+    }
+    result = sigma_agent.invoke(inputs)
+    return {"feed": result.get("feed_items", []), "status": "success"}
+
+
 @api_bp.route('/analyze', methods=['POST'])
+@_with_trace
 def run_analysis():
-    """Legacy endpoint for backward compatibility (PRESERVED)."""
-    data = request.json
+    """
+    Legacy endpoint for backward compatibility (PRESERVED).
+    Send {"async": true} (or ?async=1) to get a job ID back immediately instead
+    of holding this worker thread for the whole pipeline.
+    """
+    data = request.json or {}
     topic = data.get("topic", "Global Intelligence")
+    run_async = data.get("async") or request.args.get("async") in ("1", "true")
 
-    try:
-        inputs = {
-            "query": topic,
-            "category": "",
-            "page": 1,
-            "mode": "search",
-            "raw_articles": [],
-            "feed_items": []
-        }
-        result = sigma_agent.invoke(inputs)
+    if run_async:
+        try:
+            # Same topic while a run is in flight -> same job
+            job, coalesced = job_manager.submit(
+                ("analyze", topic.strip().lower()), lambda: _run_analysis(topic)
+            )
+        except JobQueueFull:
+            return jsonify({"error": "Analysis queue is full. Retry shortly.", "code": "QUEUE_FULL"}), 503
 
         return jsonify({
-            "feed": result.get("feed_items", []),
-            "status": "success"
-        })
+            "job_id": job.job_id,
+            "status": job.status,
+            "coalesced": coalesced,
+            "status_url": f"/api/jobs/{job.job_id}",
+            "result_url": f"/api/jobs/{job.job_id}/result"
+        }), 202
+
+    try:
+        return jsonify(_run_analysis(topic))
     except Exception as e:
         print(f"❌ [Analysis Error]: {e}")
-        return jsonify({"error": "Failed to process deep analysis."}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to process deep analysis."}), 500
+
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    return jsonify(job)
+
+
+@api_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    if job["status"] == "failed":
+        return jsonify({"error": "Failed to process deep analysis.", "status": "failed"}), 500
+    if job["status"] != "done":
+        return jsonify({"status": job["status"]}), 202
+    return jsonify(job_manager.result(job_id))
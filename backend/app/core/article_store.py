@@ -0,0 +1,137 @@
+from array import array
+
+FIELDS = ("title", "url", "source", "image", "content", "description", "story_id")
+
+
+class ArticleRef:
+    """
+    One row of an ArticleBatch. Reads like the old article dict
+    (article["title"], article.get("content", "")) but holds no text itself.
+    """
+    __slots__ = ("batch", "id")
+
+    def __init__(self, batch, row):
+        self.batch = batch
+        self.id = row
+
+    def __getitem__(self, name):
+        if name not in FIELDS:
+            raise KeyError(name)
+        return self.batch.field(self.id, name)
+
+    def get(self, name, default=None):
+        # Like dict.get on the old article dicts: an unset field (e.g. story_id) reads as default
+        value = self.batch.field(self.id, name) if name in FIELDS else None
+        return default if value is None else value
+
+    def content_length(self):
+        return self.batch.content_length(self.id)
+
+    def __repr__(self):
+        return f"ArticleRef({self.id}, {self.batch.field(self.id, 'title')!r})"
+
+
+class ArticleBatch:
+    """
+    Columnar store for the articles of one pipeline run.
+
+    Short fields are plain columns, source names are interned into a small
+    table, and every scraped body lives in one UTF-8 buffer addressed by
+    offsets. Graph state carries row ids into the batch, so nodes share the
+    same text instead of passing (and copying) per-article dicts.
+    """
+
+    def __init__(self):
+        self._titles = []
+        self._urls = []
+        self._images = []
+        self._descriptions = []
+        self._source_names = []
+        self._source_index = {}
+        self._sources = array("H")      # row -> index into _source_names
+        self._content = bytearray()
+        self._offsets = array("Q", [0])  # content of row i is _content[_offsets[i]:_offsets[i + 1]]
+        self._content_chars = array("I")
+        self._story_ids = {}             # row -> story id (incremental clustering only)
+
+    def append(self, title, url, source, image, content, description):
+        """Adds one article and returns its row id."""
+        self._titles.append(title)
+        self._urls.append(url)
+        self._images.append(image)
+        self._descriptions.append(description)
+        self._sources.append(self._intern_source(source))
+
+        encoded = (content or "").encode("utf-8")
+        self._content += encoded
+        self._offsets.append(len(self._content))
+        self._content_chars.append(len(content or ""))
+        return len(self._titles) - 1
+
+    def _intern_source(self, name):
+        index = self._source_index.get(name)
+        if index is None:
+            index = self._source_index[name] = len(self._source_names)
+            self._source_names.append(name)
+        return index
+
+    def __len__(self):
+        return len(self._titles)
+
+    def __getitem__(self, row):
+        if not 0 <= row < len(self._titles):
+            raise IndexError(row)
+        return ArticleRef(self, row)
+
+    def ids(self):
+        return list(range(len(self._titles)))
+
+    def refs(self, rows):
+        return [ArticleRef(self, row) for row in rows]
+
+    def content(self, row, max_chars=None):
+        """
+        Decoded body text. With max_chars only the opening is decoded
+        (UTF-8 takes at most 4 bytes per character), not the whole page.
+        """
+        start, end = self._offsets[row], self._offsets[row + 1]
+        if max_chars is None:
+            return self._content[start:end].decode("utf-8")
+        head = self._content[start:min(end, start + 4 * max_chars)]
+        return head.decode("utf-8", errors="ignore")[:max_chars]
+
+    def contents(self, rows):
+        """Decoded bodies for several rows, each distinct row decoded once."""
+        decoded = {}
+        for row in rows:
+            if row not in decoded:
+                decoded[row] = self.content(row)
+        return [decoded[row] for row in rows]
+
+    def content_length(self, row):
+        """Length of the content in characters, without decoding it."""
+        return self._content_chars[row]
+
+    def set_story_id(self, row, story_id):
+        self._story_ids[row] = story_id
+
+    def field(self, row, name):
+        if name == "content":
+            return self.content(row)
+        if name == "title":
+            return self._titles[row]
+        if name == "url":
+            return self._urls[row]
+        if name == "source":
+            return self._source_names[self._sources[row]]
+        if name == "image":
+            return self._images[row]
+        if name == "description":
+            return self._descriptions[row]
+        if name == "story_id":
+            return self._story_ids.get(row)
+        raise KeyError(name)
+
+    def nbytes(self):
+        """Size of the content buffer and fixed-width columns (strings in the list columns not included)."""
+        return len(self._content) + sum(a.itemsize * len(a) for a in (self._sources, self._offsets, self._content_chars))
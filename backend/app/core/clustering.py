@@ -1,5 +1,7 @@
 import sys
 import os
+import heapq
+import threading
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import AgglomerativeClustering
@@ -8,14 +10,31 @@ from sklearn.cluster import AgglomerativeClustering
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
 
+def build_vectorizer():
+    """TF-IDF settings shared by clustering and the content reducer."""
+    return TfidfVectorizer(stop_words='english', ngram_range=(1, 2))
+
+
+def _content_length(article):
+    # Batch rows (ArticleRef) know their length without decoding the text
+    if hasattr(article, "content_length"):
+        return article.content_length()
+    return len(article.get('content', ''))
+
+
 class NewsClustertizer:
-    def __init__(self, similarity_threshold=0.45):
+    def __init__(self, similarity_threshold=0.45, sparse=True):
         """
         threshold: How similar articles must be to group them (0 to 1).
         0.45 is usually the sweet spot for news headlines.
+        sparse: Cluster on the sparse similarity graph (memory ~ nnz) instead of
+        densifying the TF-IDF matrix for AgglomerativeClustering.
         """
-        self.vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2))
+        self.vectorizer = build_vectorizer()
+        # One clusterer is shared process-wide; fitting mutates the vectorizer
+        self._fit_lock = threading.Lock()
         self.threshold = similarity_threshold
+        self.sparse = sparse
         print("✅ [Clustering] Initialized (Local CPU mode - No API Keys needed)")
 
     def group_articles(self, articles):
@@ -30,23 +49,26 @@ class NewsClustertizer:
 
         # 2. Vectorize the text using TF-IDF (Term Frequency - Inverse Document Frequency)
         try:
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
+            with self._fit_lock:
+                tfidf_matrix = self.vectorizer.fit_transform(texts)
         except ValueError:
             # Handle edge case where texts might be empty or stopwords only
             return [[a] for a in articles]
 
-        # 3. Use Agglomerative Clustering
-        # We use distance_threshold instead of n_clusters so the AI decides how many groups exist.
-        clustering_model = AgglomerativeClustering(
-            n_clusters=None,
-            distance_threshold=1 - self.threshold,  # Distance = 1 - Similarity
-            metric='cosine',
-            linkage='average'
-        )
-
-        # 4. Perform the fit
+        # 3. Use Agglomerative Clustering (average linkage on cosine similarity)
+        # We use a distance threshold instead of n_clusters so the AI decides how many groups exist.
         try:
-            labels = clustering_model.fit_predict(tfidf_matrix.toarray())
+            if self.sparse:
+                labels = self._sparse_average_linkage(tfidf_matrix)
+            else:
+                clustering_model = AgglomerativeClustering(
+                    n_clusters=None,
+                    distance_threshold=1 - self.threshold,  # Distance = 1 - Similarity
+                    metric='cosine',
+                    linkage='average'
+                )
+                # 4. Perform the fit
+                labels = clustering_model.fit_predict(tfidf_matrix.toarray())
         except Exception as e:
             print(f"⚠️ Clustering calculation failed: {e}. Returning raw list.")
             return [[a] for a in articles]
@@ -61,6 +83,60 @@ class NewsClustertizer:
         # Return as a list of groups (e.g., [[story1_v1, story1_v2], [story2]])
         return list(clusters.values())
 
+    def _sparse_average_linkage(self, tfidf_matrix):
+        """
+        Average-linkage (UPGMA) clustering that never densifies the matrix.
+        TF-IDF rows are already L2-normalized, so X @ X.T is the cosine similarity.
+        Pairs with zero similarity can never average above the threshold, so only
+        the non-zero entries of that sparse product are tracked.
+        Produces the same groups as AgglomerativeClustering(metric='cosine',
+        linkage='average', distance_threshold=1 - threshold).
+        """
+        n = tfidf_matrix.shape[0]
+        similarity = (tfidf_matrix @ tfidf_matrix.T).tocoo()
+
+        # links[a][b] = sum of pairwise similarities between clusters a and b
+        links = [dict() for _ in range(n)]
+        for i, j, value in zip(similarity.row, similarity.col, similarity.data):
+            if i < j and value > 0:
+                links[i][j] = links[j][i] = float(value)
+
+        sizes = [1] * n
+        members = [[i] for i in range(n)]
+        heap = [(-value, i, j) for i in range(n) for j, value in links[i].items()
+                if i < j and value > self.threshold]
+        heapq.heapify(heap)
+
+        # Always merge the most similar pair of clusters, like the dense algorithm
+        while heap:
+            neg_avg, a, b = heapq.heappop(heap)
+            if members[a] is None or members[b] is None:
+                continue
+            if links[a].get(b, 0.0) / (sizes[a] * sizes[b]) != -neg_avg:
+                continue  # Stale entry: one of the clusters grew since it was pushed
+
+            # Merge b into a and fold b's similarity sums into a's
+            members[a].extend(members[b])
+            sizes[a] += sizes[b]
+            del links[a][b]
+            for c, value in links[b].items():
+                if c == a:
+                    continue
+                del links[c][b]
+                links[a][c] = links[c][a] = links[a].get(c, 0.0) + value
+            members[b], links[b] = None, None
+
+            for c, value in links[a].items():
+                avg = value / (sizes[a] * sizes[c])
+                if avg > self.threshold:
+                    heapq.heappush(heap, (-avg, min(a, c), max(a, c)))
+
+        labels = np.empty(n, dtype=int)
+        for root, group in enumerate(members):
+            if group is not None:
+                labels[group] = root
+        return labels
+
     def get_lead_articles(self, clusters):
         """
         Picks the best article from each cluster to show on the dashboard.
@@ -69,7 +145,7 @@ class NewsClustertizer:
         for group in clusters:
             # Logic: Prefer the article with the longest content (likely most informative)
             # If content length is missing, fallback to the first item.
-            best_article = max(group, key=lambda x: len(x.get('content', '')))
+            best_article = max(group, key=_content_length)
             lead_items.append(best_article)
 
         return lead_items
\ No newline at end of file
@@ -1,24 +1,23 @@
-from groq import Groq
 from backend.config import Config
-# IMPORT THE SHARED MANAGER (Crucial for sync)
-from backend.app.services.key_manager import groq_keys
+# SHARED GROQ ACCESS (key scheduling + memoization)
+from backend.app.services.llm_client import chat_completion, achat_completion, GroqCapacityError
+from backend.app.services.llm_cache import llm_cache
+from backend.app.services.capture import traffic_capture
 
 
-class NewsCompressor:
-    def __init__(self):
-        # Initialize with the global active key from the shared manager
-        self.client = Groq(api_key=groq_keys.get_active_key())
-
-    def generate_summary(self, title, facts):
-        if not facts:
-            return "Intelligence gathering in progress. Detailed facts are currently unavailable for this specific report."
+NO_FACTS_SUMMARY = "Intelligence gathering in progress. Detailed facts are currently unavailable for this specific report."
+CAPACITY_SUMMARY = "Summary unavailable: intelligence capacity is temporarily exhausted."
+ERROR_SUMMARY = "Summary generation encountered a temporary synchronization error."
+# Stand-ins for a summary that failed for a passing reason (quota, network); a feed
+# containing one is served but not cached. NO_FACTS_SUMMARY is a final answer.
+TRANSIENT_SUMMARIES = frozenset({CAPACITY_SUMMARY, ERROR_SUMMARY})
 
-        # Ensure the client always has the fresh key (in case Extraction rotated it)
-        self.client = Groq(api_key=groq_keys.get_active_key())
 
-        try:
-            # --- YOUR EXACT PROMPT (UNCHANGED) ---
-            prompt = f"""
+class NewsCompressor:
+    @staticmethod
+    def _messages(title, facts):
+        # --- YOUR EXACT PROMPT (UNCHANGED) ---
+        prompt = f"""
             Headline: {title}
             Facts: {str(facts)}
 
@@ -30,22 +29,74 @@ class NewsCompressor:
             4. Focus: Stay strictly on the headline context.
             """
 
-            res = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=Config.MODEL_SUMMARY
-            )
-            return res.choices[0].message.content.strip()
+        return [{"role": "user", "content": prompt}]
+
+    @staticmethod
+    def _captured(messages):
+        # Opt-in request/response capture of the Groq call (see TrafficCapture.exchange)
+        return traffic_capture.exchange("llm", component="summary", model=Config.MODEL_SUMMARY, messages=messages)
+
+    def generate_summary(self, title, facts):
+        if not facts:
+            return NO_FACTS_SUMMARY
+
+        try:
+            messages = self._messages(title, facts)
 
+            # Same headline + facts -> reuse the stored summary
+            cache_key = llm_cache.make_key(Config.MODEL_SUMMARY, messages)
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            # Scheduler picks the key with the most headroom and parks 429'd ones
+            with self._captured(messages) as exchange:
+                res = chat_completion(
+                    messages=messages,
+                    model=Config.MODEL_SUMMARY
+                )
+                exchange["response"] = res.choices[0].message.content
+            summary = res.choices[0].message.content.strip()
+            llm_cache.put(cache_key, summary)
+            return summary
+
+        except GroqCapacityError:
+            raise  # The process node shows a capacity placeholder for this story
         except Exception as e:
-            # --- RATE LIMIT HANDLING ---
-            if "429" in str(e):
-                print(f"⚠️ Summary Limit Hit! Requesting Global Rotation...")
-                # Rotate the key globally (Extraction will see this change too)
-                groq_keys.switch_key()
-
-                # Recursive retry with the new key
-                return self.generate_summary(title, facts)
-
-            # --- STANDARD ERROR HANDLING ---
-            print(f"❌ Summary Error: {e}")
-            return "Summary generation encountered a temporary synchronization error."
\ No newline at end of file
+            return self._report_error(e)
+
+    async def agenerate_summary(self, title, facts):
+        """ Async generate_summary (same prompt, cache and fallbacks). """
+        if not facts:
+            return NO_FACTS_SUMMARY
+
+        try:
+            messages = self._messages(title, facts)
+            cache_key = llm_cache.make_key(Config.MODEL_SUMMARY, messages)
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            with self._captured(messages) as exchange:
+                res = await achat_completion(messages=messages, model=Config.MODEL_SUMMARY)
+                exchange["response"] = res.choices[0].message.content
+            summary = res.choices[0].message.content.strip()
+            llm_cache.put(cache_key, summary)
+            return summary
+
+        except GroqCapacityError:
+            raise  # The process node shows a capacity placeholder for this story
+        except Exception as e:
+            return self._report_error(e)
+
+    @staticmethod
+    def _report_error(e):
+        # --- RATE LIMIT HANDLING ---
+        # Retries across keys already happened inside the scheduler
+        if "429" in str(e):
+            print(f"⚠️ Summary Limit Hit! All keys are parked.")
+            return CAPACITY_SUMMARY
+
+        # --- STANDARD ERROR HANDLING ---
+        print(f"❌ Summary Error: {e}")
+        return ERROR_SUMMARY
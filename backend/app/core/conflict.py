@@ -1,6 +1,8 @@
 import sys
 import os
 from difflib import SequenceMatcher
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 
 # Fix path to ensure imports work correctly if run directly
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
@@ -87,6 +89,113 @@ class ConflictResolver:
 
         return {"agreements": agreements, "unique_facts": unique_to_a}
 
+    @staticmethod
+    def _fact_sentence(fact):
+        return f"{fact.get('actor', '')} {fact.get('action', '')} {fact.get('object', '')}".strip()
+
+    def score_matrix(self, sentences, refine=False):
+        """
+        Pairwise scores for a batch of fact sentences, all computed in one pass:
+        - Word overlap: Jaccard from a sparse binary bag-of-words matrix
+        - Character match: char 3-gram TF-IDF cosine (a cheap stand-in for SequenceMatcher)
+        refine=True re-checks near-threshold pairs with SequenceMatcher.
+        """
+        n = len(sentences)
+        try:
+            # Same tokenization as calculate_overlap: lower().split()
+            words = CountVectorizer(binary=True, tokenizer=str.split, token_pattern=None).fit_transform(sentences)
+            chars = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 3)).fit_transform(sentences)
+        except ValueError:
+            return np.zeros((n, n))
+
+        intersection = (words @ words.T).toarray().astype(float)
+        lengths = np.asarray(words.sum(axis=1)).ravel()
+        union = lengths[:, None] + lengths[None, :] - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+        char_sim = (chars @ chars.T).toarray()
+        scores = np.maximum(jaccard, char_sim)
+
+        if refine:
+            # Only pairs close enough that the exact ratio could still cross the threshold
+            band = np.triu((scores >= self.text_threshold - 0.15) & (scores < self.text_threshold), 1)
+            for i, j in zip(*np.nonzero(band)):
+                exact = self.calculate_similarity(sentences[i], sentences[j])
+                scores[i, j] = scores[j, i] = max(scores[i, j], exact)
+
+        return scores
+
+    def resolve_cluster(self, fact_lists, refine=False):
+        """
+        Batch version of find_agreements for a whole story cluster.
+        fact_lists: one list of facts per source.
+        Facts are greedily matched across sources (best score first, at most one
+        fact per source in each group), giving one agreement table for the cluster.
+        """
+        # 1. Flatten and build every sentence once
+        sentences, owners, originals = [], [], []
+        for source_idx, facts in enumerate(fact_lists):
+            for fact in facts or []:
+                sentence = self._fact_sentence(fact)
+                if sentence:
+                    sentences.append(sentence)
+                    owners.append(source_idx)
+                    originals.append(fact)
+
+        if not sentences:
+            return {"agreements": [], "unique_facts": []}
+
+        # 2. Score all pairs at once; facts from the same source never agree with each other
+        owners_arr = np.array(owners)
+        scores = self.score_matrix(sentences, refine=refine)
+        scores[owners_arr[:, None] == owners_arr[None, :]] = 0.0
+
+        # 3. Greedy assignment over the score matrix
+        n = len(sentences)
+        group_of = list(range(n))
+        groups = {i: [i] for i in range(n)}
+        group_sources = {i: {owners[i]} for i in range(n)}
+        group_scores = {i: [] for i in range(n)}
+
+        rows, cols = np.nonzero(np.triu(scores >= self.text_threshold, 1))
+        for idx in np.argsort(-scores[rows, cols], kind="stable"):
+            i, j = rows[idx], cols[idx]
+            gi, gj = group_of[i], group_of[j]
+            if gi == gj or group_sources[gi] & group_sources[gj]:
+                continue
+            if gj < gi:
+                gi, gj = gj, gi
+            for member in groups[gj]:
+                group_of[member] = gi
+            groups[gi].extend(groups.pop(gj))
+            group_sources[gi] |= group_sources.pop(gj)
+            group_scores[gi].extend(group_scores.pop(gj))
+            group_scores[gi].append(float(scores[i, j]))
+
+        # 4. Build the agreement table (groups ordered by their first fact)
+        agreements, unique_facts = [], []
+        for gid in sorted(groups):
+            members = sorted(groups[gid])
+            lead = members[0]
+            if len(members) > 1:
+                agreements.append({
+                    "fact": sentences[lead],
+                    "confidence": "High (Multi-Source Agreement)",
+                    "score": f"{np.mean(group_scores[gid]):.2f}",
+                    "support": len(members),
+                    "sources": sorted(owners[m] for m in members),
+                    "facts": [originals[m] for m in members]
+                })
+            else:
+                unique_facts.append({
+                    "fact": sentences[lead],
+                    "confidence": "Medium (Single Source)",
+                    "source": owners[lead],
+                    "facts": [originals[lead]]
+                })
+
+        return {"agreements": agreements, "unique_facts": unique_facts}
+
 
 # --- Quick Test Block (Runs only if executed directly) ---
 if __name__ == "__main__":
@@ -110,4 +219,14 @@ if __name__ == "__main__":
 
     print("\n⚠️ UNIQUE FACTS:")
     for item in result["unique_facts"]:
-        print(f" - {item['fact']}")
\ No newline at end of file
+        print(f" - {item['fact']}")
+
+    # Whole-cluster batch mode
+    source_ap = [{"actor": "SpaceX", "action": "launched", "object": "its Starship rocket"}]
+    table = resolver.resolve_cluster([source_cnn, source_bbc, source_ap], refine=True)
+
+    print("\n📊 CLUSTER AGREEMENT TABLE:")
+    for item in table["agreements"]:
+        print(f" - {item['fact']} (Sources: {item['sources']}, Score: {item['score']})")
+    for item in table["unique_facts"]:
+        print(f" - {item['fact']} (Only source {item['source']})")
\ No newline at end of file
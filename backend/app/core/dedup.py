@@ -0,0 +1,236 @@
+import re
+import threading
+import time
+from collections import deque
+import numpy as np
+from backend.config import Config
+
+_WORDS = re.compile(r"\w+")
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_MIN_CONTENT = 150       # Shorter bodies are API fallback text, not a scrape
+_CONTENT_WORDS = 400     # Only the opening of a body is fingerprinted
+_CONTENT_CHARS = _CONTENT_WORDS * 16  # Decoded to find those words (long words, runs of whitespace)
+
+
+def shingles(text, size):
+    """Set of lower-cased word n-grams (the whole text if it is shorter than one)."""
+    words = _WORDS.findall((text or "").lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def headline_text(article):
+    """Title + description of a NewsAPI article, minus the ' - Outlet' suffix copies differ by."""
+    title = article.get("title") or ""
+    source = (article.get("source") or {}).get("name") or ""
+    if source and title.endswith(f" - {source}"):
+        title = title[:-len(source) - 3]
+    return f"{title} {article.get('description') or ''}"
+
+
+class MinHashIndex:
+    """
+    MinHash signatures with banded LSH lookup. Entries older than `ttl`
+    seconds, or beyond `max_entries`, are evicted oldest first.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=None, ttl=None, max_entries=None, seed=1):
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        rng = np.random.RandomState(seed)
+        # h(x) = (a*x + b) mod p; a, x < 2^32 so a*x + b stays inside uint64
+        self._a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+        self._entries = {}      # entry id -> (signature, value, created)
+        self._buckets = {}      # (band, band bytes) -> set of entry ids
+        self._order = deque()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def signature(self, items):
+        if not items:
+            return None
+        hashes = np.fromiter((hash(item) & _MAX_HASH for item in items), dtype=np.uint64, count=len(items))
+        return ((np.outer(hashes, self._a) + self._b) % _MERSENNE).min(axis=0)
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def query(self, signature):
+        """(value, estimated Jaccard) of the closest entry at or above the threshold, else None."""
+        if signature is None:
+            return None
+        with self._lock:
+            self._expire()
+            return self._best(signature)
+
+    def add(self, signature, value):
+        if signature is None:
+            return
+        with self._lock:
+            self._insert(signature, value)
+
+    def add_if_absent(self, signature, value):
+        """
+        Adds the entry unless a near copy is already indexed, as one atomic step
+        (query() then add() lets two threads index the same item).
+        Returns True if nothing matched.
+        """
+        if signature is None:
+            return True
+        with self._lock:
+            self._expire()
+            if self._best(signature) is not None:
+                return False
+            self._insert(signature, value)
+            return True
+
+    def _best(self, signature):
+        # Caller holds the lock
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        best = None
+        for entry_id in candidates:
+            other, value, _ = self._entries[entry_id]
+            similarity = float(np.mean(signature == other))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (value, similarity)
+        return best
+
+    def _insert(self, signature, value):
+        # Caller holds the lock
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (signature, value, time.time())
+        self._order.append(entry_id)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(entry_id)
+        self._expire()
+
+    def _expire(self):
+        # Caller holds the lock
+        cutoff = time.time() - self.ttl if self.ttl is not None else None
+        while self._order:
+            entry_id = self._order[0]
+            expired = cutoff is not None and self._entries[entry_id][2] < cutoff
+            if not expired and (self.max_entries is None or len(self._order) <= self.max_entries):
+                break
+            self._order.popleft()
+            signature = self._entries.pop(entry_id)[0]
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(entry_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class NearDuplicateFilter:
+    """
+    Drops syndicated copies before they cost a scrape, a clustering slot or an
+    LLM call. Copies inside one request are set aside (first one wins) and only
+    scraped if the first one's page comes back too short (paywall, block page).
+    A copy of a headline scraped by a recent request (DEDUP_TTL) is scraped from
+    the original's URL, which is normally a scrape-cache hit and yields the same
+    text (and so the same cached extraction); its own page is the fallback.
+    """
+
+    def __init__(self):
+        self.headlines = MinHashIndex(ttl=Config.DEDUP_TTL, max_entries=Config.DEDUP_MAX_ENTRIES)
+        self._lock = threading.Lock()
+        self.dropped_headlines = 0
+        self.dropped_contents = 0
+        self.redirected = 0
+        self.fallbacks = 0
+
+    def prefilter(self, articles):
+        """
+        Before scraping: NewsAPI articles -> (unique articles, URL to scrape for
+        each, fallback copies for each, best first).
+        """
+        local = MinHashIndex(threshold=self.headlines.threshold)
+        kept, scrape_urls, copies = [], [], []
+        for art in articles:
+            signature = local.signature(shingles(headline_text(art), 2))
+            match = local.query(signature)
+            if match is not None:
+                copies[match[0]].append(art)
+                continue
+            local.add(signature, len(kept))
+
+            seen = self.headlines.query(signature)
+            redirect = seen is not None and seen[0] != art.get("url")
+            kept.append(art)
+            scrape_urls.append(seen[0] if redirect else art.get("url"))
+            copies.append([art] if redirect else [])
+
+        redirected = sum(1 for art, url in zip(kept, scrape_urls) if url != art.get("url"))
+        with self._lock:
+            self.dropped_headlines += len(articles) - len(kept)
+            self.redirected += redirected
+        if len(kept) < len(articles) or redirected:
+            print(f"   🪞 [Dedup] {len(articles) - len(kept)} syndicated copies skipped, "
+                  f"{redirected} served from an earlier scrape.")
+        return kept, scrape_urls, copies
+
+    def next_copies(self, articles, scrape_urls, copies, scraped):
+        """
+        After a scrape: every article whose text came back too short and that
+        still has a copy left is switched (in place) to that copy.
+        Returns the positions to scrape again.
+        """
+        retry = []
+        for pos, text in enumerate(scraped):
+            if len(text or "") < _MIN_CONTENT and copies[pos]:
+                copy = copies[pos].pop(0)
+                articles[pos], scrape_urls[pos] = copy, copy.get("url")
+                retry.append(pos)
+        if retry:
+            with self._lock:
+                self.fallbacks += len(retry)
+            print(f"   🪞 [Dedup] {len(retry)} short scrapes retried on another copy.")
+        return retry
+
+    def remember(self, articles, scrape_urls, scraped):
+        """After scraping: indexes headlines whose own page scraped cleanly, for later requests."""
+        for art, url, text in zip(articles, scrape_urls, scraped):
+            if url == art.get("url") and len(text or "") >= _MIN_CONTENT:
+                self.headlines.add_if_absent(self.headlines.signature(shingles(headline_text(art), 2)), url)
+
+    def unique_rows(self, batch, rows):
+        """Before clustering: drops rows whose body is a near copy of an earlier row's."""
+        local = MinHashIndex(threshold=self.headlines.threshold)
+        kept = []
+        for row in rows:
+            if batch.content_length(row) < _MIN_CONTENT:
+                kept.append(row)
+                continue
+            # Only the opening is fingerprinted, so only the opening is decoded
+            words = " ".join(batch.content(row, _CONTENT_CHARS).split()[:_CONTENT_WORDS])
+            if local.add_if_absent(local.signature(shingles(words, 3)), row):
+                kept.append(row)
+
+        if len(kept) < len(rows):
+            with self._lock:
+                self.dropped_contents += len(rows) - len(kept)
+            print(f"   🪞 [Dedup] {len(rows) - len(kept)} near-identical articles dropped before clustering.")
+        return kept
+
+    def stats(self):
+        with self._lock:
+            return {
+                "indexed_headlines": len(self.headlines),
+                "dropped_headlines": self.dropped_headlines,
+                "dropped_contents": self.dropped_contents,
+                "redirected": self.redirected,
+                "fallbacks": self.fallbacks
+            }
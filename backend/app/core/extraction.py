@@ -1,76 +1,345 @@
+import asyncio
+import contextvars
 import json
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor, Future
 from backend.config import Config
-# IMPORT THE SHARED MANAGER (Crucial for sync)
+# SHARED GROQ ACCESS (key scheduling + memoization)
+from backend.app.services.llm_client import chat_completion, achat_completion, estimate_prompt_tokens, GroqCapacityError
+from backend.app.services.llm_cache import llm_cache
 from backend.app.services.key_manager import groq_keys
+from backend.app.services.capture import traffic_capture
+
+MODEL = "llama-3.1-8b-instant"
+TEMPERATURE = 0.1  # Low temperature for high precision
+FACT_TOKENS = 120  # Reply budget per article (2 short facts + JSON overhead)
+
+
+def _topic_constraint(target_topic, empty_reply):
+    # INTELLIGENCE INJECTION: This prevents "Cricket" searches from returning "Nintendo" news
+    if target_topic and target_topic.lower() != "all":
+        return (
+            f"CRITICAL: First, verify if this text is related to '{target_topic}'. "
+            f"If the text is UNRELATED to '{target_topic}', return {empty_reply}. "
+        )
+    return ""
+
+
+def _single_messages(article_text, target_topic):
+    topic_constraint = _topic_constraint(target_topic, '{"facts": []}')
+    system_prompt = (
+        "You are a precision neural news extraction engine. Output ONLY valid JSON. "
+        f"{topic_constraint}"
+        "Extract exactly 2 key facts from the provided text. Use this exact flat structure:\n"
+        "{\"facts\": [{\"actor\": \"...\", \"action\": \"...\", \"object\": \"...\"}]}"
+    )
+
+    user_content = (
+        f"Extract 2 key facts from this article: '''{article_text[:3000]}'''\n"
+        "Requirements: Output valid JSON, no extra fields, 2 facts only. "
+        "If the text is irrelevant to the search intent, return an empty facts list."
+    )
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+
+
+def _batch_messages(indexed_texts, target_topic):
+    """One prompt for several articles; the reply carries each article's index."""
+    topic_constraint = _topic_constraint(target_topic, "an empty facts list for that article")
+    system_prompt = (
+        "You are a precision neural news extraction engine. Output ONLY valid JSON. "
+        "You will receive several numbered articles. Handle each one independently. "
+        f"{topic_constraint}"
+        "Extract exactly 2 key facts from each article. Use this exact flat structure:\n"
+        "{\"results\": [{\"index\": 0, \"facts\": [{\"actor\": \"...\", \"action\": \"...\", \"object\": \"...\"}]}]}"
+    )
+
+    articles = "\n\n".join(
+        f"ARTICLE {idx}: '''{text[:Config.EXTRACT_BATCH_CHARS]}'''" for idx, text in indexed_texts
+    )
+    user_content = (
+        f"{articles}\n\n"
+        "Requirements: Output valid JSON with one entry per ARTICLE index, no extra fields, 2 facts each. "
+        "If an article is irrelevant to the search intent, give it an empty facts list."
+    )
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+
+
+def _valid_facts(facts):
+    # VALIDATION: Ensure we only return facts that actually have content
+    if not isinstance(facts, list):
+        return []
+    return [f for f in facts if isinstance(f, dict) and f.get("actor") and f.get("action")][:2]
+
+
+def _cache_key(article_text, target_topic):
+    return llm_cache.make_key(MODEL, _single_messages(article_text, target_topic), TEMPERATURE, target_topic)
 
-class FactExtractor:
-    def __init__(self):
-        # Initialize client with the current active key from the shared manager
-        self.client = Groq(api_key=groq_keys.get_active_key())
 
+def _batch_cache_key(article_text, target_topic):
+    # A batch only sees the first EXTRACT_BATCH_CHARS of each article, so its answer is
+    # keyed on that slice (the single-article key whenever the text fits in the slice)
+    return _cache_key(article_text[:Config.EXTRACT_BATCH_CHARS], target_topic)
+
+
+def _facts_ttl(facts):
+    # None -> the cache's full TTL
+    return None if facts else Config.LLM_CACHE_EMPTY_TTL
+
+
+def _resolved(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _captured(component, request):
+    # Opt-in request/response capture of one Groq call (see TrafficCapture.exchange)
+    return traffic_capture.exchange("llm", component=component, model=request["model"], messages=request["messages"])
+
+
+class FactExtractor:
     def extract_facts(self, article_text, target_topic=None):
         """
         Extracts exactly 2 key facts ONLY IF the article matches the target_topic.
         Includes automatic API key rotation on 429 errors.
         """
         try:
-            # Re-instantiate to ensure we use the global active key
-            self.client = Groq(api_key=groq_keys.get_active_key())
-
-            # 1. INTELLIGENCE INJECTION: Create a topic-aware system prompt
-            # This prevents "Cricket" searches from returning "Nintendo" news
-            topic_constraint = ""
-            if target_topic and target_topic.lower() != "all":
-                topic_constraint = (
-                    f"CRITICAL: First, verify if this text is related to '{target_topic}'. "
-                    f"If the text is UNRELATED to '{target_topic}', return {{\"facts\": []}}. "
-                )
-
-            system_prompt = (
-                "You are a precision neural news extraction engine. Output ONLY valid JSON. "
-                f"{topic_constraint}"
-                "Extract exactly 2 key facts from the provided text. Use this exact flat structure:\n"
-                "{\"facts\": [{\"actor\": \"...\", \"action\": \"...\", \"object\": \"...\"}]}"
-            )
-
-            user_content = (
-                f"Extract 2 key facts from this article: '''{article_text[:3000]}'''\n"
-                "Requirements: Output valid JSON, no extra fields, 2 facts only. "
-                "If the text is irrelevant to the search intent, return an empty facts list."
-            )
-
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content}
-                ],
-                model="llama-3.1-8b-instant",
-                response_format={"type": "json_object"},
-                temperature=0.1 # Low temperature for high precision
-            )
-
-            data = json.loads(response.choices[0].message.content)
-            facts = data.get("facts", [])
-
-            # 2. VALIDATION: Ensure we only return facts that actually have content
-            valid_facts = [f for f in facts if f.get("actor") and f.get("action")][:2]
-            
-            if not valid_facts:
-                print(f"🔎 [Extraction] Intelligence Guard: Article rejected as irrelevant to '{target_topic}'")
-            
-            return valid_facts
+            messages = _single_messages(article_text, target_topic)
+
+            # MEMOIZATION: The same story in another feed/page costs zero LLM calls
+            cache_key = _cache_key(article_text, target_topic)
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            # Scheduler picks the key with the most headroom and parks 429'd ones
+            request = self._single_request(messages)
+            with _captured("extract", request) as exchange:
+                response = chat_completion(**request)
+                exchange["response"] = response.choices[0].message.content
+            return self._parse_single(response, cache_key, target_topic)
+
+        except GroqCapacityError:
+            raise  # The process node shows a capacity placeholder for this story
+        except Exception as e:
+            return self._report_error(e)
+
+    async def aextract_facts(self, article_text, target_topic=None):
+        """ Async extract_facts (same prompt, cache and error handling). """
+        try:
+            cache_key = _cache_key(article_text, target_topic)
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            request = self._single_request(_single_messages(article_text, target_topic))
+            with _captured("extract", request) as exchange:
+                response = await achat_completion(**request)
+                exchange["response"] = response.choices[0].message.content
+            return self._parse_single(response, cache_key, target_topic)
 
+        except GroqCapacityError:
+            raise  # The process node shows a capacity placeholder for this story
         except Exception as e:
-            # Handle Rate Limit (429) specifically
-            if "429" in str(e):
-                print(f"⚠️ Extraction Limit Hit! Requesting Global Rotation...")
-                groq_keys.switch_key()
-                # Recursive retry with the new key
-                return self.extract_facts(article_text, target_topic)
-
-            elif "400" in str(e):
-                print(f"   ❌ API Logic Error: {e}")
+            return self._report_error(e)
+
+    @staticmethod
+    def _single_request(messages):
+        return dict(
+            messages=messages,
+            model=MODEL,
+            response_format={"type": "json_object"},
+            temperature=TEMPERATURE
+        )
+
+    @staticmethod
+    def _parse_single(response, cache_key, target_topic):
+        data = json.loads(response.choices[0].message.content)
+        facts = data.get("facts", [])
+
+        valid_facts = _valid_facts(facts)
+
+        if not valid_facts:
+            print(f"🔎 [Extraction] Intelligence Guard: Article rejected as irrelevant to '{target_topic}'")
+
+        llm_cache.put(cache_key, valid_facts, ttl=_facts_ttl(valid_facts))
+        return valid_facts
+
+    @staticmethod
+    def _report_error(e):
+        # Rate limits were already retried across keys by the scheduler
+        if "429" in str(e):
+            print(f"⚠️ Extraction Limit Hit! All keys are parked, skipping article.")
+
+        elif "400" in str(e):
+            print(f"   ❌ API Logic Error: {e}")
+        else:
+            print(f"   ❌ Extraction Error: {e}")
+        return []
+
+    def extract_facts_batch(self, article_texts, target_topic=None):
+        """
+        Extracts facts for several articles with as few requests as possible.
+        Returns {index: facts}. Cached articles are skipped; the rest are packed
+        into JSON-mode batches, and any article a batch fails to answer falls
+        back to its own extract_facts() call.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, Config.PROCESS_WORKERS), thread_name_prefix="extract") as pool:
+            futures = self.submit_facts_batch(pool, article_texts, target_topic)
+            return {idx: future.result()[idx] for idx, future in futures.items()}
+
+    def submit_facts_batch(self, pool, article_texts, target_topic=None):
+        """
+        extract_facts_batch without waiting: runs each batch on `pool` and returns
+        {index: Future}. A future resolves to its batch's {index: facts} as soon as
+        that batch (and its fallbacks) is done; cached articles resolve at once.
+        """
+        results, pending = self._split_cached(article_texts, target_topic)
+        futures = dict.fromkeys(results, _resolved(results))
+        for batch in self._plan_batches(pending):
+            # One context copy per batch (taken here) so spans reach the request trace
+            job = pool.submit(contextvars.copy_context().run, self._answer_batch, batch, target_topic)
+            futures.update(dict.fromkeys((idx for idx, _ in batch), job))
+        return futures
+
+    async def aextract_facts_batch(self, article_texts, target_topic=None):
+        """ Async extract_facts_batch: batches (and fallbacks) run concurrently. """
+        tasks = await self.asubmit_facts_batch(article_texts, target_topic)
+        return {idx: (await task)[idx] for idx, task in tasks.items()}
+
+    async def asubmit_facts_batch(self, article_texts, target_topic=None):
+        """ Async submit_facts_batch: {index: task} with one task per batch. """
+        results, pending = self._split_cached(article_texts, target_topic)
+        cached = asyncio.get_running_loop().create_future()
+        cached.set_result(results)
+        tasks = dict.fromkeys(results, cached)
+        for batch in self._plan_batches(pending):
+            task = asyncio.ensure_future(self._aanswer_batch(batch, target_topic))
+            tasks.update(dict.fromkeys((idx for idx, _ in batch), task))
+        return tasks
+
+    def _answer_batch(self, batch, target_topic):
+        answered = self._run_batch(batch, target_topic)
+        # FALLBACK: malformed or partial replies -> one call per missing article
+        for idx, text in batch:
+            if idx not in answered:
+                answered[idx] = self.extract_facts(text, target_topic)
+        return answered
+
+    async def _aanswer_batch(self, batch, target_topic):
+        answered = await self._arun_batch(batch, target_topic)
+        missing = [(idx, text) for idx, text in batch if idx not in answered]
+        facts = await asyncio.gather(*(self.aextract_facts(text, target_topic) for _, text in missing))
+        answered.update((idx, item) for (idx, _), item in zip(missing, facts))
+        return answered
+
+    @staticmethod
+    def _split_cached(article_texts, target_topic):
+        results, pending = {}, []
+        for idx, text in enumerate(article_texts):
+            cached = llm_cache.get(_cache_key(text, target_topic))
+            if cached is None and len(text) > Config.EXTRACT_BATCH_CHARS:
+                cached = llm_cache.get(_batch_cache_key(text, target_topic))
+            if cached is not None:
+                results[idx] = cached
             else:
-                print(f"   ❌ Extraction Error: {e}")
-            return []
\ No newline at end of file
+                pending.append((idx, text))
+        return results, pending
+
+    @staticmethod
+    def _plan_batches(pending):
+        """
+        Splits articles into batches that fit both the model's context window
+        and the token budget the best Groq key has left right now.
+        """
+        if not pending:
+            return []
+        budget = Config.MODEL_CONTEXT_TOKENS.get(MODEL, 8192)
+        headroom = groq_keys.token_budget()
+        if headroom is not None:
+            budget = min(budget, headroom)
+        overhead = estimate_prompt_tokens(_batch_messages([], None), max_completion=0)
+        budget = int(budget * 0.8) - overhead  # Keep slack for the chars/4 estimate
+
+        batches, current, used = [], [], 0
+        for idx, text in pending:
+            cost = len(text[:Config.EXTRACT_BATCH_CHARS]) // 4 + FACT_TOKENS
+            if current and (len(current) >= Config.EXTRACT_BATCH_MAX or used + cost > budget):
+                batches.append(current)
+                current, used = [], 0
+            current.append((idx, text))
+            used += cost
+        batches.append(current)
+        return batches
+
+    @staticmethod
+    def _batch_request(batch, target_topic):
+        return dict(
+            messages=_batch_messages(batch, target_topic),
+            model=MODEL,
+            response_format={"type": "json_object"},
+            temperature=TEMPERATURE,
+            max_tokens=FACT_TOKENS * len(batch) + 64
+        )
+
+    def _run_batch(self, batch, target_topic):
+        """One request for the batch -> {index: facts} for every index it answered."""
+        if len(batch) == 1:
+            return {}  # A batch of one is just the single-article call
+        try:
+            request = self._batch_request(batch, target_topic)
+            with _captured("extract_batch", request) as exchange:
+                response = chat_completion(**request)
+                exchange["response"] = response.choices[0].message.content
+            return self._parse_batch(response, batch, target_topic)
+        except GroqCapacityError:
+            raise
+        except Exception as e:
+            print(f"   ⚠️ Batch extraction failed ({e}). Falling back to per-article calls.")
+            return {}
+
+    async def _arun_batch(self, batch, target_topic):
+        if len(batch) == 1:
+            return {}
+        try:
+            request = self._batch_request(batch, target_topic)
+            with _captured("extract_batch", request) as exchange:
+                response = await achat_completion(**request)
+                exchange["response"] = response.choices[0].message.content
+            return self._parse_batch(response, batch, target_topic)
+        except GroqCapacityError:
+            raise
+        except Exception as e:
+            print(f"   ⚠️ Batch extraction failed ({e}). Falling back to per-article calls.")
+            return {}
+
+    @staticmethod
+    def _parse_batch(response, batch, target_topic):
+        data = json.loads(response.choices[0].message.content)
+        entries = data.get("results")
+        if not isinstance(entries, list):
+            raise ValueError("reply has no 'results' list")
+
+        texts = dict(batch)
+        answered = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                idx = int(entry.get("index"))
+            except (TypeError, ValueError):
+                continue
+            if idx in texts and idx not in answered and isinstance(entry.get("facts"), list):
+                answered[idx] = _valid_facts(entry["facts"])
+                llm_cache.put(_batch_cache_key(texts[idx], target_topic), answered[idx], ttl=_facts_ttl(answered[idx]))
+
+        if len(answered) < len(batch):
+            print(f"   ⚠️ Batch answered {len(answered)}/{len(batch)} articles. Retrying the rest one by one.")
+        return answered
@@ -0,0 +1,115 @@
+from html.parser import HTMLParser
+
+# Same exclusions the BeautifulSoup scraper decomposes
+SKIP_TAGS = {"script", "style", "nav", "footer", "iframe"}
+# Regions that usually hold the story itself
+MAIN_TAGS = {"article", "main"}
+# Elements that never get a closing tag (never pushed on the open-tag stack)
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr"
+}
+
+
+class _TextCollector(HTMLParser):
+    """
+    Incremental tokenizer that keeps visible text only.
+    Text is whitespace-normalized word by word as it streams in, and tracked
+    separately for the whole page, <article>/<main> regions and <p> paragraphs.
+    A text run is only tokenized once the next tag arrives (or on flush()), so
+    a word split across two feed() calls stays one word.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.skipping = 0
+        self.main_depth = 0
+        self.p_depth = 0
+        self.all_words, self.all_chars = [], 0
+        self.main_words, self.main_chars = [], 0
+        self.p_words, self.p_chars = [], 0
+        self.seen_main = False
+        self.pending = []
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in VOID_TAGS:
+            return
+        self.stack.append(tag)
+        self._track(tag, +1)
+
+    def handle_endtag(self, tag):
+        # Like BeautifulSoup's html.parser builder: a closing tag implicitly closes
+        # anything left open inside it; stray closing tags are ignored.
+        self.flush()
+        if tag not in self.stack:
+            return
+        while self.stack:
+            top = self.stack.pop()
+            self._track(top, -1)
+            if top == tag:
+                break
+
+    def _track(self, tag, delta):
+        if tag in SKIP_TAGS:
+            self.skipping += delta
+        elif tag in MAIN_TAGS:
+            self.main_depth += delta
+            self.seen_main = True
+        elif tag == "p":
+            self.p_depth += delta
+
+    def handle_data(self, data):
+        # HTMLParser hands over pending text at the end of every feed(); keep the
+        # run open until the tag that ends it
+        if not self.skipping:
+            self.pending.append(data)
+
+    def flush(self):
+        if not self.pending:
+            return
+        words = "".join(self.pending).split()
+        self.pending = []
+        if not words:
+            return
+        size = sum(len(w) for w in words) + len(words)
+        self.all_words.extend(words)
+        self.all_chars += size
+        if self.main_depth:
+            self.main_words.extend(words)
+            self.main_chars += size
+        if self.p_depth:
+            self.p_words.extend(words)
+            self.p_chars += size
+
+
+def html_to_text(html, limit=5000, prefer_main=True, min_main_chars=500, chunk_size=32768):
+    """
+    Fast replacement for BeautifulSoup(...).get_text() + decompose().
+    Streams the HTML in chunks and stops as soon as enough text is collected.
+    prefer_main: return <article>/<main> text when it is substantial, or the
+    <p> text when the page is mostly boilerplate. Otherwise the whole page is used
+    (same text the BeautifulSoup scraper produced).
+    """
+    collector = _TextCollector()
+
+    for start in range(0, len(html), chunk_size):
+        collector.feed(html[start:start + chunk_size])
+        if prefer_main and collector.main_chars >= limit:
+            break
+        # Without a main region to wait for, the page text alone decides when to stop
+        if collector.all_chars >= limit and (not prefer_main or (not collector.seen_main and collector.all_chars >= 4 * limit)):
+            break
+    else:
+        collector.close()
+    collector.flush()
+
+    words = collector.all_words
+    if prefer_main:
+        if collector.main_chars >= min_main_chars:
+            words = collector.main_words
+        elif collector.p_chars >= min_main_chars and collector.p_chars * 3 < collector.all_chars:
+            words = collector.p_words
+
+    return ' '.join(words)[:limit]
@@ -1,20 +1,27 @@
-import requests
 import sys
 import os
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from backend.config import Config
+from backend.app.core.html_text import html_to_text
 from backend.app.services.key_manager import news_keys
+from backend.app.database.scrape_cache import scrape_cache
+from backend.app.services.http_client import api_http, scrape_http, async_api_http, async_scrape_http
+from backend.app.services.metrics import metrics
+from backend.app.services.capture import traffic_capture
 
 
 class NewsIngestor:
-    def fetch_articles(self, query=None, category=None, page=1):
-        # 1. Get Active Key
-        current_key = news_keys.get_active_key()
-        if not current_key:
-            return []
-
+    @staticmethod
+    def _build_request(current_key, query=None, category=None, page=1):
+        """ NewsAPI endpoint + params for this query/category/page. """
         # 2. DEFAULT SETTINGS (Top Headlines)
-        url = "https://newsapi.org/v2/top-headlines"
+        url = f"{Config.NEWS_API_BASE_URL}/top-headlines"
         params = {
             "apiKey": current_key,
             "page": page,
@@ -64,7 +71,7 @@ class NewsIngestor:
 
         # 6. FINALIZE PARAMS BASED ON ENDPOINT
         if use_everything_endpoint:
-            url = "https://newsapi.org/v2/everything"
+            url = f"{Config.NEWS_API_BASE_URL}/everything"
             # CRITICAL FIX: The /everything endpoint HATES the 'country' and 'category' params.
             # We must ensure they are NOT in the params dict.
             params.pop("country", None)
@@ -73,10 +80,23 @@ class NewsIngestor:
             # We are using /top-headlines, so we MUST have country (and optional category)
             params["country"] = target_country
 
+        return url, params
+
+    def fetch_articles(self, query=None, category=None, page=1):
+        # 1. Get Active Key
+        current_key = news_keys.get_active_key()
+        if not current_key:
+            return []
+
+        url, params = self._build_request(current_key, query, category, page)
+
         # 7. EXECUTE REQUEST
         try:
-            response = requests.get(url, params=params)
-            data = response.json()
+            news_keys.record_request(current_key)
+            with traffic_capture.exchange("newsapi", **self._capture_request(url, params)) as exchange:
+                with metrics.span("newsapi", metrics.call_seconds, call="newsapi", target=url.rsplit("/", 1)[-1]):
+                    response = api_http.get(url, params=params)
+                data = exchange["response"] = response.json()
 
             if data.get("status") == "error":
                 code = data.get("code")
@@ -95,15 +115,230 @@ class NewsIngestor:
             return []
 
     def scrape_full_content(self, url):
-        """ Scrapes article text. Unchanged. """
+        """
+        Scrapes article text. Repeat visits are served from the on-disk scrape cache;
+        a stale entry whose refetch fails (network error or non-OK status) is
+        served as is (stale-if-error).
+        """
+        cached = None
         try:
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-            res = requests.get(url, headers=headers, timeout=5)
-            soup = BeautifulSoup(res.text, 'html.parser')
+            cached = scrape_cache.get(url)
+            if cached and cached["fresh"]:
+                metrics.cache_events.inc(cache="scrape", result="hit")
+                return cached["text"]
+
+            headers = self._revalidation_headers(cached)
+
+            # Pooled keep-alive session; body capped so a huge page can't stall a worker
+            domain = urlparse(url).netloc.lower()
+            with traffic_capture.exchange("scrape", url=url) as exchange:
+                with metrics.span("scrape", metrics.scrape_seconds, domain=domain):
+                    res, html = scrape_http.get_capped(url, Config.SCRAPE_MAX_BYTES, headers=headers)
+                exchange["response"] = self._capture_page(res, html)
+            metrics.scrape_bytes.inc(len(html), domain=domain)
+            if cached and res.status_code == 304:
+                metrics.cache_events.inc(cache="scrape", result="revalidated")
+                scrape_cache.touch(url)
+                return cached["text"]
+            if cached and not res.ok:
+                metrics.cache_events.inc(cache="scrape", result="stale_error")
+                return cached["text"]
+            metrics.cache_events.inc(cache="scrape", result="miss")
+
+            clean_text = self.extract_text(html)
+
+            # Only cache real pages, never error/block pages
+            if res.ok and clean_text:
+                scrape_cache.put(url, clean_text, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+            return clean_text
+        except Exception:
+            return self._stale_or_empty(cached)
+
+    @staticmethod
+    def _stale_or_empty(cached):
+        # Refetch failed: the last good text beats the API description fallback
+        if cached:
+            metrics.cache_events.inc(cache="scrape", result="stale_error")
+            return cached["text"]
+        return ""
+
+    @staticmethod
+    def _capture_request(url, params):
+        # Keys never go into the capture log
+        return {"endpoint": url.rsplit("/", 1)[-1], "params": {k: v for k, v in params.items() if k != "apiKey"}}
+
+    @staticmethod
+    def _capture_page(res, html):
+        return {
+            "status": res.status_code,
+            "etag": res.headers.get('ETag'),
+            "last_modified": res.headers.get('Last-Modified'),
+            "html": html
+        }
+
+    @staticmethod
+    def _revalidation_headers(cached):
+        # Stale entry: ask the server whether the page changed instead of re-downloading it
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers['If-None-Match'] = cached["etag"]
+            if cached["last_modified"]:
+                headers['If-Modified-Since'] = cached["last_modified"]
+        return headers
+
+    @staticmethod
+    def extract_text(html, limit=5000):
+        """ HTML -> clean article text, with the engine picked by Config.SCRAPE_PARSER. """
+        if Config.SCRAPE_PARSER == "bs4":
+            soup = BeautifulSoup(html, 'html.parser')
             for script in soup(["script", "style", "nav", "footer", "iframe"]):
                 script.decompose()
             text = soup.get_text(separator=' ')
-            clean_text = ' '.join(text.split())
-            return clean_text[:5000]
-        except:
-            return ""
\ No newline at end of file
+            return ' '.join(text.split())[:limit]
+
+        # Streaming tokenizer: skips excluded tags, stops once it has enough body text
+        return html_to_text(html, limit=limit, prefer_main=Config.SCRAPE_PREFER_MAIN)
+
+    def scrape_many(self, urls, max_workers=None, per_host_limit=None, deadline=None):
+        """
+        Scrapes several URLs concurrently on a bounded worker pool.
+        Results keep the input order. Anything still running when the
+        deadline passes comes back as "" so the caller can use its backup text.
+        """
+        if not urls:
+            return []
+
+        max_workers = max_workers or Config.SCRAPE_MAX_WORKERS
+        per_host_limit = per_host_limit or Config.SCRAPE_PER_HOST_LIMIT
+        deadline = Config.SCRAPE_DEADLINE if deadline is None else deadline
+
+        # 1. One semaphore per domain so a single slow site can't hog the pool
+        host_slots = {}
+        for url in urls:
+            host = urlparse(url or "").netloc.lower()
+            if host not in host_slots:
+                host_slots[host] = threading.BoundedSemaphore(per_host_limit)
+
+        expires_at = time.monotonic() + deadline
+
+        def worker(url):
+            slot = host_slots[urlparse(url or "").netloc.lower()]
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0 or not slot.acquire(timeout=remaining):
+                return ""
+            try:
+                return self.scrape_full_content(url)
+            finally:
+                slot.release()
+
+        # 2. Fan out, collecting results by their original position
+        results = [""] * len(urls)
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="scrape")
+        # Each worker runs in a copy of our context so its spans reach the request trace
+        futures = {
+            executor.submit(contextvars.copy_context().run, worker, url): idx for idx, url in enumerate(urls)
+        }
+        done = 0
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                results[futures[future]] = future.result()
+                done += 1
+        except TimeoutError:
+            print(f"   ⏱️ Scrape deadline ({deadline}s) hit. {len(urls) - done} stragglers fall back to API text.")
+        finally:
+            # Don't wait for stragglers; queued work is cancelled outright
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    # --- ASYNC VARIANTS (used by the asyncio graph) ---
+    async def afetch_articles(self, query=None, category=None, page=1):
+        current_key = news_keys.get_active_key()
+        if not current_key:
+            return []
+
+        url, params = self._build_request(current_key, query, category, page)
+
+        try:
+            news_keys.record_request(current_key)
+            with traffic_capture.exchange("newsapi", **self._capture_request(url, params)) as exchange:
+                with metrics.span("newsapi", metrics.call_seconds, call="newsapi", target=url.rsplit("/", 1)[-1]):
+                    response = await async_api_http.get(url, params=params)
+                data = exchange["response"] = response.json()
+
+            if data.get("status") == "error":
+                if data.get("code") in ["rateLimited", "apiKeyExhausted"]:
+                    news_keys.switch_key()
+                    return await self.afetch_articles(query, category, page)
+
+                print(f"   ❌ NewsAPI Error: {data.get('message')}")
+                return []
+
+            return data.get("articles", [])
+
+        except Exception as e:
+            print(f"   ❌ Ingestion Error: {e}")
+            return []
+
+    async def ascrape_full_content(self, url):
+        """ Async scrape_full_content: same cache, revalidation and stale-if-error rules. """
+        cached = None
+        try:
+            cached = scrape_cache.get(url)
+            if cached and cached["fresh"]:
+                metrics.cache_events.inc(cache="scrape", result="hit")
+                return cached["text"]
+
+            domain = urlparse(url).netloc.lower()
+            with traffic_capture.exchange("scrape", url=url) as exchange:
+                with metrics.span("scrape", metrics.scrape_seconds, domain=domain):
+                    res, html = await async_scrape_http.get_capped(
+                        url, Config.SCRAPE_MAX_BYTES, headers=self._revalidation_headers(cached)
+                    )
+                exchange["response"] = self._capture_page(res, html)
+            metrics.scrape_bytes.inc(len(html), domain=domain)
+            if cached and res.status_code == 304:
+                metrics.cache_events.inc(cache="scrape", result="revalidated")
+                scrape_cache.touch(url)
+                return cached["text"]
+            if cached and not res.ok:
+                metrics.cache_events.inc(cache="scrape", result="stale_error")
+                return cached["text"]
+            metrics.cache_events.inc(cache="scrape", result="miss")
+
+            # Parsing is CPU work; keep it off the event loop
+            clean_text = await asyncio.to_thread(self.extract_text, html)
+
+            if res.ok and clean_text:
+                scrape_cache.put(url, clean_text, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+            return clean_text
+        except Exception:
+            return self._stale_or_empty(cached)
+
+    async def ascrape_many(self, urls, max_workers=None, per_host_limit=None, deadline=None):
+        """ Async scrape_many: same worker/per-host limits and deadline, no threads. """
+        if not urls:
+            return []
+
+        max_workers = max_workers or Config.SCRAPE_MAX_WORKERS
+        per_host_limit = per_host_limit or Config.SCRAPE_PER_HOST_LIMIT
+        deadline = Config.SCRAPE_DEADLINE if deadline is None else deadline
+
+        workers = asyncio.Semaphore(max_workers)
+        host_slots = {}
+        for url in urls:
+            host_slots.setdefault(urlparse(url or "").netloc.lower(), asyncio.Semaphore(per_host_limit))
+
+        async def worker(url):
+            async with host_slots[urlparse(url or "").netloc.lower()], workers:
+                return await self.ascrape_full_content(url)
+
+        tasks = [asyncio.ensure_future(worker(url)) for url in urls]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        if pending:
+            print(f"   ⏱️ Scrape deadline ({deadline}s) hit. {len(pending)} stragglers fall back to API text.")
+            for task in pending:
+                task.cancel()
+
+        return [task.result() if task in done else "" for task in tasks]
@@ -0,0 +1,90 @@
+import re
+import numpy as np
+from backend.config import Config
+from backend.app.core.clustering import build_vectorizer
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=["\'(\[]?[A-Z0-9])')
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Local BPE-ish token count: one token per word or punctuation mark,
+    plus one for every 6 characters past the first 6 of a long word.
+    """
+    return sum(1 + max(0, len(piece) - 1) // 6 for piece in _TOKEN_PIECES.findall(text or ""))
+
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text or "") if s.strip()]
+
+
+class ContentReducer:
+    """
+    CPU-only pre-summarizer that runs before extraction.
+    Sentences are ranked by TF-IDF similarity to the headline and centrality
+    (mean similarity to the rest of the article), then the best ones are packed
+    into a token budget and returned in their original order.
+    """
+
+    def __init__(self, token_budget=None, title_weight=None):
+        self.token_budget = token_budget or Config.CONTENT_TOKEN_BUDGET
+        self.title_weight = Config.CONTENT_TITLE_WEIGHT if title_weight is None else title_weight
+
+    def reduce(self, text, title=""):
+        text = ' '.join((text or "").split())
+        if estimate_tokens(text) <= self.token_budget:
+            return text
+
+        sentences = split_sentences(text)
+        if len(sentences) < 2:
+            return self._clip(text, self.token_budget)
+
+        scores = self._score(sentences, title)
+        if scores is None:
+            return self._clip(text, self.token_budget)
+
+        # Greedy pack: best sentences first, skip ones that would overflow
+        chosen, used = [], 0
+        for idx in np.argsort(-scores, kind="stable"):
+            cost = estimate_tokens(sentences[idx])
+            if used + cost > self.token_budget:
+                continue
+            chosen.append(idx)
+            used += cost
+
+        if not chosen:
+            return self._clip(sentences[int(np.argmax(scores))], self.token_budget)
+        return ' '.join(sentences[idx] for idx in sorted(chosen))
+
+    def _score(self, sentences, title):
+        vectorizer = build_vectorizer()
+        try:
+            # The headline is fitted too so its terms are in the vocabulary
+            matrix = vectorizer.fit_transform(sentences + [title or ""])
+        except ValueError:
+            return None  # Only stop words
+
+        sentence_vecs, title_vec = matrix[:-1], matrix[-1]
+        n = sentence_vecs.shape[0]
+
+        # Rows are L2-normalized, so products are cosine similarities
+        similarity = (sentence_vecs @ sentence_vecs.T).toarray()
+        centrality = (similarity.sum(axis=1) - similarity.diagonal()) / max(n - 1, 1)
+        relevance = (sentence_vecs @ title_vec.T).toarray().ravel()
+
+        weight = self.title_weight if title_vec.nnz else 0.0
+        scores = weight * relevance + (1 - weight) * centrality
+
+        # Tie-break towards the lede, where news copy puts the key facts
+        return scores + 0.01 * (1 - np.arange(n) / n)
+
+    @staticmethod
+    def _clip(text, budget):
+        words, kept, used = text.split(), [], 0
+        for word in words:
+            used += estimate_tokens(word)
+            if used > budget:
+                break
+            kept.append(word)
+        return ' '.join(kept)
@@ -0,0 +1,236 @@
+import sys
+import os
+import pickle
+import threading
+import time
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# Fix path to ensure imports work correctly in the modular pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
+
+from backend.config import Config
+
+try:
+    import faiss
+except ImportError:  # Fall back to a brute-force numpy search
+    faiss = None
+
+
+class _Story:
+    __slots__ = ("story_id", "mean", "count", "created_at", "updated_at")
+
+    def __init__(self, story_id, vector, now):
+        self.story_id = story_id
+        self.mean = vector.copy()
+        self.count = 1
+        self.created_at = now
+        self.updated_at = now
+
+    def centroid(self):
+        norm = np.linalg.norm(self.mean)
+        return self.mean / norm if norm > 0 else self.mean
+
+
+class StoryIndex:
+    """
+    Online clustering across requests.
+    Articles are hashed into a fixed feature space (no refitting), then matched
+    against persistent story centroids with an HNSW inner-product index
+    (approximate, O(log n) per lookup and insert).
+    Each article joins its nearest story (cosine >= threshold) or starts a new one.
+    Stories not updated for `ttl` seconds age out.
+    """
+
+    def __init__(self, similarity_threshold=0.45, n_features=None, ttl=None, filename="story_index.pkl"):
+        self.dim = n_features or Config.STORY_INDEX_FEATURES
+        self.threshold = similarity_threshold
+        self.ttl = Config.STORY_INDEX_TTL if ttl is None else ttl
+        self.path = os.path.join(Config.DATA_DIR, filename)
+        # Same features as the batch clusterer, minus the fitted vocabulary
+        self.vectorizer = HashingVectorizer(
+            stop_words='english', ngram_range=(1, 2), n_features=self.dim,
+            alternate_sign=False, norm='l2'
+        )
+        self.stories = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._last_expiry = 0.0
+        self._last_save = time.time()
+        self._load()
+        self._rebuild()
+        print(f"✅ [Story Index] {len(self.stories)} live stories ({'faiss HNSW' if faiss else 'numpy'} search)")
+
+    # --- INDEX MAINTENANCE ---
+    def _rebuild(self):
+        """Re-creates the search index from live centroids, dropping tombstoned slots."""
+        self._slot_story = []   # slot -> story id
+        self._slots = {}        # story id -> its live slot
+        self._index = faiss.IndexHNSWFlat(self.dim, 32, faiss.METRIC_INNER_PRODUCT) if faiss else None
+        # numpy fallback: one row per story, overwritten in place; grown by doubling
+        self._matrix = np.zeros((max(len(self.stories), 64), self.dim), dtype=np.float32) if faiss is None else None
+        self._size = 0
+        for story in self.stories.values():
+            self._put(story)
+
+    def _put(self, story):
+        vector = story.centroid().astype(np.float32)
+        if self._index is not None:
+            # HNSW can't update or delete in place: a moved centroid is appended under
+            # a new slot and the story's previous slot becomes a tombstone.
+            self._slots[story.story_id] = len(self._slot_story)
+            self._slot_story.append(story.story_id)
+            self._index.add(vector[None, :])
+            self._compact()
+            return
+        slot = self._slots.get(story.story_id)
+        if slot is None:
+            if self._size == len(self._matrix):
+                grown = np.zeros((2 * len(self._matrix), self.dim), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            slot = self._slots[story.story_id] = self._size
+            self._slot_story.append(story.story_id)
+            self._size += 1
+        self._matrix[slot] = vector
+
+    def _remove(self, story_ids):
+        if self._index is not None:
+            # Their slots are now tombstones
+            for story_id in story_ids:
+                self._slots.pop(story_id, None)
+            self._compact()
+            return
+        for story_id in story_ids:
+            # Swap the last row into the hole so rows stay contiguous
+            slot = self._slots.pop(story_id, None)
+            if slot is None:
+                continue
+            last = self._size - 1
+            if slot != last:
+                moved = self._slot_story[last]
+                self._matrix[slot] = self._matrix[last]
+                self._slot_story[slot] = moved
+                self._slots[moved] = slot
+            self._slot_story.pop()
+            self._size -= 1
+
+    def _compact(self):
+        # Rebuild (O(n log n)) once tombstones outnumber live stories, i.e. after at
+        # least n updates: amortized O(log n) per update, and searches never wade
+        # through more dead slots than live ones.
+        if len(self._slot_story) > 2 * len(self.stories) + 256:
+            self._rebuild()
+
+    def _nearest(self, vector):
+        if not self.stories:
+            return None
+        if self._index is None:
+            scores = self._matrix[:self._size] @ vector
+            best = int(np.argmax(scores))
+            story = self.stories[self._slot_story[best]]
+            return story if scores[best] >= self.threshold else None
+
+        # Results come back best-first, so the first live slot is the best live story.
+        # If every hit is a tombstone (e.g. one story updated many times), widen k.
+        total = len(self._slot_story)
+        k = min(16, total)
+        while True:
+            scores, slots = self._index.search(vector[None, :], k)
+            for score, slot in zip(scores[0], slots[0]):
+                if slot < 0:
+                    continue
+                story_id = self._slot_story[slot]
+                if self._slots.get(story_id) == slot:
+                    return self.stories[story_id] if score >= self.threshold else None
+            if k >= total:
+                return None
+            k = min(4 * k, total)
+
+    def _expire(self, now):
+        if now - self._last_expiry < 60:
+            return
+        self._last_expiry = now
+        cutoff = now - self.ttl
+        expired = [sid for sid, s in self.stories.items() if s.updated_at < cutoff]
+        for story_id in expired:
+            del self.stories[story_id]
+        self._remove(expired)
+
+    # --- PUBLIC API ---
+    def assign(self, articles):
+        """
+        Returns a stable story ID for each article (same order as the input).
+        """
+        if not articles:
+            return []
+
+        texts = [f"{a.get('title', '')} {a.get('description', '')}" for a in articles]
+        vectors = self.vectorizer.transform(texts).toarray().astype(np.float32)
+        now = time.time()
+
+        story_ids = []
+        with self._lock:
+            self._expire(now)
+            for vector in vectors:
+                story = self._nearest(vector) if vector.any() else None
+                if story is None:
+                    story = _Story(self._next_id, vector, now)
+                    self._next_id += 1
+                    self.stories[story.story_id] = story
+                else:
+                    # Running mean of member vectors; re-indexed below
+                    story.mean += (vector - story.mean) / (story.count + 1)
+                    story.count += 1
+                    story.updated_at = now
+                self._put(story)
+                story_ids.append(story.story_id)
+
+            if now - self._last_save > Config.STORY_INDEX_SAVE_INTERVAL:
+                self._save()
+                self._last_save = now
+
+        return story_ids
+
+    # --- PERSISTENCE ---
+    def _save(self):
+        # Caller holds the lock. Only centroids are stored; the index is rebuilt on load.
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as fh:
+                pickle.dump({"dim": self.dim, "next_id": self._next_id, "stories": self.stories}, fh)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ [Story Index] Could not persist index: {e}")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as fh:
+                data = pickle.load(fh)
+            if data.get("dim") != self.dim:
+                return  # Feature space changed; start fresh
+            self._next_id = data["next_id"]
+            cutoff = time.time() - self.ttl
+            self.stories = {sid: s for sid, s in data["stories"].items() if s.updated_at >= cutoff}
+        except Exception as e:
+            print(f"⚠️ [Story Index] Ignoring unreadable index file: {e}")
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+
+# --- GLOBAL INSTANCE (created on first use; incremental mode only) ---
+_story_index = None
+_story_index_lock = threading.Lock()
+
+
+def get_story_index():
+    global _story_index
+    with _story_index_lock:
+        if _story_index is None:
+            _story_index = StoryIndex()
+        return _story_index
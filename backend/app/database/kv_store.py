@@ -0,0 +1,67 @@
+import threading
+import time
+from backend.app.database.sqlite import connect
+
+
+class KVStore:
+    """
+    Small persistent key -> text store on SQLite.
+    Entries older than `ttl` seconds read as missing; `max_entries` bounds the table (oldest first).
+    """
+
+    def __init__(self, filename, ttl=None, max_entries=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = connect(filename)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS kv (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_kv_created ON kv (created_at)")
+        self._conn.commit()
+        self._writes = 0
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key):
+        """(value, created_at) or None if missing/expired."""
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM kv WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        if self.ttl is not None and time.time() - row[1] > self.ttl:
+            return None
+        return row
+
+    def put(self, key, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            self._writes += 1
+            # Pruning scans the table, so only do it every so often
+            if self._writes % 100 == 0:
+                self._prune()
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _prune(self):
+        # Caller holds the lock
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM kv WHERE created_at < ?", (time.time() - self.ttl,))
+        if self.max_entries:
+            self._conn.execute(
+                "DELETE FROM kv WHERE key IN (SELECT key FROM kv ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
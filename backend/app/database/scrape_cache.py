@@ -0,0 +1,126 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from backend.config import Config
+from backend.app.database.sqlite import connect
+
+# Query parameters that never change the article body
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ocid", "cmpid")
+
+
+class ScrapeCache:
+    """
+    On-disk cache of cleaned article text, keyed by a hash of the normalized URL.
+    Entries are fresh for `ttl` seconds, then revalidated with ETag/Last-Modified.
+    Total stored text is bounded by `max_bytes` with least-recently-used eviction.
+    """
+
+    def __init__(self, filename="scrape_cache.db", ttl=None, max_bytes=None):
+        self.ttl = Config.SCRAPE_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = Config.SCRAPE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._conn = connect(filename)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scrape_accessed ON scrape_cache (accessed_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM scrape_cache").fetchone()[0]
+
+    @staticmethod
+    def normalize_url(url):
+        """Lowercases scheme/host, drops fragments, default ports and tracking params, sorts the query."""
+        parts = urlsplit((url or "").strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+            host = f"{host}:{parts.port}"
+
+        query = sorted(
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not k.lower().startswith(_TRACKING_PARAMS)
+        )
+        path = parts.path.rstrip("/") or "/"
+        return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+    def key_for(self, url):
+        return hashlib.sha256(self.normalize_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url):
+        """
+        Returns {"text", "etag", "last_modified", "fresh"} or None.
+        Stale entries are still returned so the caller can revalidate them.
+        """
+        key = self.key_for(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, etag, last_modified, fetched_at FROM scrape_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            self._conn.execute("UPDATE scrape_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        text, etag, last_modified, fetched_at = row
+        return {
+            "text": text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": now - fetched_at < self.ttl
+        }
+
+    def put(self, url, text, etag=None, last_modified=None):
+        key = self.key_for(url)
+        size = len(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM scrape_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache "
+                "(key, url, text, etag, last_modified, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, text, etag, last_modified, size, now, now)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url):
+        """Marks an entry fresh again after a 304 Not Modified revalidation."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scrape_cache SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, self.key_for(url))
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        # Caller holds the lock. Drop least-recently-used rows until we fit the budget.
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM scrape_cache ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM scrape_cache WHERE key = ?", (key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+
+# --- GLOBAL INSTANCE ---
+scrape_cache = ScrapeCache()
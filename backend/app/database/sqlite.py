@@ -0,0 +1,18 @@
+import os
+import sqlite3
+from backend.config import Config
+
+
+def connect(filename):
+    """
+    Opens (or creates) a SQLite database inside Config.DATA_DIR.
+    The connection is shared across threads, so callers must serialize access with their own lock.
+    """
+    os.makedirs(Config.DATA_DIR, exist_ok=True)
+    path = filename if os.path.isabs(filename) else os.path.join(Config.DATA_DIR, filename)
+
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+    # WAL lets several worker processes read while one writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
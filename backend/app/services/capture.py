@@ -0,0 +1,144 @@
+import atexit
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from backend.config import Config
+
+FILE_PATTERN = "capture-*.jsonl.gz"
+
+
+class TrafficCapture:
+    """
+    Opt-in, append-only log of request/response pairs for replay benchmarks.
+
+    Records are JSON lines ({"t", "kind", "ms", "request", "response" | "error"})
+    buffered in memory and appended as one gzip member per flush, so a file is
+    valid gzip after every flush and a crash loses at most the unflushed tail.
+    """
+
+    def __init__(self, directory=None, enabled=None, kinds=None, max_bytes=None, max_files=None):
+        self.directory = directory or Config.CAPTURE_DIR
+        self.enabled = Config.CAPTURE_ENABLED if enabled is None else enabled
+        self.kinds = set(Config.CAPTURE_KINDS if kinds is None else kinds)
+        self.max_bytes = max_bytes or Config.CAPTURE_MAX_BYTES
+        self.max_files = max_files or Config.CAPTURE_MAX_FILES
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._path = None
+        self._lock = threading.Lock()
+        self.records = 0
+        self.dropped = 0
+        if self.enabled:
+            atexit.register(self.flush)
+
+    def wants(self, kind):
+        return self.enabled and kind in self.kinds
+
+    @contextmanager
+    def exchange(self, kind, **request):
+        """
+        Records one exchange: the caller sets exchange["response"] inside the
+        block; an exception is recorded as the error and re-raised.
+        """
+        exchange = {}
+        if not self.wants(kind):
+            yield exchange
+            return
+        started = time.perf_counter()
+        try:
+            yield exchange
+        except Exception as e:
+            self.record(kind, request, error=str(e), ms=(time.perf_counter() - started) * 1000)
+            raise
+        if "response" in exchange:
+            self.record(kind, request, exchange["response"], ms=(time.perf_counter() - started) * 1000)
+
+    def record(self, kind, request, response=None, error=None, ms=None):
+        if not self.wants(kind):
+            return
+        entry = {"t": round(time.time(), 3), "kind": kind, "ms": round(ms, 1) if ms is not None else None,
+                 "request": request}
+        if error is not None:
+            entry["error"] = error
+        else:
+            entry["response"] = response
+        try:
+            line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError):
+            self.dropped += 1
+            return
+
+        with self._lock:
+            self._buffer.append(line)
+            self.records += 1
+            due = (len(self._buffer) >= Config.CAPTURE_FLUSH_RECORDS
+                   or time.monotonic() - self._last_flush >= Config.CAPTURE_FLUSH_SECONDS)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            try:
+                member = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+                path = self._current_file(len(member))
+                with open(path, "ab") as fh:
+                    fh.write(member)
+            except OSError as e:
+                self.dropped += len(lines)
+                print(f"   ⚠️ [Capture] Write failed, {len(lines)} records dropped: {e}")
+
+    def _current_file(self, incoming):
+        # Caller holds the lock
+        if self._path is None or os.path.getsize(self._path) + incoming > self.max_bytes:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+            self._path = os.path.join(self.directory, f"capture-{stamp}-{os.getpid()}.jsonl.gz")
+            if not os.path.exists(self._path):
+                open(self._path, "ab").close()
+            self._prune()
+        return self._path
+
+    def _prune(self):
+        files = sorted(glob.glob(os.path.join(self.directory, FILE_PATTERN)), key=os.path.getmtime)
+        for path in files[:-self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "records": self.records,
+                "buffered": len(self._buffer),
+                "dropped": self.dropped,
+                "file": os.path.basename(self._path) if self._path else None
+            }
+
+    @staticmethod
+    def read(directory=None):
+        """Yields every record in a capture directory, oldest file first."""
+        directory = directory or Config.CAPTURE_DIR
+        for path in sorted(glob.glob(os.path.join(directory, FILE_PATTERN)), key=os.path.getmtime):
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as fh:
+                    for line in fh:
+                        if line.strip():
+                            yield json.loads(line)
+            except (EOFError, OSError, zlib.error, json.JSONDecodeError):
+                # Torn last member (process killed mid-write): keep what was read
+                print(f"   ⚠️ [Capture] {os.path.basename(path)} ends early, skipping the rest.")
+
+
+# --- GLOBAL INSTANCE ---
+traffic_capture = TrafficCapture()
@@ -0,0 +1,233 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from backend.config import Config
+from backend.app.core.compression import TRANSIENT_SUMMARIES
+
+
+def is_degraded(feed):
+    """Empty feed (upstream error) or a story whose summary failed transiently."""
+    return not feed or any(item.get("summary") in TRANSIENT_SUMMARIES for item in feed)
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class FeedCache:
+    """
+    Response cache for computed feeds.
+    - Fresh (age < fresh_ttl): served directly.
+    - Stale (age < stale_ttl): served instantly while one background refresh runs.
+    - Missing/expired: computed once; concurrent identical requests wait for that
+      single run instead of re-running the pipeline (single-flight).
+    - Degraded results are returned to their callers but never replace a cached
+      feed, and are only fresh for degraded_ttl.
+    """
+
+    def __init__(self, fresh_ttl=None, stale_ttl=None, max_entries=None, refresh_workers=None, degraded_ttl=None):
+        self.fresh_ttl = Config.FEED_FRESH_TTL if fresh_ttl is None else fresh_ttl
+        self.stale_ttl = Config.FEED_STALE_TTL if stale_ttl is None else stale_ttl
+        self.degraded_ttl = Config.FEED_DEGRADED_TTL if degraded_ttl is None else degraded_ttl
+        self.max_entries = max_entries or Config.FEED_CACHE_MAX_ENTRIES
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._inflight = {}
+        self._tasks = {}  # key -> asyncio.Task (async callers)
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(
+            max_workers=refresh_workers or Config.FEED_REFRESH_WORKERS, thread_name_prefix="feed-refresh"
+        )
+        self._counters = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+            "refreshes": 0, "prefetches": 0, "errors": 0, "degraded": 0
+        }
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns (value, status) where status is one of
+        'hit', 'stale', 'miss' (this call computed it) or 'coalesced'.
+        Errors from compute() propagate to every waiting caller and are never cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = time.time() - stored_at
+                if age < self.fresh_ttl:
+                    self._counters["hits"] += 1
+                    self._entries.move_to_end(key)
+                    return value, "hit"
+                if age < self.stale_ttl:
+                    self._counters["stale_hits"] += 1
+                    self._entries.move_to_end(key)
+                    self._schedule_refresh(key, compute)
+                    return value, "stale"
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._counters["misses"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if leader:
+            self._run(key, flight, compute)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value, "miss" if leader else "coalesced"
+
+    async def aget_or_compute(self, key, acompute):
+        """
+        asyncio version of get_or_compute: acompute() is a coroutine function.
+        Waiters await the leader's task instead of blocking a thread.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = time.time() - stored_at
+                if age < self.fresh_ttl:
+                    self._counters["hits"] += 1
+                    self._entries.move_to_end(key)
+                    return value, "hit"
+                if age < self.stale_ttl:
+                    self._counters["stale_hits"] += 1
+                    self._entries.move_to_end(key)
+                    if key not in self._tasks and key not in self._inflight:
+                        self._counters["refreshes"] += 1
+                        self._start_task(key, acompute).add_done_callback(self._consume_error)
+                    return value, "stale"
+
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = self._start_task(key, acompute)
+                self._counters["misses"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        # shield: one caller disconnecting must not cancel the run for the others
+        value = await asyncio.shield(task)
+        return value, "miss" if leader else "coalesced"
+
+    def _start_task(self, key, acompute):
+        # Caller holds the lock
+        task = self._tasks[key] = asyncio.ensure_future(self._arun(key, acompute))
+        return task
+
+    async def _arun(self, key, acompute):
+        try:
+            value = await acompute()
+            self.put(key, value)
+            return value
+        except Exception:
+            with self._lock:
+                self._counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._tasks.pop(key, None)
+
+    @staticmethod
+    def _consume_error(task):
+        # Background refreshes have no awaiter; read the error so asyncio doesn't warn
+        if not task.cancelled():
+            task.exception()
+
+    def _schedule_refresh(self, key, compute):
+        # Caller holds the lock. At most one refresh per key at a time.
+        if key in self._inflight:
+            return False
+        flight = self._inflight[key] = _Flight()
+        self._counters["refreshes"] += 1
+        self._refresher.submit(self._run, key, flight, compute)
+        return True
+
+    def warm(self, key, compute, on_done=None, executor=None):
+        """
+        Computes `key` in the background (on `executor`, else the refresh pool)
+        unless it is already fresh or in flight.
+        Returns True if a run was scheduled; on_done() is called once it finishes.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] < self.fresh_ttl:
+                return False
+            if key in self._inflight:
+                return False
+            flight = self._inflight[key] = _Flight()
+            self._counters["prefetches"] += 1
+
+        def run():
+            try:
+                self._run(key, flight, compute)
+            finally:
+                if on_done is not None:
+                    on_done()
+
+        (executor or self._refresher).submit(run)
+        return True
+
+    def _run(self, key, flight, compute):
+        try:
+            flight.value = compute()
+            self.put(key, flight.value)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._counters["errors"] += 1
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def put(self, key, value):
+        """Stores a computed feed. Returns False if a degraded one was not stored."""
+        now = time.time()
+        with self._lock:
+            if is_degraded(value):
+                self._counters["degraded"] += 1
+                entry = self._entries.get(key)
+                if entry is not None and not is_degraded(entry[0]) and now - entry[1] < self.stale_ttl:
+                    return False  # Keep serving the last good feed (stale) while refreshes retry
+                # Backdated so it turns stale (and gets recomputed) after degraded_ttl
+                now -= max(self.fresh_ttl - self.degraded_ttl, 0)
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def peek(self, key, allow_stale=False):
+        """Cached value without computing anything (None if missing/expired)."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = time.time() - entry[1]
+        limit = self.stale_ttl if allow_stale else self.fresh_ttl
+        return entry[0] if age < limit else None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["in_flight"] = len(self._inflight) + len(self._tasks)
+        served = stats["hits"] + stats["stale_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round((stats["hits"] + stats["stale_hits"] + stats["coalesced"]) / served, 3) if served else 0.0
+        return stats
+
+
+# --- GLOBAL INSTANCE ---
+feed_cache = FeedCache()
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import time
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from backend.config import Config
+
+
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After only up to HTTP_MAX_RETRY_AFTER seconds."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, Config.HTTP_MAX_RETRY_AFTER)
+
+
+class PooledHttpClient:
+    """
+    Shared, thread-safe HTTP client on one requests.Session.
+    Keeps keep-alive connection pools per host, uses separate connect/read
+    timeouts, and retries transient failures with exponential backoff.
+    A server's Retry-After is honoured up to HTTP_MAX_RETRY_AFTER seconds, or
+    ignored with respect_retry_after=False, so it can't park a worker.
+    """
+
+    def __init__(self, retries, connect_timeout, read_timeout, pool_hosts=None, pool_per_host=None,
+                 backoff=None, user_agent=None, respect_retry_after=True):
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = _CappedRetry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=Config.HTTP_BACKOFF if backoff is None else backoff,
+            status_forcelist=(500, 502, 503, 504),  # 429s are handled by key rotation instead
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=respect_retry_after,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_hosts or Config.HTTP_POOL_HOSTS,
+            pool_maxsize=pool_per_host or Config.HTTP_POOL_PER_HOST,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def get_capped(self, url, max_bytes, headers=None):
+        """
+        Streams a page body, keeping at most `max_bytes` and giving up on reading
+        after connect+read timeout seconds in total (so a huge or trickling page
+        can't stall a worker). Returns (response, decoded text).
+        """
+        budget = sum(self.timeout)
+        started = time.monotonic()
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as res:
+            chunks, size = [], 0
+            if res.status_code != 304:
+                for chunk in res.iter_content(chunk_size=16384):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= max_bytes or time.monotonic() - started > budget:
+                        break
+            body = b"".join(chunks)[:max_bytes]
+
+        return res, body.decode(res.encoding or "utf-8", errors="replace")
+
+
+class AsyncResponse:
+    """The parts of a finished aiohttp response the pipeline needs."""
+
+    def __init__(self, status_code, headers, body=b"", encoding=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class AsyncPooledHttpClient:
+    """
+    asyncio counterpart of PooledHttpClient on one aiohttp.ClientSession.
+    The session (and its keep-alive pools) is created lazily on the running
+    event loop. Transient failures are retried with the same exponential backoff.
+    """
+
+    RETRY_STATUSES = (500, 502, 503, 504)
+
+    def __init__(self, retries, connect_timeout, read_timeout, pool_hosts=None, pool_per_host=None,
+                 backoff=None, user_agent=None):
+        self.retries = retries
+        self.backoff = Config.HTTP_BACKOFF if backoff is None else backoff
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.budget = connect_timeout + read_timeout
+        self.pool_total = (pool_hosts or Config.HTTP_POOL_HOSTS) * (pool_per_host or Config.HTTP_POOL_PER_HOST)
+        self.pool_per_host = pool_per_host or Config.HTTP_POOL_PER_HOST
+        self.headers = {"User-Agent": user_agent} if user_agent else {}
+        self._session = None
+        self._loop = None
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_total, limit_per_host=self.pool_per_host)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, headers=self.headers)
+            self._loop = loop
+        return self._session
+
+    async def _request(self, url, read, **kwargs):
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * (2 ** (attempt - 1)))
+            try:
+                async with self._get_session().get(url, **kwargs) as res:
+                    if res.status in self.RETRY_STATUSES and attempt < self.retries:
+                        continue
+                    return await read(res)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                last_error = e
+        raise last_error or aiohttp.ClientError(f"GET {url} kept failing")
+
+    async def get(self, url, **kwargs):
+        async def read(res):
+            return AsyncResponse(res.status, res.headers, await res.read(), res.charset)
+        return await self._request(url, read, **kwargs)
+
+    async def get_capped(self, url, max_bytes, headers=None):
+        """Same contract as PooledHttpClient.get_capped. Returns (response, decoded text)."""
+        async def read(res):
+            started = time.monotonic()
+            chunks, size = [], 0
+            if res.status != 304:
+                async for chunk in res.content.iter_chunked(16384):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= max_bytes or time.monotonic() - started > self.budget:
+                        break
+            response = AsyncResponse(res.status, res.headers, b"".join(chunks)[:max_bytes], res.charset)
+            return response, response.text
+        return await self._request(url, read, headers=headers)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+# --- GLOBAL INSTANCES ---
+# NewsAPI: patient, a few retries
+api_http = PooledHttpClient(
+    retries=Config.HTTP_RETRIES,
+    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.NEWS_API_READ_TIMEOUT
+)
+# Article pages: one quick retry; the scrape deadline matters more than any single page
+scrape_http = PooledHttpClient(
+    retries=1,
+    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.SCRAPE_READ_TIMEOUT,
+    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
+    respect_retry_after=False
+)
+
+# asyncio pipeline (app.workflows.graph.async_app)
+async_api_http = AsyncPooledHttpClient(
+    retries=Config.HTTP_RETRIES,
+    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.NEWS_API_READ_TIMEOUT
+)
+async_scrape_http = AsyncPooledHttpClient(
+    retries=1,
+    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.SCRAPE_READ_TIMEOUT,
+    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
+)
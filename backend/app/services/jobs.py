@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from backend.config import Config
+from backend.app.database.kv_store import KVStore
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting for a worker."""
+
+
+class Job:
+    def __init__(self, job_id, key):
+        self.job_id = job_id
+        self.key = key
+        self.status = "queued"  # queued -> running -> done | failed
+        self.error = None
+        self.subscribers = 1  # How many submissions were coalesced into this run
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "subscribers": self.subscribers,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobManager:
+    """
+    Runs long pipeline jobs on a bounded background pool.
+    Identical in-flight submissions (same key) share one run.
+    Results go to a local SQLite store and expire after `ttl` seconds.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, ttl=None):
+        self.max_pending = max_pending or Config.JOB_MAX_PENDING
+        self.ttl = Config.JOB_RESULT_TTL if ttl is None else ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.JOB_WORKERS, thread_name_prefix="job"
+        )
+        self._results = KVStore("jobs.db", ttl=self.ttl)
+        self._jobs = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn):
+        """
+        Queues fn() unless an identical job is already queued/running.
+        Returns (job, coalesced).
+        """
+        with self._lock:
+            self._expire()
+            existing = self._jobs.get(self._inflight.get(key))
+            if existing is not None:
+                existing.subscribers += 1
+                return existing, True
+
+            pending = sum(1 for j in self._jobs.values() if j.status in ("queued", "running"))
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs already pending")
+
+            job = Job(uuid.uuid4().hex, key)
+            self._jobs[job.job_id] = job
+            self._inflight[key] = job.job_id
+
+        self._executor.submit(self._run, job, fn)
+        return job, False
+
+    def _run(self, job, fn):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            result = fn()
+            job.finished_at = time.time()
+            # Store the result (with its final status) before flipping to "done",
+            # so a poller never sees "done" without a result to fetch.
+            final = {**job.to_dict(), "status": "done"}
+            self._results.put(job.job_id, json.dumps({"job": final, "result": result}))
+            job.status = "done"
+        except Exception as e:
+            print(f"❌ [Jobs] Job {job.job_id[:8]} failed: {e}")
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = "failed"
+        finally:
+            with self._lock:
+                if self._inflight.get(job.key) == job.job_id:
+                    del self._inflight[job.key]
+
+    def _expire(self):
+        # Caller holds the lock. Finished jobs are forgotten after the result TTL.
+        cutoff = time.time() - self.ttl
+        for job_id in [jid for jid, j in self._jobs.items() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Job status dict, or None if unknown/expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.to_dict()
+        stored = self._results.get(job_id)
+        return json.loads(stored)["job"] if stored else None
+
+    def result(self, job_id):
+        stored = self._results.get(job_id)
+        return json.loads(stored)["result"] if stored else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {"jobs": counts, "coalesced": sum(j.subscribers - 1 for j in self._jobs.values())}
+
+
+# --- GLOBAL INSTANCE ---
+job_manager = JobManager()
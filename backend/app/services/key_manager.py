@@ -1,26 +1,398 @@
+import asyncio
+import re
+import threading
+import time
+from collections import deque
 from backend.config import Config
+from backend.app.services.metrics import metrics
 
 
-# --- GROQ KEY MANAGER (Existing) ---
+def _parse_duration(value):
+    """Parses Groq reset headers like '7.66s', '2m59.56s', '1h2m3s' or '120ms' into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)  # retry-after is plain seconds
+    except ValueError:
+        pass
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = re.findall(r"([\d.]+)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+class _Bucket:
+    """
+    One Groq rate-limit window (requests or tokens) for a single key.
+    Between responses we assume a linear refill up to `limit` at `reset_at`.
+    """
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.observed_at = 0.0
+        self.reset_at = 0.0
+
+    def update(self, limit, remaining, reset_in, now):
+        if limit is not None:
+            self.limit = limit
+        if remaining is None:
+            return
+        self.remaining = remaining
+        self.observed_at = now
+        self.reset_at = now + (reset_in or 0.0)
+
+    def available(self, now):
+        if self.remaining is None:
+            return None  # Unknown until we have seen a response
+        if now >= self.reset_at:
+            return self.limit  # Window fully refilled
+        if self.limit is None:
+            return self.remaining
+        window = self.reset_at - self.observed_at
+        refilled = (self.limit - self.remaining) * (now - self.observed_at) / window if window > 0 else 0
+        return min(self.limit, self.remaining + refilled)
+
+    def consume(self, amount, now):
+        current = self.available(now)
+        if current is None:
+            return
+        # Re-anchor the estimate at "now". With no open window, let the
+        # optimistic debit decay over a second so concurrent callers spread out.
+        self.remaining = max(0.0, current - amount)
+        if self.reset_at <= now:
+            self.reset_at = now + 1.0
+        self.observed_at = now
+
+    def headroom(self, now):
+        current = self.available(now)
+        if current is None or not self.limit:
+            return 1.0
+        return current / self.limit
+
+
+class _KeyState:
+    def __init__(self, key):
+        self.key = key
+        self.requests = _Bucket()
+        self.tokens = _Bucket()
+        self.parked_until = 0.0
+
+
+# --- GROQ KEY SCHEDULER ---
 class GroqKeyManager:
+    """
+    Thread-safe scheduler over all configured Groq keys.
+    Per-key request/token buckets are learned from Groq's x-ratelimit-* headers.
+    acquire() hands out the key with the most headroom; keys that hit a 429
+    are parked until their reset time instead of being retried blindly.
+    """
+
     def __init__(self):
         self.keys = getattr(Config, "GROQ_API_KEYS", [])
         # Fallback for legacy single key
         if not self.keys and getattr(Config, "GROQ_API_KEY", None):
             self.keys = [Config.GROQ_API_KEY]
         self.current_index = 0
+        self._states = {key: _KeyState(key) for key in self.keys}
+        self._cond = threading.Condition()
+        self._async_waiters = set()  # (loop, asyncio.Event) of coroutines in aacquire()
+
+    def _state(self, key):
+        # Keys may be swapped at runtime (tests, reloads); create state lazily
+        if key not in self._states:
+            self._states[key] = _KeyState(key)
+        return self._states[key]
+
+    def _pick(self, now, tokens):
+        """Returns (best key or None, seconds until some key frees up). Caller holds the lock."""
+        best, best_score, wait = None, -1.0, None
+        for offset in range(len(self.keys)):
+            # Scan from the current key so equal scores keep using it
+            idx = (self.current_index + offset) % len(self.keys)
+            state = self._state(self.keys[idx])
+
+            if state.parked_until > now:
+                ready_in = state.parked_until - now
+            else:
+                req_left = state.requests.available(now)
+                tok_left = state.tokens.available(now)
+                if req_left is not None and req_left < 1:
+                    ready_in = max(state.requests.reset_at - now, 0.05)
+                elif tok_left is not None and tok_left < tokens:
+                    ready_in = max(state.tokens.reset_at - now, 0.05)
+                else:
+                    score = min(state.requests.headroom(now), state.tokens.headroom(now))
+                    if score > best_score:
+                        best, best_score = idx, score
+                    continue
+            wait = ready_in if wait is None else min(wait, ready_in)
+        return best, wait
+
+    def acquire(self, tokens=0, timeout=None):
+        """
+        Reserves capacity on the key with the most remaining headroom.
+        Blocks up to `timeout` seconds (Config.GROQ_MAX_WAIT) while every key is parked.
+        Returns None if nothing frees up in time.
+        """
+        if not self.keys:
+            return None
+        timeout = Config.GROQ_MAX_WAIT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                key, wait = self._take(now, tokens)
+                if key is not None:
+                    return key
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+                self._cond.wait(min(wait or remaining, remaining))
+
+    async def aacquire(self, tokens=0, timeout=None):
+        """
+        asyncio version of acquire(): waits on the event loop instead of a thread.
+        Woken by new rate-limit headers or a parked key, otherwise sleeps until
+        the earliest refill.
+        """
+        if not self.keys:
+            return None
+        timeout = Config.GROQ_MAX_WAIT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    key, wait = self._take(now, tokens)
+                    if key is not None:
+                        return key
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return None
+                    waiter[1].clear()
+                    self._async_waiters.add(waiter)
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), min(wait or remaining, remaining))
+                except asyncio.TimeoutError:
+                    pass  # A bucket refilled (or the deadline passed); re-check
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+
+    def _take(self, now, tokens):
+        """Reserves capacity on the best key: (key or None, seconds until one frees up). Caller holds the lock."""
+        idx, wait = self._pick(now, tokens)
+        if idx is None:
+            return None, wait
+        state = self._state(self.keys[idx])
+        state.requests.consume(1, now)
+        state.tokens.consume(tokens, now)
+        self.current_index = idx
+        return state.key, None
+
+    def _notify(self):
+        # Caller holds the lock. Wakes blocked threads and awaiting coroutines.
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # That loop is closed; its waiter is gone
+
+    def record_headers(self, key, headers):
+        """Learns the key's current limits from a Groq response."""
+        if key is None or headers is None:
+            return
+        now = time.monotonic()
 
+        def num(name):
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        with self._cond:
+            state = self._state(key)
+            state.requests.update(
+                num("x-ratelimit-limit-requests"),
+                num("x-ratelimit-remaining-requests"),
+                _parse_duration(headers.get("x-ratelimit-reset-requests")),
+                now
+            )
+            state.tokens.update(
+                num("x-ratelimit-limit-tokens"),
+                num("x-ratelimit-remaining-tokens"),
+                _parse_duration(headers.get("x-ratelimit-reset-tokens")),
+                now
+            )
+            self._notify()
+
+    def report_rate_limited(self, key, headers=None):
+        """Parks a key that answered 429 until Groq says it resets."""
+        if key is None:
+            return
+        now = time.monotonic()
+        cooldown = None
+        if headers is not None:
+            self.record_headers(key, headers)
+            cooldown = _parse_duration(headers.get("retry-after"))
+            if cooldown is None:
+                resets = [
+                    _parse_duration(headers.get("x-ratelimit-reset-requests")),
+                    _parse_duration(headers.get("x-ratelimit-reset-tokens"))
+                ]
+                resets = [r for r in resets if r]
+                cooldown = min(resets) if resets else None
+        cooldown = cooldown or Config.GROQ_DEFAULT_COOLDOWN
+
+        with self._cond:
+            state = self._state(key)
+            state.parked_until = max(state.parked_until, now + cooldown)
+            position = self.keys.index(key) + 1 if key in self.keys else "?"
+            print(f"🅿️ [Groq] Key #{position} rate limited. Parked for {cooldown:.1f}s.")
+            self._notify()
+        metrics.key_rotations.inc(provider="groq", reason="rate_limited")
+
+    def retry_after(self):
+        """Seconds until some key can take a request again (0 if one can now)."""
+        if not self.keys:
+            return Config.GROQ_DEFAULT_COOLDOWN
+        with self._cond:
+            idx, wait = self._pick(time.monotonic(), 0)
+        if idx is not None:
+            return 0.0
+        return wait if wait is not None else Config.GROQ_DEFAULT_COOLDOWN
+
+    def headroom(self):
+        """Best remaining fraction (0..1) across keys that are not parked."""
+        now = time.monotonic()
+        with self._cond:
+            scores = [
+                min(s.requests.headroom(now), s.tokens.headroom(now))
+                for s in (self._state(k) for k in self.keys) if s.parked_until <= now
+            ]
+        return max(scores) if scores else 0.0
+
+    def token_budget(self):
+        """
+        Most tokens any unparked key can spend right now.
+        None when that's unknown (no limits reported yet, or every key is parked
+        and will come back with a full window).
+        """
+        now = time.monotonic()
+        with self._cond:
+            budgets = [
+                s.tokens.available(now)
+                for s in (self._state(k) for k in self.keys) if s.parked_until <= now
+            ]
+        if not budgets or any(b is None for b in budgets):
+            return None
+        return max(budgets)
+
+    def status(self):
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "key": f"...{key[-4:]}",
+                    "parked_for": round(max(0.0, self._state(key).parked_until - now), 1),
+                    "requests_left": self._state(key).requests.available(now),
+                    "tokens_left": self._state(key).tokens.available(now)
+                }
+                for key in self.keys
+            ]
+
+    # --- Legacy API (kept for scripts that still rotate by hand) ---
     def get_active_key(self):
         if not self.keys:
             return None
         return self.keys[self.current_index]
 
-    def switch_key(self):
+    def switch_key(self, failed_key=None):
+        """Parks the failed (or current) key and moves to the best remaining one."""
         if not self.keys:
             return None
-        self.current_index = (self.current_index + 1) % len(self.keys)
-        print(f"🔄 [Groq] Rate Limit Hit. Switching to Key #{self.current_index + 1}...")
-        return self.keys[self.current_index]
+        self.report_rate_limited(failed_key or self.get_active_key())
+        with self._cond:
+            idx, _ = self._pick(time.monotonic(), 0)
+            if idx is not None:
+                self.current_index = idx
+            return self.keys[self.current_index]
+
+
+class GroqSlots:
+    """
+    Process-wide cap on Groq requests in flight, shared by threads and asyncio
+    tasks. Threads block on a Condition; coroutines await a future that
+    release() resolves on their own loop, so neither side polls. A released
+    slot goes to a waiting coroutine first, then to a waiting thread.
+    """
+
+    def __init__(self, limit):
+        self._free = limit
+        self._cond = threading.Condition()
+        self._async_waiters = deque()  # (loop, future), first come first served
+
+    def acquire(self, blocking=True, timeout=None):
+        with self._cond:
+            if not blocking:
+                timeout = 0
+            if not self._cond.wait_for(lambda: self._free > 0, timeout):
+                return False
+            self._free -= 1
+            return True
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._free > 0:
+                self._free -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._async_waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._cond:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()  # The slot was handed over just before the cancel
+            raise
+
+    def release(self):
+        with self._cond:
+            while self._async_waiters:
+                loop, future = self._async_waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                except RuntimeError:
+                    continue  # That loop is closed
+            self._free += 1
+            self._cond.notify()
+
+    def _hand_over(self, future):
+        # Runs on the waiter's loop
+        if future.cancelled():
+            self.release()  # Gave up after being picked; pass the slot on
+        else:
+            future.set_result(None)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
 
 
 # --- NEWSAPI KEY MANAGER (New) ---
@@ -36,6 +408,33 @@ class NewsKeyManager:
 
         self.current_index = 0
 
+        # Requests made per key today (NewsAPI quotas reset daily, UTC)
+        self._day = None
+        self._used = {}
+        self._lock = threading.Lock()
+
+    def record_request(self, key):
+        with self._lock:
+            self._roll_day()
+            self._used[key] = self._used.get(key, 0) + 1
+
+    def headroom(self):
+        """Fraction (0..1) of today's request quota left across all keys."""
+        if not self.keys:
+            return 0.0
+        total = Config.NEWS_API_DAILY_LIMIT * len(self.keys)
+        with self._lock:
+            self._roll_day()
+            used = sum(self._used.get(k, 0) for k in self.keys)
+        return max(0.0, 1.0 - used / total)
+
+    def _roll_day(self):
+        # Caller holds the lock
+        today = time.gmtime().tm_yday
+        if today != self._day:
+            self._day = today
+            self._used = {}
+
     def get_active_key(self):
         if not self.keys:
             print("❌ [KeyManager] Critical Error: No NewsAPI Keys configured!")
@@ -47,9 +446,11 @@ class NewsKeyManager:
             return None
         self.current_index = (self.current_index + 1) % len(self.keys)
         print(f"🔄 [NewsAPI] Limit Hit. Switching to Key #{self.current_index + 1}...")
+        metrics.key_rotations.inc(provider="newsapi", reason="rate_limited")
         return self.keys[self.current_index]
 
 
 # --- GLOBAL INSTANCES ---
 groq_keys = GroqKeyManager()
+groq_slots = GroqSlots(Config.LLM_MAX_INFLIGHT)  # Max Groq requests in flight
 news_keys = NewsKeyManager()  # Import this into ingestion.py
\ No newline at end of file
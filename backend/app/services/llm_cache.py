@@ -0,0 +1,101 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from backend.config import Config
+from backend.app.database.kv_store import KVStore
+from backend.app.services.metrics import metrics
+
+
+class LLMCache:
+    """
+    Memoizes Groq responses shared by FactExtractor and NewsCompressor.
+    Tier 1 is an in-process LRU, tier 2 a SQLite store that survives restarts.
+    Both expire entries after `ttl` seconds.
+    Values are stored as JSON, so every hit hands back a fresh copy.
+    """
+
+    def __init__(self, capacity=None, ttl=None, enabled=None):
+        self.capacity = capacity or Config.LLM_CACHE_SIZE
+        self.enabled = Config.LLM_CACHE_ENABLED if enabled is None else enabled
+        self.ttl = Config.LLM_CACHE_TTL if ttl is None else ttl
+        self._memory = OrderedDict()  # key -> (raw JSON, expires_at)
+        self._lock = threading.Lock()
+        self._store = KVStore("llm_cache.db", ttl=self.ttl, max_entries=self.capacity * 20)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model, messages, temperature=None, target_topic=None):
+        """Stable hash of everything that changes the completion."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "topic": target_topic},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            raw, expires_at = self._memory.get(key, (None, 0.0))
+            if raw is not None and expires_at <= now:
+                del self._memory[key]
+                raw = None
+            if raw is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+        if raw is not None:
+            metrics.cache_events.inc(cache="llm", result="memory_hit")
+            return json.loads(raw)
+
+        entry = self._store.get_entry(key)
+        raw = entry[0] if entry else None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, raw, entry[1] + self.ttl)
+        metrics.cache_events.inc(cache="llm", result="miss" if raw is None else "disk_hit")
+        return None if raw is None else json.loads(raw)
+
+    def put(self, key, value, ttl=None):
+        """
+        Stores a response for `ttl` seconds (the cache's TTL by default).
+        A shorter ttl keeps the entry in memory only.
+        """
+        if not self.enabled:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        raw = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, raw, time.time() + ttl)
+        if ttl >= self.ttl:
+            self._store.put(key, raw)
+
+    def _remember(self, key, raw, expires_at):
+        # Caller holds the lock
+        self._memory[key] = (raw, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
+
+
+# --- GLOBAL INSTANCE ---
+llm_cache = LLMCache()
@@ -0,0 +1,100 @@
+import math
+from groq import RateLimitError
+from backend.config import Config
+from backend.app.services.key_manager import groq_keys, groq_slots
+from backend.app.services.registry import resources
+from backend.app.services.metrics import metrics
+
+
+class GroqCapacityError(Exception):
+    """Raised when every Groq key stays rate limited past the scheduler's wait budget."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds until some key frees up
+
+
+def retry_after_header(error):
+    """Retry-After value (whole seconds) for a capacity error surfaced to a client."""
+    seconds = getattr(error, "retry_after", None)
+    return str(max(1, math.ceil(seconds if seconds else Config.GROQ_DEFAULT_COOLDOWN)))
+
+
+def _require_keys():
+    # A missing key is a setup problem, not a capacity one: callers fall back to
+    # their error placeholders instead of answering 429 forever.
+    if not groq_keys.keys:
+        raise RuntimeError("No Groq API keys configured (GROQ_API_KEY)")
+
+
+def estimate_prompt_tokens(messages, max_completion=512):
+    # ~4 characters per token, plus room for the reply
+    return sum(len(m.get("content", "")) for m in messages) // 4 + max_completion
+
+
+def chat_completion(messages, model, **kwargs):
+    """
+    Runs one chat completion on the key with the most headroom.
+    Rate-limit headers feed the scheduler; a 429 parks that key and retries
+    on another one, at most Config.GROQ_MAX_RETRIES times.
+    """
+    _require_keys()
+    tokens = estimate_prompt_tokens(messages, kwargs.get("max_tokens") or 512)
+    last_error = None
+
+    for _ in range(Config.GROQ_MAX_RETRIES + 1):
+        key = groq_keys.acquire(tokens=tokens)
+        if key is None:
+            break
+
+        # Long-lived per-key client (keep-alive pool survives across calls)
+        client = resources.groq_client(key)
+        try:
+            with groq_slots, metrics.span("groq", metrics.call_seconds, call="groq", target=model):
+                raw = client.chat.completions.with_raw_response.create(
+                    messages=messages, model=model, **kwargs
+                )
+            groq_keys.record_headers(key, raw.headers)
+            completion = raw.parse()
+            metrics.record_llm_usage(key, model, getattr(completion, "usage", None))
+            return completion
+        except RateLimitError as e:
+            groq_keys.report_rate_limited(key, e.response.headers)
+            last_error = e
+
+    raise GroqCapacityError(f"429: All Groq keys are rate limited ({last_error or 'no key available'})",
+                            retry_after=groq_keys.retry_after())
+
+
+# --- ASYNC ---
+async def achat_completion(messages, model, **kwargs):
+    """ asyncio version of chat_completion (same scheduling, retries and errors). """
+    _require_keys()
+    tokens = estimate_prompt_tokens(messages, kwargs.get("max_tokens") or 512)
+    last_error = None
+
+    for _ in range(Config.GROQ_MAX_RETRIES + 1):
+        key = await groq_keys.aacquire(tokens=tokens)
+        if key is None:
+            break
+
+        client = resources.async_groq_client(key)
+        try:
+            await groq_slots.aacquire()
+            try:
+                with metrics.span("groq", metrics.call_seconds, call="groq", target=model):
+                    raw = await client.chat.completions.with_raw_response.create(
+                        messages=messages, model=model, **kwargs
+                    )
+            finally:
+                groq_slots.release()
+            groq_keys.record_headers(key, raw.headers)
+            completion = await raw.parse()  # AsyncAPIResponse.parse() is a coroutine
+            metrics.record_llm_usage(key, model, getattr(completion, "usage", None))
+            return completion
+        except RateLimitError as e:
+            groq_keys.report_rate_limited(key, e.response.headers)
+            last_error = e
+
+    raise GroqCapacityError(f"429: All Groq keys are rate limited ({last_error or 'no key available'})",
+                            retry_after=groq_keys.retry_after())
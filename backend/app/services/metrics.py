@@ -0,0 +1,161 @@
+import asyncio
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Spans of the current request when tracing is on (None otherwise).
+# Worker threads must be started with contextvars.copy_context() to report into it.
+_trace = contextvars.ContextVar("sigma_trace", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {round(series[-2], 6)}")
+                lines.append(f"{self.name}_count{_label_text(self.labels, key)} {series[-1]}")
+        return lines
+
+
+class Metrics:
+    """
+    In-process metrics for the pipeline, rendered in Prometheus text format
+    by /api/metrics. span() also feeds the optional per-request trace.
+    """
+
+    def __init__(self):
+        self.node_seconds = Histogram("sigma_node_seconds", "Pipeline node latency.", ["node"])
+        self.call_seconds = Histogram("sigma_call_seconds", "Outbound call latency.", ["call", "target"])
+        self.llm_tokens = Counter("sigma_llm_tokens_total", "Groq tokens used.", ["key", "model", "type"])
+        self.scrape_bytes = Counter("sigma_scrape_bytes_total", "Article bytes downloaded.", ["domain"])
+        self.scrape_seconds = Histogram("sigma_scrape_seconds", "Article download latency.", ["domain"])
+        self.cache_events = Counter("sigma_cache_events_total", "Cache lookups by outcome.", ["cache", "result"])
+        self.key_rotations = Counter("sigma_key_rotations_total", "API key rotations/parks.", ["provider", "reason"])
+        self._all = [
+            self.node_seconds, self.call_seconds, self.llm_tokens, self.scrape_bytes,
+            self.scrape_seconds, self.cache_events, self.key_rotations
+        ]
+
+    @contextmanager
+    def span(self, name, histogram=None, **labels):
+        """Times the block into `histogram` (if given) and the active trace."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if histogram is not None:
+                histogram.observe(elapsed, **labels)
+            trace = _trace.get()
+            if trace is not None:
+                trace.append({"span": name, "ms": round(elapsed * 1000, 1), **labels})
+
+    def timed_node(self, node):
+        """Decorator for LangGraph nodes (sync or async)."""
+        def wrap(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_node(state):
+                    with self.span(f"node:{node}", self.node_seconds, node=node):
+                        return await fn(state)
+                return async_node
+
+            @functools.wraps(fn)
+            def node_fn(state):
+                with self.span(f"node:{node}", self.node_seconds, node=node):
+                    return fn(state)
+            return node_fn
+        return wrap
+
+    def record_llm_usage(self, key, model, usage):
+        if usage is None:
+            return
+        label = f"...{key[-4:]}" if key else "none"
+        self.llm_tokens.inc(getattr(usage, "prompt_tokens", 0) or 0, key=label, model=model, type="prompt")
+        self.llm_tokens.inc(getattr(usage, "completion_tokens", 0) or 0, key=label, model=model, type="completion")
+
+    def render(self):
+        lines = []
+        for metric in self._all:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    # --- Per-request trace ---
+    @staticmethod
+    @contextmanager
+    def tracing(enabled=True):
+        """Collects the spans recorded inside the block into the yielded list."""
+        if not enabled:
+            yield None
+            return
+        spans = []
+        token = _trace.set(spans)
+        try:
+            yield spans
+        finally:
+            _trace.reset(token)
+
+
+# --- GLOBAL INSTANCE ---
+metrics = Metrics()
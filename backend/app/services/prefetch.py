@@ -0,0 +1,94 @@
+import base64
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from backend.config import Config
+from backend.app.services.feed_cache import feed_cache
+
+
+class InvalidCursor(ValueError):
+    """Raised when a feed cursor can't be decoded."""
+
+
+def encode_cursor(category, query, page):
+    """Opaque token for one feed page (clients just echo it back)."""
+    raw = json.dumps({"c": category or "", "q": query or "", "p": page}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Cursor -> (category, query, page)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        page = int(data["p"])
+        if page < 1:
+            raise ValueError("page must be >= 1")
+        return str(data["c"]), str(data["q"]), page
+    except Exception as e:
+        raise InvalidCursor(f"Bad feed cursor: {e}") from e
+
+
+class FeedPrefetcher:
+    """
+    Warms upcoming feed pages into feed_cache after a page is served.
+    Each client may have at most `per_client` pages warming at once and the
+    whole process at most `max_pending`; anything over the cap is skipped
+    (that page is simply computed on demand if it is ever requested).
+    Pages warm on their own small pool, so prefetching never delays the
+    feed cache's stale-while-revalidate refreshes.
+    """
+
+    def __init__(self, per_client=None, max_pending=None, workers=None):
+        self.per_client = per_client or Config.FEED_PREFETCH_PER_CLIENT
+        self.max_pending = max_pending or Config.FEED_PREFETCH_MAX_PENDING
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or Config.FEED_PREFETCH_WORKERS, thread_name_prefix="feed-prefetch"
+        )
+        self._pending = {}  # client -> pages currently warming
+        self._lock = threading.Lock()
+        self._counters = {"scheduled": 0, "skipped_warm": 0, "throttled": 0}
+
+    def prefetch(self, client, pages):
+        """
+        pages: [(cache_key, compute), ...] in the order they should warm.
+        Returns how many were scheduled.
+        """
+        scheduled = 0
+        for key, compute in pages:
+            with self._lock:
+                if (self._pending.get(client, 0) >= self.per_client
+                        or sum(self._pending.values()) >= self.max_pending):
+                    self._counters["throttled"] += 1
+                    break
+                self._pending[client] = self._pending.get(client, 0) + 1
+
+            if feed_cache.warm(key, compute, on_done=lambda: self._release(client), executor=self._executor):
+                scheduled += 1
+                with self._lock:
+                    self._counters["scheduled"] += 1
+            else:
+                # Already fresh or being computed - nothing to do for this page
+                self._release(client)
+                with self._lock:
+                    self._counters["skipped_warm"] += 1
+        return scheduled
+
+    def _release(self, client):
+        with self._lock:
+            left = self._pending.get(client, 0) - 1
+            if left > 0:
+                self._pending[client] = left
+            else:
+                self._pending.pop(client, None)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["pending"] = sum(self._pending.values())
+            stats["clients"] = len(self._pending)
+        return stats
+
+
+# --- GLOBAL INSTANCE ---
+feed_prefetcher = FeedPrefetcher()
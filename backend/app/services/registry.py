@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from groq import Groq, AsyncGroq
+from backend.app.services.key_manager import groq_keys
+
+
+class ResourceRegistry:
+    """
+    Process-wide home for long-lived, thread-safe objects (pipeline components
+    and Groq clients). Each is built once on first use and then borrowed by
+    every request. Groq clients are cached per key, so a key switch just picks
+    another warm client; clients of keys that leave the key list are closed.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._groq = {}         # key -> Groq
+        self._async_groq = {}   # (event loop, key) -> AsyncGroq; its HTTP pool belongs to that loop
+        self._lock = threading.Lock()
+        self._constructions = {}
+
+    def register(self, name, factory):
+        """factory() builds the shared instance the first time get(name) is called."""
+        with self._lock:
+            self._factories[name] = factory
+
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            # Re-check: another thread may have built it while we waited
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+                self._count(name)
+            return self._instances[name]
+
+    def groq_client(self, key):
+        client = self._groq.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            self._drop_retired_keys()
+            if key not in self._groq:
+                # The key scheduler decides when to retry, so the SDK must not back off on its own
+                self._groq[key] = Groq(api_key=key, max_retries=0)
+                self._count("groq_client")
+            return self._groq[key]
+
+    def async_groq_client(self, key):
+        loop = asyncio.get_running_loop()
+        client = self._async_groq.get((loop, key))
+        if client is not None:
+            return client
+        with self._lock:
+            self._drop_retired_keys()
+            for stale in [k for k in self._async_groq if k[0].is_closed()]:
+                del self._async_groq[stale]
+            if (loop, key) not in self._async_groq:
+                self._async_groq[(loop, key)] = AsyncGroq(api_key=key, max_retries=0)
+                self._count("async_groq_client")
+            return self._async_groq[(loop, key)]
+
+    def _drop_retired_keys(self):
+        # Caller holds the lock. Keys can be swapped at runtime (reloads, tests).
+        active = set(groq_keys.keys)
+        for key in [k for k in self._groq if k not in active]:
+            self._groq.pop(key).close()
+        for loop_key in [k for k in self._async_groq if k[1] not in active]:
+            del self._async_groq[loop_key]
+
+    def _count(self, name):
+        # Caller holds the lock
+        self._constructions[name] = self._constructions.get(name, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "constructions": dict(self._constructions),
+                "groq_clients": len(self._groq),
+                "async_groq_clients": len(self._async_groq)
+            }
+
+
+# --- GLOBAL INSTANCE ---
+resources = ResourceRegistry()
@@ -0,0 +1,151 @@
+import json
+import math
+import threading
+import time
+from backend.config import Config
+from backend.app.database.kv_store import KVStore
+from backend.app.services.key_manager import groq_keys, news_keys
+from backend.app.services.feed_cache import is_degraded
+
+
+class _CategoryState:
+    def __init__(self, category):
+        self.category = category
+        self.demand = 0.0  # Decayed request count (half-life = SCHEDULER_MAX_INTERVAL)
+        self.demand_at = time.time()
+        self.next_run_at = 0.0  # Run everything once at startup
+        self.last_run_at = None
+        self.last_duration = None
+        self.interval = None
+        self.runs = 0
+        self.failures = 0
+
+    def decayed_demand(self, now):
+        half_life = max(Config.SCHEDULER_MAX_INTERVAL, 1)
+        return self.demand * math.pow(0.5, (now - self.demand_at) / half_life)
+
+
+class FeedScheduler:
+    """
+    Background thread that recomputes page 1 of each configured category feed
+    and writes it to a persistent feed store, so category requests are lookups.
+    - Busier categories refresh more often (between min and max interval).
+    - Low NewsAPI/Groq headroom stretches every interval; failures back off.
+    - Categories run one at a time to keep quota use predictable.
+    """
+
+    def __init__(self, categories=None, min_interval=None, max_interval=None, tick=None):
+        self.categories = list(categories or Config.SCHEDULER_CATEGORIES)
+        self.min_interval = min_interval or Config.SCHEDULER_MIN_INTERVAL
+        self.max_interval = max_interval or Config.SCHEDULER_MAX_INTERVAL
+        self.tick = tick or Config.SCHEDULER_TICK
+        self._states = {c: _CategoryState(c) for c in self.categories}
+        self._store = KVStore("feeds.db", ttl=Config.FEED_STORE_TTL)
+        self._compute = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, compute):
+        """compute(category) -> feed items. Idempotent: only the first call starts the thread."""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._compute = compute
+            self._thread = threading.Thread(target=self._loop, name="feed-scheduler", daemon=True)
+            self._thread.start()
+        print(f"⏰ [Scheduler] Precomputing {len(self.categories)} category feeds.")
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def record_hit(self, category):
+        """Counts one user request for a category (drives its refresh rate)."""
+        state = self._states.get((category or "").strip().lower())
+        if state is None:
+            return
+        now = time.time()
+        with self._lock:
+            state.demand = state.decayed_demand(now) + 1
+            state.demand_at = now
+
+    def lookup(self, category):
+        """Stored feed for a category as (feed, computed_at), or None."""
+        category = (category or "").strip().lower()
+        if category not in self._states:
+            return None
+        stored = self._store.get(category)
+        if stored is None:
+            return None
+        data = json.loads(stored)
+        return data["feed"], data["computed_at"]
+
+    def _interval(self, state, now):
+        # Traffic: idle categories sit at max_interval, each recent request pulls it down
+        interval = self.max_interval / (1.0 + state.decayed_demand(now))
+        interval = max(self.min_interval, min(self.max_interval, interval))
+
+        # Quota: with 10% headroom left a refresh happens 10x less often
+        quota = min(news_keys.headroom(), groq_keys.headroom())
+        interval /= max(quota, 0.1)
+
+        # Failures: exponential backoff, capped at 8x
+        return interval * min(2 ** state.failures, 8)
+
+    def _due(self, now):
+        with self._lock:
+            due = [s for s in self._states.values() if s.next_run_at <= now]
+        # Most requested first
+        return sorted(due, key=lambda s: s.decayed_demand(now), reverse=True)
+
+    def _run(self, state):
+        started = time.time()
+        try:
+            feed = self._compute(state.category)
+            # An empty or degraded feed usually means an upstream hiccup; keep the old one
+            healthy = not is_degraded(feed)
+            if healthy:
+                self._store.put(state.category, json.dumps({"feed": feed, "computed_at": started}))
+            state.failures = 0 if healthy else state.failures + 1
+        except Exception as e:
+            print(f"❌ [Scheduler] '{state.category}' refresh failed: {e}")
+            state.failures += 1
+
+        now = time.time()
+        with self._lock:
+            state.runs += 1
+            state.last_run_at = started
+            state.last_duration = round(now - started, 2)
+            state.interval = round(self._interval(state, now), 1)
+            state.next_run_at = now + state.interval
+
+    def _loop(self):
+        while not self._stop.is_set():
+            for state in self._due(time.time()):
+                if self._stop.is_set():
+                    return
+                self._run(state)
+            self._stop.wait(self.tick)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "categories": {
+                    s.category: {
+                        "demand": round(s.decayed_demand(now), 2),
+                        "interval": s.interval,
+                        "next_run_in": round(max(0.0, s.next_run_at - now), 1),
+                        "last_duration": s.last_duration,
+                        "runs": s.runs,
+                        "failures": s.failures
+                    }
+                    for s in self._states.values()
+                }
+            }
+
+
+# --- GLOBAL INSTANCE ---
+feed_scheduler = FeedScheduler()
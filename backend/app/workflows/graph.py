@@ -1,7 +1,10 @@
 import sys
 import os
 import time
-from typing import TypedDict, List, Literal
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait, FIRST_COMPLETED
+from typing import TypedDict, List, Literal, Optional
 
 # --- PATH SETUP ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
@@ -9,10 +12,24 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.
 # --- IMPORTS ---
 from backend.app.core.ingestion import NewsIngestor
 from backend.app.core.clustering import NewsClustertizer
+from backend.app.core.story_index import get_story_index
 from backend.app.core.extraction import FactExtractor
-from backend.app.core.compression import NewsCompressor
+from backend.app.core.compression import NewsCompressor, CAPACITY_SUMMARY
+from backend.app.core.conflict import ConflictResolver
+from backend.app.core.reduction import ContentReducer, estimate_tokens
+from backend.app.core.article_store import ArticleBatch
+from backend.app.core.dedup import NearDuplicateFilter
+from backend.app.services.registry import resources
+from backend.app.services.llm_client import GroqCapacityError
+from backend.app.services.metrics import metrics
+from backend.config import Config
 from langgraph.graph import StateGraph, END
 
+try:
+    from langgraph.config import get_stream_writer
+except ImportError:  # Older langgraph: no custom stream events
+    get_stream_writer = None
+
 
 # --- 1. STATE DEFINITION ---
 class AgentState(TypedDict):
@@ -20,17 +37,44 @@ class AgentState(TypedDict):
     category: str
     page: int
     mode: Literal["search", "feed"]
-    raw_articles: List[dict]
-    clustered_feed: List[dict]
+    articles: Optional[ArticleBatch]  # This run's articles; the two lists below hold row ids into it
+    raw_articles: List[int]
+    clustered_feed: List[int]
+    clusters: List[List[int]]  # Per story: lead row first, then the other outlets' rows
     feed_items: List[dict]
 
 
+def _stream_writer():
+    """
+    Emits custom events when the graph runs via .stream(stream_mode="custom").
+    A no-op under .invoke(). Only call the writer from the node's own thread.
+    """
+    if get_stream_writer is None:
+        return lambda _event: None
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda _event: None
+
+
+# --- SHARED PIPELINE COMPONENTS ---
+# Built once per process and borrowed by every request (all are thread-safe)
+resources.register("ingestor", NewsIngestor)
+resources.register("clusterer", lambda: NewsClustertizer(similarity_threshold=0.45))
+resources.register("extractor", FactExtractor)
+resources.register("compressor", NewsCompressor)
+resources.register("reducer", ContentReducer)
+resources.register("deduper", NearDuplicateFilter)
+resources.register("resolver", ConflictResolver)
+
+
 # --- 2. NODE: SMART INGESTION (ROBUST FIX) ---
+@metrics.timed_node("ingest")
 def node_ingest(state: AgentState):
     print(
         f"\n📡 [News Engine] Fetching {state['mode']} for '{state['query'] or state['category']}' (Page {state['page']})...")
 
-    ingestor = NewsIngestor()
+    ingestor = resources.get("ingestor")
 
     articles = ingestor.fetch_articles(
         query=state["query"],
@@ -41,13 +85,76 @@ def node_ingest(state: AgentState):
     # Debug: See if API actually returned anything
     print(f"   🔎 API returned {len(articles)} raw headers. Scraping content...")
 
-    processed = []
+    candidates, scrape_urls, copies = _ingest_candidates(state, articles)
+
+    # 1. Try to scrape the full live websites (concurrently, order preserved)
+    scraped = ingestor.scrape_many(scrape_urls)
+
+    # Paywalled or blocked page: scrape the next syndicated copy of the story instead
+    retry = _next_copies(candidates, scrape_urls, copies, scraped)
+    while retry:
+        for pos, text in zip(retry, ingestor.scrape_many([scrape_urls[pos] for pos in retry])):
+            scraped[pos] = text
+        retry = _next_copies(candidates, scrape_urls, copies, scraped)
+
+    return _ingested(candidates, scrape_urls, scraped)
+
+
+@metrics.timed_node("ingest")
+async def anode_ingest(state: AgentState):
+    print(
+        f"\n📡 [News Engine] Fetching {state['mode']} for '{state['query'] or state['category']}' (Page {state['page']})...")
+
+    ingestor = resources.get("ingestor")
+    articles = await ingestor.afetch_articles(
+        query=state["query"],
+        category=state["category"],
+        page=state["page"]
+    )
+    print(f"   🔎 API returned {len(articles)} raw headers. Scraping content...")
+
+    candidates, scrape_urls, copies = _ingest_candidates(state, articles)
+    scraped = await ingestor.ascrape_many(scrape_urls)
+
+    retry = _next_copies(candidates, scrape_urls, copies, scraped)
+    while retry:
+        for pos, text in zip(retry, await ingestor.ascrape_many([scrape_urls[pos] for pos in retry])):
+            scraped[pos] = text
+        retry = _next_copies(candidates, scrape_urls, copies, scraped)
+
+    return _ingested(candidates, scrape_urls, scraped)
+
+
+def _ingest_candidates(state, articles):
+    """(articles to scrape, URL to scrape for each, fallback copies for each)."""
     limit = 15 if (state["category"] == "all" or state["mode"] == "search") else 10
+    if Config.DEDUP_ENABLED:
+        # Syndicated copies are skipped before they cost a scrape (kept as fallbacks)
+        articles, scrape_urls, copies = resources.get("deduper").prefilter(articles)
+        return articles[:limit], scrape_urls[:limit], copies[:limit]
+    articles = articles[:limit]
+    return articles, [art["url"] for art in articles], [[] for _ in articles]
+
+
+def _next_copies(candidates, scrape_urls, copies, scraped):
+    if not Config.DEDUP_ENABLED:
+        return []
+    return resources.get("deduper").next_copies(candidates, scrape_urls, copies, scraped)
+
+
+def _ingested(candidates, scrape_urls, scraped):
+    batch = _merge_scraped(candidates, scraped)
+    if not Config.DEDUP_ENABLED:
+        return {"articles": batch, "raw_articles": batch.ids()}
+
+    deduper = resources.get("deduper")
+    deduper.remember(candidates, scrape_urls, scraped)
+    return {"articles": batch, "raw_articles": deduper.unique_rows(batch, batch.ids())}
 
-    for art in articles[:limit]:
-        # 1. Try to scrape the full live website
-        scraped_text = ingestor.scrape_full_content(art["url"])
 
+def _merge_scraped(candidates, scraped):
+    processed = ArticleBatch()
+    for art, scraped_text in zip(candidates, scraped):
         # 2. FALLBACK LOGIC (The Fix):
         # If scraping failed (blocked) or text is too short, use the API description.
         # This ensures 'India' and 'World' news always show up.
@@ -61,61 +168,319 @@ def node_ingest(state: AgentState):
             else:
                 continue  # Skip only if we truly have ZERO text
 
-        processed.append({
-            "title": art.get("title"),
-            "url": art.get("url"),
-            "source": art.get("source", {}).get("name"),
-            "image": art.get("urlToImage"),
-            "content": content,
-            "description": art.get("description", "")
-        })
+        processed.append(
+            title=art.get("title"),
+            url=art.get("url"),
+            source=art.get("source", {}).get("name"),
+            image=art.get("urlToImage"),
+            content=content,
+            description=art.get("description", "")
+        )
 
-    return {"raw_articles": processed}
+    return processed
 
 
 # --- 3. NODE: CLUSTERING ---
+@metrics.timed_node("cluster")
 def node_cluster(state: AgentState):
     if not state["raw_articles"]:
-        return {"clustered_feed": []}
+        return {"clustered_feed": [], "clusters": []}
 
     print(f"🧩 [Clustering] Grouping {len(state['raw_articles'])} raw articles...")
 
-    clusterer = NewsClustertizer(similarity_threshold=0.45)
-    clusters = clusterer.group_articles(state["raw_articles"])
+    clusterer = resources.get("clusterer")
+    batch = state["articles"]
+    articles = batch.refs(state["raw_articles"])
+
+    if Config.CLUSTERING_MODE == "incremental":
+        # Match against persistent story centroids -> stable story IDs across requests
+        story_ids = get_story_index().assign(articles)
+        groups = {}
+        for article, story_id in zip(articles, story_ids):
+            batch.set_story_id(article.id, story_id)
+            groups.setdefault(story_id, []).append(article)
+        clusters = list(groups.values())
+    else:
+        clusters = clusterer.group_articles(articles)
+
     unique_stories = clusterer.get_lead_articles(clusters)
 
     print(f"   📉 Reduced to {len(unique_stories)} unique stories.")
 
-    return {"clustered_feed": unique_stories}
+    return {
+        "clustered_feed": [article.id for article in unique_stories],
+        "clusters": [_story_rows(lead, group) for lead, group in zip(unique_stories, clusters)]
+    }
+
+
+def _story_rows(lead, group):
+    # Lead first, then the other outlets with the most text (for consolidation)
+    others = sorted((a for a in group if a.id != lead.id), key=lambda a: a.content_length(), reverse=True)
+    return [lead.id] + [a.id for a in others[:max(Config.CONSOLIDATE_TOP_K - 1, 0)]]
+
+
+async def anode_cluster(state: AgentState):
+    # CPU-bound (TF-IDF / story index); run it off the event loop (timed by node_cluster itself)
+    return await asyncio.to_thread(node_cluster, state)
 
 
 # --- 4. NODE: FOCUSED PROCESSING ---
+@metrics.timed_node("process")
 def node_process_feed(state: AgentState):
-    items_to_process = state.get("clustered_feed", [])
+    items_to_process = _lead_articles(state)
     print(f"📰 [News Engine] Analyzing {len(items_to_process)} unique stories...")
 
-    extractor = FactExtractor()
-    compressor = NewsCompressor()
+    extractor = resources.get("extractor")
+    compressor = resources.get("compressor")
+    batch = state["articles"]
+
+    contents = _reduced_contents(items_to_process)
+    members = _consolidation_members(state)
+    expires_at = time.monotonic() + Config.CONSOLIDATE_BUDGET
+
+    # Lead batches (a few JSON-mode requests instead of one per story) and the
+    # other outlets start right away, on their own pool so a story worker never
+    # waits for a slot held by another story. Leads are queued first.
+    extract_pool = ThreadPoolExecutor(max_workers=max(1, Config.PROCESS_WORKERS), thread_name_prefix="extract")
+    lead_jobs = None
+    if Config.EXTRACT_BATCHING and len(items_to_process) > 1:
+        lead_jobs = extractor.submit_facts_batch(extract_pool, contents)
+    others = {
+        idx: extract_pool.submit(contextvars.copy_context().run, _member_facts, extractor, batch, rows)
+        for idx, rows in members.items()
+    }
+
+    capacity_errors = []
+
+    def process_story(idx, article):
+        try:
+            # 1. Extract Facts (this story's batch has already answered when batching)
+            facts = lead_jobs[idx].result()[idx] if lead_jobs else extractor.extract_facts(contents[idx])
+            sources = None
+            if idx in others:
+                answered = _wait_member_facts(others[idx], expires_at, article)
+                facts, sources = _consolidate_story(batch, members[idx], facts, answered)
+
+            # 2. Generate Summary (starts as soon as this story's facts arrive)
+            summary = compressor.generate_summary(article["title"], facts)
+        except GroqCapacityError as e:
+            return _capacity_item(article, e, capacity_errors)
+
+        return _feed_item(article, summary, facts, sources)
+
+    # Each finished story is streamed immediately (with its feed position)
+    emit = _stream_writer()
+    final_feed = [None] * len(items_to_process)
+
+    # Stories are independent network I/O, so fan them out. Groq concurrency is
+    # still capped process-wide by groq_slots (Config.LLM_MAX_INFLIGHT).
+    workers = min(Config.PROCESS_WORKERS, len(items_to_process))
+    try:
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="process") as pool:
+                waiting = dict(enumerate(items_to_process))
+                running = {}
+                while waiting or running:
+                    # A story takes a worker once its batch has answered (at once without batching)
+                    for idx in [i for i in waiting if lead_jobs is None or lead_jobs[i].done()]:
+                        running[pool.submit(contextvars.copy_context().run, process_story, idx, waiting.pop(idx))] = idx
+                    done, _ = wait(set(running) | {lead_jobs[idx] for idx in waiting}, return_when=FIRST_COMPLETED)
+                    for future in done & running.keys():
+                        idx = running.pop(future)
+                        final_feed[idx] = future.result()
+                        emit({"event": "story", "index": idx, "story": final_feed[idx]})
+        else:
+            for idx, article in enumerate(items_to_process):
+                final_feed[idx] = process_story(idx, article)
+                emit({"event": "story", "index": idx, "story": final_feed[idx]})
+    finally:
+        extract_pool.shutdown(wait=False, cancel_futures=True)
+
+    _check_capacity(final_feed, capacity_errors)
+    return {"feed_items": final_feed}
 
-    final_feed = []
 
-    for article in items_to_process:
-        # 1. Extract Facts
-        facts = extractor.extract_facts(article["content"])
+@metrics.timed_node("process")
+async def anode_process_feed(state: AgentState):
+    items_to_process = _lead_articles(state)
+    print(f"📰 [News Engine] Analyzing {len(items_to_process)} unique stories...")
 
-        # 2. Generate Summary
-        summary = compressor.generate_summary(article["title"], facts)
+    extractor = resources.get("extractor")
+    compressor = resources.get("compressor")
+    batch = state["articles"]
+
+    contents = await asyncio.to_thread(_reduced_contents, items_to_process)
+    members = _consolidation_members(state)
+    expires_at = time.monotonic() + Config.CONSOLIDATE_BUDGET
+
+    lead_jobs = None
+    if Config.EXTRACT_BATCHING and len(items_to_process) > 1:
+        lead_jobs = await extractor.asubmit_facts_batch(contents)
+    others = {idx: asyncio.ensure_future(_amember_facts(extractor, batch, rows)) for idx, rows in members.items()}
+
+    emit = _stream_writer()
+    final_feed = [None] * len(items_to_process)
+    # Coroutines are cheap; PROCESS_WORKERS only bounds how many stories are mid-flight
+    slots = asyncio.Semaphore(max(1, Config.PROCESS_WORKERS))
+
+    capacity_errors = []
+
+    async def process_story(idx, article):
+        try:
+            # A story still waiting for its batch holds no slot
+            facts = (await lead_jobs[idx])[idx] if lead_jobs else None
+            async with slots:
+                if lead_jobs is None:
+                    facts = await extractor.aextract_facts(contents[idx])
+                sources = None
+                if idx in others:
+                    answered = await _await_member_facts(others[idx], expires_at, article)
+                    facts, sources = _consolidate_story(batch, members[idx], facts, answered)
+                summary = await compressor.agenerate_summary(article["title"], facts)
+            final_feed[idx] = _feed_item(article, summary, facts, sources)
+        except GroqCapacityError as e:
+            final_feed[idx] = _capacity_item(article, e, capacity_errors)
+        emit({"event": "story", "index": idx, "story": final_feed[idx]})
+
+    stories = [asyncio.ensure_future(process_story(idx, article)) for idx, article in enumerate(items_to_process)]
+    try:
+        await asyncio.gather(*stories)
+    finally:
+        # If a story fails (or the request is cancelled), stop the rest instead of
+        # leaving them and their extraction requests running on Groq quota
+        for task in [*stories, *(lead_jobs or {}).values(), *others.values()]:
+            task.cancel()
+
+    _check_capacity(final_feed, capacity_errors)
+    return {"feed_items": final_feed}
 
-        final_feed.append({
-            "title": article["title"],
-            "summary": summary,
-            "source": article["source"],
-            "url": article["url"],
-            "image": article["image"],
-            "facts": facts
-        })
 
-    return {"feed_items": final_feed}
+# --- CROSS-SOURCE CONSOLIDATION ---
+# A story with several outlets also extracts facts from its other outlets
+# and merges them with the lead's through the ConflictResolver. The outlets
+# start with the process node and get CONSOLIDATE_BUDGET seconds, the lead
+# extraction included; later ones are dropped and the story keeps the lead's
+# facts. A story only ever waits for its own lead batch and its own outlets.
+def _consolidation_members(state):
+    """{story index: rows (lead first)} for the stories that have other outlets to check."""
+    if not Config.CONSOLIDATE_ENABLED:
+        return {}
+    members = {idx: rows for idx, rows in enumerate(state.get("clusters") or []) if len(rows) > 1}
+    if members:
+        print(f"🤝 [Consolidation] Cross-checking {sum(len(rows) - 1 for rows in members.values())} extra sources "
+              f"for {len(members)} stories...")
+    return members
+
+
+def _member_facts(extractor, batch, rows):
+    """{member index: facts} for a story's other outlets (one batched request)."""
+    return extractor.extract_facts_batch(_reduced_contents(batch.refs(rows[1:]), quiet=True))
+
+
+async def _amember_facts(extractor, batch, rows):
+    texts = await asyncio.to_thread(_reduced_contents, batch.refs(rows[1:]), True)
+    return await extractor.aextract_facts_batch(texts)
+
+
+def _wait_member_facts(future, expires_at, article):
+    try:
+        return future.result(timeout=max(expires_at - time.monotonic(), 0))
+    except TimeoutError:
+        future.cancel()
+        print(f"   ⏱️ Consolidation budget ({Config.CONSOLIDATE_BUDGET}s) hit for "
+              f"'{article['title'][:40]}'. Keeping the lead's facts only.")
+    except Exception as e:
+        # The other outlets are a bonus; the story still has its lead's facts
+        print(f"   ⚠️ [Consolidation] Skipped for '{article['title'][:40]}': {e}")
+    return None
+
+
+async def _await_member_facts(task, expires_at, article):
+    done, _ = await asyncio.wait({task}, timeout=max(expires_at - time.monotonic(), 0))
+    if not done:
+        task.cancel()
+        print(f"   ⏱️ Consolidation budget ({Config.CONSOLIDATE_BUDGET}s) hit for "
+              f"'{article['title'][:40]}'. Keeping the lead's facts only.")
+        return None
+    if task.exception() is not None:
+        print(f"   ⚠️ [Consolidation] Skipped for '{article['title'][:40]}': {task.exception()}")
+        return None
+    return task.result()
+
+
+def _consolidate_story(batch, rows, lead_facts, answered):
+    """(facts, sources checked) for one story, merging whichever outlets answered in time."""
+    used = [rows[0]]
+    facts = lead_facts
+    if answered:
+        others = [answered[i] for i in sorted(answered)]
+        used += [rows[1 + i] for i in sorted(answered)]
+        facts = _consolidated_facts(resources.get("resolver").resolve_cluster([lead_facts] + others, refine=True))
+    return facts, [batch[row]["source"] for row in used]
+
+
+def _consolidated_facts(table):
+    """Agreement table -> fact list: corroborated facts first (most sources first), then the lead's own."""
+    agreed = sorted(table["agreements"], key=lambda item: -item["support"])
+    single = sorted(table["unique_facts"], key=lambda item: item["source"])
+    facts = [{**item["facts"][0], "support": item["support"]} for item in agreed]
+    facts += [{**item["facts"][0], "support": 1} for item in single]
+    return facts[:Config.CONSOLIDATE_MAX_FACTS]
+
+
+def _lead_articles(state):
+    ids = state.get("clustered_feed", [])
+    return state["articles"].refs(ids) if ids else []
+
+
+def _reduced_contents(items_to_process, quiet=False):
+    # Local pre-summary: only the most informative sentences reach the LLM.
+    # This is the node's one read of each body: pages are decoded one at a time
+    # and only the reduced text is kept, so one full page is alive at once.
+    if not items_to_process:
+        return []
+    batch = items_to_process[0].batch
+    if not Config.CONTENT_REDUCER_ENABLED:
+        return batch.contents([article.id for article in items_to_process])
+
+    reducer = resources.get("reducer")
+    before = after = 0
+    contents = []
+    for article in items_to_process:
+        text = batch.content(article.id)
+        before += estimate_tokens(text)
+        contents.append(reducer.reduce(text, article["title"]))
+        after += estimate_tokens(contents[-1])
+    if not quiet:
+        print(f"   ✂️ [Reducer] Prompt content {before} -> {after} tokens.")
+    return contents
+
+
+def _capacity_item(article, error, capacity_errors):
+    # Out of Groq quota: this story ships with a placeholder (which keeps the feed
+    # out of the cache) and the stories that did get summarized still go out.
+    capacity_errors.append(error)
+    print(f"   🅿️ Groq capacity exhausted for '{article['title'][:40]}'. Using a placeholder.")
+    return _feed_item(article, CAPACITY_SUMMARY, [])
+
+
+def _check_capacity(feed, capacity_errors):
+    """Raises GroqCapacityError (-> 429 with Retry-After) only if no story got past the quota."""
+    if feed and len(capacity_errors) == len(feed):
+        raise capacity_errors[-1]
+
+
+def _feed_item(article, summary, facts, sources=None):
+    return {
+        "title": article["title"],
+        "summary": summary,
+        "source": article["source"],
+        "url": article["url"],
+        "image": article["image"],
+        "facts": facts,
+        "sources_checked": sources or [article["source"]],
+        "story_id": article.get("story_id")
+    }
 
 
 # --- 5. GRAPH CONSTRUCTION ---
@@ -130,4 +495,18 @@ workflow.add_edge("ingest", "cluster")
 workflow.add_edge("cluster", "process")
 workflow.add_edge("process", END)
 
-app = workflow.compile()
\ No newline at end of file
+app = workflow.compile()
+
+# Same graph on async nodes: run with `await async_app.ainvoke(...)` / `astream(...)`
+async_workflow = StateGraph(AgentState)
+
+async_workflow.add_node("ingest", anode_ingest)
+async_workflow.add_node("cluster", anode_cluster)
+async_workflow.add_node("process", anode_process_feed)
+
+async_workflow.set_entry_point("ingest")
+async_workflow.add_edge("ingest", "cluster")
+async_workflow.add_edge("cluster", "process")
+async_workflow.add_edge("process", END)
+
+async_app = async_workflow.compile()
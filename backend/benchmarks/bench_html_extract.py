@@ -0,0 +1,80 @@
+"""
+Benchmarks the streaming HTML-to-text engine against the original BeautifulSoup scraper.
+
+Usage (from the repo root):
+    python -m backend.benchmarks.bench_html_extract [--corpus DIR] [--repeat N]
+
+DIR holds saved article pages (*.html). Reports per-page speed-up and output parity:
+'parity' compares the fast engine in whole-page mode with BeautifulSoup (1.0 = identical),
+'main overlap' shows how much of its <article>/<p>-focused output BeautifulSoup also produced.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from bs4 import BeautifulSoup
+from backend.app.core.html_text import html_to_text
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "pages")
+
+
+def bs4_text(html, limit=5000):
+    # The original scrape_full_content implementation
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style", "nav", "footer", "iframe"]):
+        script.decompose()
+    text = soup.get_text(separator=' ')
+    return ' '.join(text.split())[:limit]
+
+
+def time_per_call(fn, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def run(corpus, repeat):
+    pages = sorted(glob.glob(os.path.join(corpus, "*.html")))
+    if not pages:
+        print(f"❌ No *.html pages found in {corpus}")
+        return 1
+
+    print(f"\n🏁 HTML extraction benchmark: {len(pages)} pages x {repeat} runs")
+    print(f"{'page':<32}{'KB':>8}{'bs4 ms':>10}{'fast ms':>10}{'speedup':>9}{'parity':>8}{'main overlap':>14}")
+
+    totals = {"bs4": 0.0, "fast": 0.0}
+    for path in pages:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            html = fh.read()
+
+        reference = bs4_text(html)
+        parity = SequenceMatcher(None, reference, html_to_text(html, prefer_main=False), autojunk=False).ratio()
+        focused = html_to_text(html, prefer_main=True)
+        ref_words = set(reference.split())
+        overlap = len(set(focused.split()) & ref_words) / max(len(set(focused.split())), 1)
+
+        bs4_t = time_per_call(bs4_text, html, repeat)
+        fast_t = time_per_call(html_to_text, html, repeat)
+        totals["bs4"] += bs4_t
+        totals["fast"] += fast_t
+
+        print(f"{os.path.basename(path)[:31]:<32}{len(html) / 1024:>8.1f}{bs4_t * 1000:>10.2f}"
+              f"{fast_t * 1000:>10.2f}{bs4_t / fast_t:>8.1f}x{parity:>8.3f}{overlap:>14.3f}")
+
+    print(f"\n✅ Total: bs4 {totals['bs4'] * 1000:.2f} ms, fast {totals['fast'] * 1000:.2f} ms "
+          f"({totals['bs4'] / totals['fast']:.1f}x faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory of saved *.html pages")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per page")
+    args = parser.parse_args()
+    sys.exit(run(args.corpus, args.repeat))
@@ -0,0 +1,236 @@
+"""
+Offline benchmark of the news pipeline against a recorded corpus.
+
+NewsAPI, article pages and Groq are replaced by local stand-ins (see standins.py)
+with configurable latency and 429 injection, so runs are repeatable and free.
+
+Usage (from the repo root):
+    python -m backend.benchmarks.bench_pipeline [--iterations N] [--requests N] [--concurrency N]
+        [--llm-latency MS] [--llm-429-rate P] [--out FILE] [--compare BASELINE.json]
+
+Stages: scraping (scrape_many), clustering (group_articles), conflict resolution
+(resolve_cluster) and end-to-end GET /api/feed. Each reports throughput,
+p50/p95/p99 latency and peak traced memory; /api/feed also reports its per-node
+and per-call spans. Results are written as JSON so two runs can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.benchmarks.standins import StandInServer, StandInConfig, DEFAULT_CORPUS
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples, wall_seconds=None, peak_bytes=None):
+    """Latency samples in seconds -> report dict (milliseconds)."""
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    total = wall_seconds if wall_seconds is not None else sum(samples)
+    return {
+        "count": len(samples),
+        "throughput_per_s": round(len(samples) / total, 3) if total else None,
+        "mean_ms": ms(sum(samples) / len(samples)) if samples else None,
+        "p50_ms": ms(percentile(samples, 50)),
+        "p95_ms": ms(percentile(samples, 95)),
+        "p99_ms": ms(percentile(samples, 99)),
+        "peak_mem_mb": round(peak_bytes / 2 ** 20, 3) if peak_bytes is not None else None
+    }
+
+
+def peak_memory(fn):
+    """Peak Python heap allocated while fn() runs (one extra, traced run)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def time_stage(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, peak_bytes=peak_memory(fn))
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def run(args):
+    standins = StandInServer(args.corpus, StandInConfig(
+        newsapi_latency=args.newsapi_latency, page_latency=args.page_latency, llm_latency=args.llm_latency,
+        newsapi_429_rate=args.newsapi_429_rate, llm_429_rate=args.llm_429_rate
+    ))
+
+    with standins, tempfile.TemporaryDirectory(prefix="sigma-bench-") as data_dir:
+        # Config is read at import time, so the environment must be ready first.
+        # Caches are off so every iteration does the full work.
+        os.environ.update({
+            **standins.env(),
+            "DATA_DIR": data_dir,
+            "NEWS_API_KEY": "bench-news-key",
+            "GROQ_API_KEY": "bench-groq-key-1,bench-groq-key-2",
+            "LLM_CACHE_ENABLED": "false",
+            "SCRAPE_CACHE_TTL": "0",
+            "FEED_FRESH_TTL": "0",
+            "FEED_STALE_TTL": "0",
+            "FEED_PREFETCH_PAGES": "0",
+            "SCHEDULER_ENABLED": "false"
+        })
+
+        from backend.app.core.ingestion import NewsIngestor
+        from backend.app.core.clustering import NewsClustertizer
+        from backend.app.core.conflict import ConflictResolver
+        from backend.app.services.metrics import metrics
+        from backend.main import create_app
+
+        ingestor = NewsIngestor()
+        articles = ingestor.fetch_articles(category="all")
+        urls = [art["url"] for art in articles]
+        print(f"\n🏁 Pipeline benchmark: {len(articles)} corpus articles, {args.iterations} iterations per stage")
+
+        report = {"stages": {}}
+
+        # 1. Scraping
+        report["stages"]["scrape"] = time_stage(lambda: ingestor.scrape_many(urls), args.iterations)
+
+        # 2. Clustering (on scraped text, like node_cluster)
+        scraped = ingestor.scrape_many(urls)
+        raw_articles = [
+            {"title": a["title"], "description": a["description"], "content": text or a["description"]}
+            for a, text in zip(articles, scraped)
+        ]
+        clusterer = NewsClustertizer(similarity_threshold=0.45)
+        report["stages"]["cluster"] = time_stage(lambda: clusterer.group_articles(raw_articles), args.iterations)
+
+        # 3. Conflict resolution (canned facts, one list per source of each cluster)
+        resolver = ConflictResolver()
+        fact_sets = standins.llm["facts"]
+        clusters = clusterer.group_articles(raw_articles)
+        fact_lists = [[fact_sets[(c + s) % len(fact_sets)] for s in range(len(group))] for c, group in enumerate(clusters)]
+        report["stages"]["conflict"] = time_stage(
+            lambda: [resolver.resolve_cluster(lists, refine=True) for lists in fact_lists], args.iterations
+        )
+
+        # 4. End-to-end /api/feed, concurrent clients, with per-node/per-call spans
+        client = create_app().test_client()
+        categories = ["all", "world", "health", "sports", "technology", "business"]
+        spans_by_name = {}
+
+        def one_request(i):
+            with metrics.tracing() as spans:
+                started = time.perf_counter()
+                response = client.get(f"/api/feed?category={categories[i % len(categories)]}&page={1 + i // len(categories)}")
+                elapsed = time.perf_counter() - started
+            return elapsed, response.status_code, spans
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(one_request, range(args.requests)))
+        wall = time.perf_counter() - started
+
+        for _, _, spans in results:
+            for span in spans:
+                name = span["span"] if span["span"].startswith("node:") else f"call:{span.get('call') or span['span']}"
+                spans_by_name.setdefault(name, []).append(span["ms"] / 1000)
+
+        feed = summarize([r[0] for r in results], wall_seconds=wall,
+                         peak_bytes=peak_memory(lambda: one_request(0)))
+        feed["errors"] = sum(1 for r in results if r[1] != 200)
+        feed["concurrency"] = args.concurrency
+        feed["spans"] = {name: summarize(samples) for name, samples in sorted(spans_by_name.items())}
+        for span in feed["spans"].values():
+            span.pop("throughput_per_s")
+            span.pop("peak_mem_mb")
+        report["stages"]["feed"] = feed
+
+        report["run"] = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "requests": args.requests,
+            "standins": standins.config.to_dict(),
+            "standin_requests": dict(standins.requests)
+        }
+
+    print_report(report)
+    return report
+
+
+def print_report(report):
+    print(f"\n{'stage':<22}{'n':>6}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    rows = list(report["stages"].items())
+    rows += [(f"  feed {name}", stats) for name, stats in report["stages"]["feed"].get("spans", {}).items()]
+    for name, stats in rows:
+        fmt = lambda v, spec: format(v, spec) if v is not None else f"{'-':>10}"
+        print(f"{name:<22}{stats['count']:>6}{fmt(stats.get('throughput_per_s'), '>10.2f')}"
+              f"{fmt(stats['p50_ms'], '>10.2f')}{fmt(stats['p95_ms'], '>10.2f')}{fmt(stats['p99_ms'], '>10.2f')}"
+              f"{fmt(stats.get('peak_mem_mb'), '>10.2f')}")
+
+
+def compare(report, baseline):
+    print(f"\n📊 vs baseline ({baseline['run'].get('git')} @ {baseline['run'].get('timestamp')})")
+    print(f"{'stage':<22}{'p50 Δ%':>10}{'p95 Δ%':>10}{'ops/s Δ%':>10}")
+    delta = lambda new, old: f"{(new - old) / old * 100:+.1f}" if new is not None and old else "-"
+    for name, stats in report["stages"].items():
+        old = baseline["stages"].get(name)
+        if old:
+            print(f"{name:<22}{delta(stats['p50_ms'], old['p50_ms']):>10}{delta(stats['p95_ms'], old['p95_ms']):>10}"
+                  f"{delta(stats.get('throughput_per_s'), old.get('throughput_per_s')):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Corpus dir (newsapi/, pages/, llm/)")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed runs per offline stage")
+    parser.add_argument("--requests", type=int, default=24, help="/api/feed requests to send")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent /api/feed clients")
+    parser.add_argument("--newsapi-latency", type=float, default=50.0, help="Stand-in NewsAPI latency (ms)")
+    parser.add_argument("--page-latency", type=float, default=80.0, help="Stand-in article page latency (ms)")
+    parser.add_argument("--llm-latency", type=float, default=400.0, help="Stand-in Groq latency (ms)")
+    parser.add_argument("--newsapi-429-rate", type=float, default=0.0, help="Fraction of NewsAPI calls answered 429")
+    parser.add_argument("--llm-429-rate", type=float, default=0.0, help="Fraction of Groq calls answered 429")
+    parser.add_argument("--out", help="Result JSON path (default: benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument("--compare", help="Earlier result JSON to diff against")
+    args = parser.parse_args()
+
+    result = run(args)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    print(f"\n💾 Results written to {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(result, json.load(fh))
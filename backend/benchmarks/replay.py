@@ -0,0 +1,224 @@
+"""
+Replays captured /api/feed traffic against a local build at N× speed.
+
+Capture it first by running the server with CAPTURE_ENABLED=true (see
+app/services/capture.py). Requests keep their captured spacing, divided by
+--speed. The upstream NewsAPI, page and Groq calls of the local build are
+answered by a stand-in server from the same capture (corpus fallback for
+anything not captured), so a run costs no quota.
+
+Usage (from the repo root):
+    python -m backend.benchmarks.replay CAPTURE_DIR [--day YYYY-MM-DD] [--speed N] [--workers N]
+        [--limit N] [--out FILE] [--compare EARLIER.json]
+
+    # Against a separately started build (HTTP instead of in-process):
+    python -m backend.benchmarks.replay CAPTURE_DIR --serve --port 8765    # terminal 1: stand-ins
+    NEWS_API_BASE_URL=... GROQ_BASE_URL=... python backend/main.py          # terminal 2: the build
+    python -m backend.benchmarks.replay CAPTURE_DIR --target http://127.0.0.1:5000 --speed 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.benchmarks.standins import StandInServer, StandInConfig, RecordedTraffic, DEFAULT_CORPUS
+from backend.benchmarks.bench_pipeline import summarize, percentile, git_revision, compare, RESULTS_DIR
+
+
+def load_capture(directory, day=None):
+    """(feed requests in time order, every record) from a capture dir, optionally one UTC day."""
+    from backend.app.services.capture import TrafficCapture
+
+    records = list(TrafficCapture.read(directory))
+    if day:
+        records = [r for r in records if time.strftime("%Y-%m-%d", time.gmtime(r["t"])) == day]
+    feed = sorted((r for r in records if r["kind"] == "feed"), key=lambda r: r["t"])
+    return feed, records
+
+
+def replay_env(standins, data_dir):
+    # Forced: point the build at the stand-ins, never at real keys, and don't capture the replay.
+    # Tunables (caches, prefetch, workers...) keep whatever the caller's environment says.
+    return {
+        **standins.env(),
+        "DATA_DIR": data_dir,
+        "NEWS_API_KEY": "replay-news-key",
+        "GROQ_API_KEY": "replay-groq-key-1,replay-groq-key-2",
+        "CAPTURE_ENABLED": "false",
+        # Every recorded page is served from one host; don't let the per-host cap serialize them
+        "SCRAPE_PER_HOST_LIMIT": os.getenv("SCRAPE_PER_HOST_LIMIT", os.getenv("SCRAPE_MAX_WORKERS", "8"))
+    }
+
+
+def http_sender(target):
+    import requests
+
+    session = requests.Session()
+
+    def send(params):
+        response = session.get(f"{target.rstrip('/')}/api/feed", params=params, timeout=120)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        return response.status_code, body
+    return send
+
+
+def local_sender():
+    from backend.main import create_app
+
+    client = create_app().test_client()
+
+    def send(params):
+        response = client.get(f"/api/feed?{urlencode(params)}")
+        return response.status_code, response.get_json(silent=True) or {}
+    return send
+
+
+def drive(feed, send, speed, workers):
+    """Fires every captured request at its (scaled) offset. Returns one result dict per request."""
+    t0 = feed[0]["t"]
+    start = time.monotonic()
+    results = [None] * len(feed)
+
+    def fire(idx, due):
+        lag = time.monotonic() - due
+        started = time.perf_counter()
+        try:
+            status, body = send(feed[idx]["request"])
+        except Exception as e:
+            status, body = None, {"error": str(e)}
+        results[idx] = {
+            "ms": (time.perf_counter() - started) * 1000,
+            "lag_ms": max(lag, 0.0) * 1000,
+            "status": status,
+            "cache": body.get("cache"),
+            "stories": len(body.get("feed") or [])
+        }
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="replay") as pool:
+        for idx, event in enumerate(feed):
+            due = start + (event["t"] - t0) / speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, idx, due)
+
+    return results, time.monotonic() - start
+
+
+def report(feed, results, wall, args):
+    latencies = [r["ms"] / 1000 for r in results]
+    replayed = summarize(latencies, wall_seconds=wall)
+    replayed.pop("peak_mem_mb")
+    replayed["errors"] = sum(1 for r in results if r["status"] != 200)
+    replayed["lag_p95_ms"] = round(percentile([r["lag_ms"] for r in results], 95), 3)
+    replayed["cache"] = _tally(r["cache"] for r in results)
+
+    captured_ms = [r["ms"] / 1000 for r in feed if r.get("ms") is not None]
+    span = feed[-1]["t"] - feed[0]["t"]
+    captured = summarize(captured_ms, wall_seconds=span or None)
+    captured.pop("peak_mem_mb")
+    captured["cache"] = _tally(((r.get("response") or {}).get("cache")) for r in feed)
+
+    return {
+        "stages": {"replay": replayed, "captured": captured},
+        "run": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git": git_revision(),
+            "capture": os.path.abspath(args.capture),
+            "day": args.day,
+            "speed": args.speed,
+            "workers": args.workers,
+            "target": args.target or "in-process",
+            "offered_rate_per_s": round(len(feed) / (span / args.speed), 3) if span else None
+        }
+    }
+
+
+def _tally(values):
+    counts = {}
+    for value in values:
+        counts[str(value)] = counts.get(str(value), 0) + 1
+    return counts
+
+
+def print_report(result):
+    run = result["run"]
+    print(f"\n🔁 Replay at {run['speed']}x (offered {run['offered_rate_per_s']} req/s, {run['workers']} workers)")
+    print(f"{'':<10}{'n':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, stats in result["stages"].items():
+        fmt = lambda v: f"{v:>10.2f}" if v is not None else f"{'-':>10}"
+        print(f"{name:<10}{stats['count']:>6}{fmt(stats['throughput_per_s'])}{fmt(stats['p50_ms'])}"
+              f"{fmt(stats['p95_ms'])}{fmt(stats['p99_ms'])}{stats.get('errors', '-'):>8}")
+    print(f"   schedule lag p95: {result['stages']['replay']['lag_p95_ms']} ms")
+    print(f"   cache mix (replay): {result['stages']['replay']['cache']}")
+    print(f"   cache mix (captured): {result['stages']['captured']['cache']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="Capture directory (CAPTURE_DIR of the recording server)")
+    parser.add_argument("--day", help="Only replay this UTC day (YYYY-MM-DD)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time compression factor")
+    parser.add_argument("--workers", type=int, default=32, help="Max concurrent in-flight requests")
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--target", help="Base URL of a running build (default: in-process app)")
+    parser.add_argument("--serve", action="store_true", help="Only run the stand-ins (for --target runs)")
+    parser.add_argument("--port", type=int, default=0, help="Stand-in port (with --serve)")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Fallback corpus for uncaptured requests")
+    parser.add_argument("--out", help="Result JSON path (default: benchmarks/results/replay-<time>.json)")
+    parser.add_argument("--compare", help="Earlier replay JSON to diff against")
+    args = parser.parse_args()
+
+    standins = StandInServer(args.corpus, StandInConfig(), port=args.port)
+    with standins, tempfile.TemporaryDirectory(prefix="sigma-replay-") as data_dir:
+        if not (args.serve or args.target):
+            # Config is read at import time, so the environment must be ready before any backend import
+            os.environ.update(replay_env(standins, data_dir))
+
+        feed, records = load_capture(args.capture, args.day)
+        standins.recorded = RecordedTraffic(records)
+        print(f"📼 Capture: {len(records)} records, {len(feed)} feed requests. "
+              f"Indexed upstream: {standins.recorded.stats()}")
+
+        if args.serve:
+            print("Stand-ins running (Ctrl-C to stop). Start the build with:")
+            for name, value in standins.env().items():
+                print(f"   {name}={value}")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                return
+
+        feed = feed[:args.limit] if args.limit else feed
+        if not feed:
+            sys.exit("No captured /api/feed requests to replay.")
+
+        send = http_sender(args.target) if args.target else local_sender()
+        results, wall = drive(feed, send, args.speed, args.workers)
+        result = report(feed, results, wall, args)
+        result["run"]["standin_requests"] = dict(standins.requests)
+
+    print_report(result)
+    out = args.out or os.path.join(RESULTS_DIR, f"replay-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    print(f"\n💾 Results written to {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(result, json.load(fh))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Local stand-ins for NewsAPI, article sites and the Groq chat API, served from a
+recorded corpus on one threaded HTTP server.
+
+    GET  /v2/top-headlines, /v2/everything  -> corpus/newsapi/<endpoint>.json
+    GET  /pages/<name>                      -> corpus/pages/<name>
+    POST /openai/v1/chat/completions        -> canned replies from corpus/llm/responses.json
+
+Every route can add latency (ms) and answer 429 with a given probability, so
+benchmarks can exercise the key scheduler and retry paths.
+
+Given a RecordedTraffic (from a capture log, see app/services/capture.py), the
+server answers with the captured upstream responses first, at their captured
+latency, and only falls back to the corpus for requests it has not seen:
+
+    GET  /recorded?url=<original article url> -> captured page
+"""
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, quote
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+class StandInConfig:
+    def __init__(self, newsapi_latency=50.0, page_latency=80.0, llm_latency=400.0,
+                 newsapi_429_rate=0.0, llm_429_rate=0.0, seed=7):
+        self.newsapi_latency = newsapi_latency
+        self.page_latency = page_latency
+        self.llm_latency = llm_latency
+        self.newsapi_429_rate = newsapi_429_rate
+        self.llm_429_rate = llm_429_rate
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class RecordedTraffic:
+    """Captured upstream exchanges, indexed by request."""
+
+    def __init__(self, records):
+        self._newsapi = {}  # (endpoint, params) -> cycle of records
+        self._pages = {}    # url -> record
+        self._llm = {}      # hash(model, messages) -> record
+        self._lock = threading.Lock()
+        newsapi = {}
+        for record in records:
+            if "response" not in record:
+                continue
+            request = record["request"]
+            if record["kind"] == "newsapi":
+                newsapi.setdefault(self.newsapi_key(request["endpoint"], request["params"]), []).append(record)
+            elif record["kind"] == "scrape" and record["response"].get("status") != 304:
+                # A 304 has no body; keep the full download of that page instead
+                self._pages[request["url"]] = record
+            elif record["kind"] == "llm":
+                self._llm[self.llm_key(request["model"], request["messages"])] = record
+        # The same query captured at different times is answered in turn
+        self._newsapi = {key: itertools.cycle(found) for key, found in newsapi.items()}
+
+    @staticmethod
+    def newsapi_key(endpoint, params):
+        return endpoint, tuple(sorted((k, str(v)) for k, v in params.items() if k != "apiKey"))
+
+    @staticmethod
+    def llm_key(model, messages):
+        payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def newsapi(self, endpoint, params):
+        found = self._newsapi.get(self.newsapi_key(endpoint, params))
+        if found is None:
+            return None
+        with self._lock:
+            return next(found)
+
+    def page(self, url):
+        return self._pages.get(url)
+
+    def llm(self, model, messages):
+        return self._llm.get(self.llm_key(model, messages))
+
+    def stats(self):
+        return {"newsapi": len(self._newsapi), "pages": len(self._pages), "llm": len(self._llm)}
+
+
+class StandInServer:
+    """Serves the corpus on 127.0.0.1:<free port> from a background thread."""
+
+    def __init__(self, corpus=DEFAULT_CORPUS, config=None, recorded=None, port=0):
+        self.corpus = corpus
+        self.config = config or StandInConfig()
+        self.recorded = recorded
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self.requests = {"newsapi": 0, "page": 0, "llm": 0, "429": 0, "recorded": 0, "unmatched": 0}
+        with open(os.path.join(corpus, "llm", "responses.json"), encoding="utf-8") as fh:
+            self.llm = json.load(fh)
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="standins", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def env(self):
+        """Environment that points the backend at this server."""
+        return {
+            "NEWS_API_BASE_URL": f"{self.base_url}/v2",
+            "GROQ_BASE_URL": self.base_url,
+        }
+
+    def _roll(self, rate):
+        with self._rng_lock:
+            return self._rng.random() < rate
+
+    def _count(self, name):
+        with self._rng_lock:
+            self.requests[name] += 1
+
+    def _replay(self, record, fallback_latency):
+        """Counts a lookup and waits out the captured latency. Returns the record."""
+        if self.recorded is not None:
+            self._count("recorded" if record is not None else "unmatched")
+        latency = record["ms"] if record is not None and record.get("ms") is not None else fallback_latency
+        time.sleep(latency / 1000)
+        return record
+
+    def recorded_newsapi(self, record):
+        # Article links point back here so their pages come from the capture too
+        data = dict(record["response"])
+        if isinstance(data.get("articles"), list):
+            data["articles"] = [
+                {**art, "url": f"{self.base_url}/recorded?url={quote(art.get('url') or '', safe='')}"}
+                for art in data["articles"]
+            ]
+        return json.dumps(data)
+
+    # --- Canned payloads ---
+    def newsapi_payload(self, endpoint):
+        path = os.path.join(self.corpus, "newsapi", f"{endpoint}.json")
+        if not os.path.exists(path):
+            path = os.path.join(self.corpus, "newsapi", "top-headlines.json")
+        with open(path, encoding="utf-8") as fh:
+            return fh.read().replace("{BASE}", self.base_url)
+
+    def llm_reply(self, messages):
+        prompt = messages[-1].get("content", "") if messages else ""
+        facts = self.llm["facts"]
+        pick = sum(map(ord, prompt[:200])) % len(facts)
+        indices = [int(i) for i in re.findall(r"ARTICLE (\d+):", prompt)]
+        if indices:
+            return json.dumps({"results": [{"index": i, "facts": facts[(pick + i) % len(facts)]} for i in indices]})
+        if "key facts" in prompt:
+            return json.dumps({"facts": facts[pick]})
+        return self.llm["summary"]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type="application/json", headers=None):
+                data = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                path, params = parts.path, dict(parse_qsl(parts.query))
+                config = server.config
+                if path.startswith("/v2/"):
+                    server._count("newsapi")
+                    endpoint = path.rsplit("/", 1)[-1]
+                    record = server.recorded.newsapi(endpoint, params) if server.recorded else None
+                    server._replay(record, config.newsapi_latency)
+                    if server._roll(config.newsapi_429_rate):
+                        server._count("429")
+                        return self._send(429, json.dumps({"status": "error", "code": "rateLimited",
+                                                           "message": "Stand-in rate limit"}))
+                    if record is not None:
+                        return self._send(200, server.recorded_newsapi(record))
+                    return self._send(200, server.newsapi_payload(endpoint))
+
+                if path == "/recorded":
+                    server._count("page")
+                    record = server.recorded.page(params.get("url", "")) if server.recorded else None
+                    server._replay(record, config.page_latency)
+                    if record is None:
+                        return self._send(404, "<html><body>Not captured</body></html>", "text/html")
+                    page = record["response"]
+                    headers = {"ETag": page.get("etag"), "Last-Modified": page.get("last_modified")}
+                    return self._send(page.get("status", 200), page.get("html") or "", "text/html; charset=utf-8",
+                                      {k: v for k, v in headers.items() if v})
+
+                if path.startswith("/pages/"):
+                    server._count("page")
+                    time.sleep(config.page_latency / 1000)
+                    page = os.path.join(server.corpus, "pages", os.path.basename(path))
+                    if not os.path.exists(page):
+                        return self._send(404, "<html><body>Not found</body></html>", "text/html")
+                    with open(page, "rb") as fh:
+                        return self._send(200, fh.read(), "text/html; charset=utf-8")
+
+                self._send(404, json.dumps({"error": "unknown route"}))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not urlsplit(self.path).path.endswith("/chat/completions"):
+                    return self._send(404, json.dumps({"error": "unknown route"}))
+
+                server._count("llm")
+                config = server.config
+                request = json.loads(body or b"{}")
+                record = server.recorded.llm(request.get("model"), request.get("messages", [])) \
+                    if server.recorded else None
+                server._replay(record, config.llm_latency)
+                limits = {
+                    "x-ratelimit-limit-requests": "14400", "x-ratelimit-remaining-requests": "14000",
+                    "x-ratelimit-reset-requests": "6s",
+                    "x-ratelimit-limit-tokens": "30000", "x-ratelimit-remaining-tokens": "28000",
+                    "x-ratelimit-reset-tokens": "1s"
+                }
+                if server._roll(config.llm_429_rate):
+                    server._count("429")
+                    return self._send(429, json.dumps({"error": {
+                        "message": "Rate limit reached (stand-in)", "type": "tokens", "code": "rate_limit_exceeded"
+                    }}), headers={**limits, "x-ratelimit-remaining-tokens": "0", "retry-after": "0.2"})
+
+                content = record["response"] if record is not None else server.llm_reply(request.get("messages", []))
+                prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4
+                completion_tokens = len(content) // 4
+                return self._send(200, json.dumps({
+                    "id": "chatcmpl-standin",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stand-in"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens}
+                }), headers=limits)
+
+        return Handler
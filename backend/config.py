@@ -4,8 +4,16 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
+    # --- LOCAL STORAGE ---
+    # Where on-disk caches and stores (SQLite files) live
+    DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
     # --- API KEYS ---
     NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+    # Overridable so benchmarks can point the pipeline at a local stand-in
+    NEWS_API_BASE_URL = os.getenv("NEWS_API_BASE_URL", "https://newsapi.org/v2").rstrip("/")
+    # Requests per NewsAPI key per day (developer plan = 100)
+    NEWS_API_DAILY_LIMIT = int(os.getenv("NEWS_API_DAILY_LIMIT", 100))
 
     # FIX: Read 'GROQ_API_KEY' from .env (since that is what you named it)
     _groq_keys_raw = os.getenv("GROQ_API_KEY", "")
@@ -19,4 +27,170 @@ class Config:
     # --- MODELS ---
     MODEL_REASONING = "llama-3.3-70b-versatile"
     MODEL_SUMMARY = "llama-3.1-8b-instant"
-    MAX_ARTICLES = 5
\ No newline at end of file
+    MAX_ARTICLES = 5
+
+    # Context window (tokens) per model, used to size batched prompts
+    MODEL_CONTEXT_TOKENS = {
+        "llama-3.3-70b-versatile": 131072,
+        "llama-3.1-8b-instant": 131072
+    }
+
+    # --- CONTENT REDUCTION ---
+    # Before extraction each story is cut down (locally, no LLM) to its most
+    # headline-relevant / central sentences, within CONTENT_TOKEN_BUDGET tokens.
+    CONTENT_REDUCER_ENABLED = os.getenv("CONTENT_REDUCER_ENABLED", "true").lower() == "true"
+    CONTENT_TOKEN_BUDGET = int(os.getenv("CONTENT_TOKEN_BUDGET", 350))
+    CONTENT_TITLE_WEIGHT = float(os.getenv("CONTENT_TITLE_WEIGHT", 0.6))
+
+    # --- BATCHED EXTRACTION ---
+    # node_process_feed packs up to EXTRACT_BATCH_MAX articles (each cut to
+    # EXTRACT_BATCH_CHARS) into one JSON-mode request. Batches shrink to fit
+    # the model's context window and the best key's remaining token budget.
+    EXTRACT_BATCHING = os.getenv("EXTRACT_BATCHING", "true").lower() == "true"
+    EXTRACT_BATCH_MAX = int(os.getenv("EXTRACT_BATCH_MAX", 5))
+    EXTRACT_BATCH_CHARS = int(os.getenv("EXTRACT_BATCH_CHARS", 2000))
+
+    # --- GROQ KEY SCHEDULER ---
+    # Max seconds a call waits for a parked key, fallback park time when a 429
+    # carries no reset hint, and retries (on other keys) before giving up.
+    GROQ_MAX_WAIT = float(os.getenv("GROQ_MAX_WAIT", 10.0))
+    GROQ_DEFAULT_COOLDOWN = float(os.getenv("GROQ_DEFAULT_COOLDOWN", 20.0))
+    GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", 3))
+
+    # --- LLM CONCURRENCY ---
+    # Stories processed in parallel by node_process_feed (1 = sequential),
+    # and the hard cap on Groq requests in flight across the whole process.
+    PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS", 4))
+    LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", 4))
+
+    # --- LLM MEMOIZATION ---
+    # Identical prompts (same model/temperature/topic) reuse the stored completion
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 1024))
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 24 * 3600))
+    # Empty fact lists (article rejected, or a bad reply) are retried sooner and never hit disk
+    LLM_CACHE_EMPTY_TTL = int(os.getenv("LLM_CACHE_EMPTY_TTL", 600))
+
+    # --- CLUSTERING ---
+    # "batch" refits TF-IDF per request; "incremental" assigns articles to
+    # persistent stories (stable story IDs across requests and pages).
+    CLUSTERING_MODE = os.getenv("CLUSTERING_MODE", "batch").lower()
+    STORY_INDEX_FEATURES = int(os.getenv("STORY_INDEX_FEATURES", 2048))
+    STORY_INDEX_TTL = int(os.getenv("STORY_INDEX_TTL", 48 * 3600))
+    STORY_INDEX_SAVE_INTERVAL = int(os.getenv("STORY_INDEX_SAVE_INTERVAL", 60))
+
+    # --- CROSS-SOURCE CONSOLIDATION ---
+    # For stories covered by several outlets, facts are also extracted from up
+    # to CONSOLIDATE_TOP_K articles per story (lead included) and merged by the
+    # ConflictResolver; corroborated facts come first in what the summary sees.
+    # Other outlets start with the process node and get CONSOLIDATE_BUDGET
+    # seconds (the lead's own extraction runs in the same window); later ones
+    # are dropped. A story only ever waits for its own outlets.
+    CONSOLIDATE_ENABLED = os.getenv("CONSOLIDATE_ENABLED", "true").lower() == "true"
+    CONSOLIDATE_TOP_K = int(os.getenv("CONSOLIDATE_TOP_K", 3))
+    CONSOLIDATE_BUDGET = float(os.getenv("CONSOLIDATE_BUDGET", 4.0))
+    CONSOLIDATE_MAX_FACTS = int(os.getenv("CONSOLIDATE_MAX_FACTS", 4))
+
+    # --- NEAR-DUPLICATE PREFILTER ---
+    # Syndicated copies (same wire story on several outlets) are caught with
+    # MinHash/LSH before scraping (headline + description) and again before
+    # clustering (body text). DEDUP_THRESHOLD is the estimated Jaccard
+    # similarity that counts as a copy; a copy is still scraped if the first
+    # page comes back too short. Successfully scraped headlines stay in a
+    # rolling index for DEDUP_TTL seconds, so a copy seen in a later request
+    # re-reads the already-scraped original instead of a new page. Kept short:
+    # the copy is served the original's text until the entry ages out.
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))
+    DEDUP_TTL = int(os.getenv("DEDUP_TTL", 1800))
+    DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", 20000))
+
+    # --- SCRAPING ---
+    # Global worker count, per-domain cap and overall deadline (seconds) for
+    # the concurrent scrape stage in node_ingest.
+    SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", 8))
+    SCRAPE_PER_HOST_LIMIT = int(os.getenv("SCRAPE_PER_HOST_LIMIT", 2))
+    SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", 8.0))
+
+    # Bytes read per page before we stop downloading
+    SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", 2 * 1024 * 1024))
+    SCRAPE_READ_TIMEOUT = float(os.getenv("SCRAPE_READ_TIMEOUT", 5.0))
+
+    # "fast" = streaming html.parser tokenizer, "bs4" = full BeautifulSoup parse.
+    # SCRAPE_PREFER_MAIN makes the fast engine keep <article>/<p>-dense text only.
+    SCRAPE_PARSER = os.getenv("SCRAPE_PARSER", "fast").lower()
+    SCRAPE_PREFER_MAIN = os.getenv("SCRAPE_PREFER_MAIN", "true").lower() == "true"
+
+    # Cleaned article text is reused for SCRAPE_CACHE_TTL seconds, then revalidated
+    SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", 3600))
+    SCRAPE_CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    # --- HTTP CLIENT ---
+    # Pooled keep-alive sessions shared by NewsAPI calls and scraping
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+    NEWS_API_READ_TIMEOUT = float(os.getenv("NEWS_API_READ_TIMEOUT", 10.0))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+    HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.3))
+    # A 5xx Retry-After longer than this is clamped (NewsAPI); scraping ignores it
+    HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", 5.0))
+    HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", 32))
+    HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", 8))
+
+    # --- FEED RESPONSE CACHE ---
+    # Fresh feeds are served as-is; stale ones are served instantly while a
+    # single background refresh recomputes them. Degraded feeds (empty, or with
+    # a capacity/error placeholder summary) never replace a cached one and count
+    # as fresh for FEED_DEGRADED_TTL seconds only.
+    FEED_FRESH_TTL = int(os.getenv("FEED_FRESH_TTL", 120))
+    FEED_STALE_TTL = int(os.getenv("FEED_STALE_TTL", 900))
+    FEED_DEGRADED_TTL = int(os.getenv("FEED_DEGRADED_TTL", 15))
+    FEED_CACHE_MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX_ENTRIES", 256))
+    FEED_REFRESH_WORKERS = int(os.getenv("FEED_REFRESH_WORKERS", 2))
+
+    # --- FEED PREFETCH ---
+    # After page N is served, pages N+1..N+k warm in the background (k defaults
+    # to FEED_PREFETCH_PAGES, clients may ask for up to FEED_PREFETCH_MAX_PAGES).
+    # Warming pages are capped per client address and process-wide, and run on
+    # FEED_PREFETCH_WORKERS threads of their own.
+    FEED_PREFETCH_PAGES = int(os.getenv("FEED_PREFETCH_PAGES", 1))
+    FEED_PREFETCH_MAX_PAGES = int(os.getenv("FEED_PREFETCH_MAX_PAGES", 3))
+    FEED_PREFETCH_PER_CLIENT = int(os.getenv("FEED_PREFETCH_PER_CLIENT", 2))
+    FEED_PREFETCH_MAX_PENDING = int(os.getenv("FEED_PREFETCH_MAX_PENDING", 8))
+    FEED_PREFETCH_WORKERS = int(os.getenv("FEED_PREFETCH_WORKERS", 2))
+
+    # --- BACKGROUND JOBS (/api/analyze async mode) ---
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+    JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", 32))
+    JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 3600))
+
+    # --- FEED SCHEDULER ---
+    # Precomputes page 1 of every category feed in the background so /api/feed
+    # only reads the stored result. Each category refreshes between MIN and MAX
+    # interval seconds (busier categories more often), stretched when the
+    # NewsAPI/Groq quota runs low. Stored feeds older than FEED_STORE_TTL are ignored.
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+    SCHEDULER_CATEGORIES = [
+        c.strip().lower() for c in os.getenv(
+            "SCHEDULER_CATEGORIES",
+            "all,india,world,politics,business,technology,health,sports,entertainment"
+        ).split(",") if c.strip()
+    ]
+    SCHEDULER_MIN_INTERVAL = int(os.getenv("SCHEDULER_MIN_INTERVAL", 300))
+    SCHEDULER_MAX_INTERVAL = int(os.getenv("SCHEDULER_MAX_INTERVAL", 3600))
+    SCHEDULER_TICK = float(os.getenv("SCHEDULER_TICK", 15.0))
+    FEED_STORE_TTL = int(os.getenv("FEED_STORE_TTL", 4 * 3600))
+
+    # --- TRAFFIC CAPTURE ---
+    # Opt-in recording of /api/feed requests and the upstream NewsAPI, page and
+    # Groq exchanges they trigger, for replay by benchmarks/replay.py. Records
+    # are gzip-compressed JSON lines in CAPTURE_DIR, written in batches; a file
+    # rotates at CAPTURE_MAX_BYTES and only the newest CAPTURE_MAX_FILES are kept.
+    CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "false").lower() == "true"
+    CAPTURE_DIR = os.getenv("CAPTURE_DIR", os.path.join(DATA_DIR, "capture"))
+    CAPTURE_KINDS = [
+        k.strip().lower() for k in os.getenv("CAPTURE_KINDS", "feed,newsapi,scrape,llm").split(",") if k.strip()
+    ]
+    CAPTURE_MAX_BYTES = int(os.getenv("CAPTURE_MAX_BYTES", 32 * 1024 * 1024))
+    CAPTURE_MAX_FILES = int(os.getenv("CAPTURE_MAX_FILES", 48))
+    CAPTURE_FLUSH_RECORDS = int(os.getenv("CAPTURE_FLUSH_RECORDS", 64))
+    CAPTURE_FLUSH_SECONDS = float(os.getenv("CAPTURE_FLUSH_SECONDS", 5.0))
@@ -19,11 +19,48 @@ def create_app():
 
     return app
 
+
+def create_async_app():
+    """
+    asyncio (aiohttp) server running the async LangGraph pipeline.
+    One event loop keeps many requests in flight without a thread per request.
+    """
+    from aiohttp import web
+    from app.api.async_routes import routes
+    from backend.app.services.http_client import async_api_http, async_scrape_http
+
+    @web.middleware
+    async def cors(request, handler):
+        # Same policy as flask_cors above
+        if request.method == "OPTIONS":
+            response = web.Response()
+        else:
+            response = await handler(request)
+        if request.path.startswith("/api/") and request.headers.get("Origin") == "http://localhost:3000":
+            response.headers["Access-Control-Allow-Origin"] = "http://localhost:3000"
+            response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+        return response
+
+    async def close_http(_app):
+        await async_api_http.close()
+        await async_scrape_http.close()
+
+    async_app = web.Application(middlewares=[cors])
+    async_app.add_routes(routes)
+    async_app.on_cleanup.append(close_http)
+    return async_app
+
+
 app = create_app()
 
 if __name__ == "__main__":
     print("🚀 Starting Sigma Backend Server on port 5000...")
     print("   - Neural Interface: http://127.0.0.1:5000")
-    
+
     # Run on 127.0.0.1 to avoid Windows 'localhost' connection refused bugs
-    app.run(host="127.0.0.1", port=5000, debug=True)
\ No newline at end of file
+    if "--async" in sys.argv:
+        from aiohttp import web
+        print("   - Mode: asyncio (aiohttp)")
+        web.run_app(create_async_app(), host="127.0.0.1", port=5000)
+    else:
+        app.run(host="127.0.0.1", port=5000, debug=True)
\ No newline at end of file
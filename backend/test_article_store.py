@@ -0,0 +1,28 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.app.core.article_store import ArticleBatch
+
+
+def test_get_returns_default_for_unset_fields():
+    batch = ArticleBatch()
+    row = batch.append("Title", "https://example.com/a", "Wire", None, "Body text", None)
+    article = batch[row]
+    assert article.get("story_id", "none") == "none"
+    assert article.get("description", "") == ""
+    assert article.get("image") is None
+    assert article.get("title", "") == "Title"
+    assert article.get("missing", 1) == 1
+
+    batch.set_story_id(row, 7)
+    assert article.get("story_id", "none") == 7
+
+
+def test_content_prefix_decodes_whole_characters():
+    batch = ArticleBatch()
+    row = batch.append("Title", "u", "Wire", None, "héllo wörld " * 100, "")
+    assert batch.content(row, 8) == "héllo wö"
+    assert batch.content(row) == "héllo wörld " * 100
+    assert batch.contents([row, row]) == [batch.content(row)] * 2
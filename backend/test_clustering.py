@@ -0,0 +1,49 @@
+import sys
+import os
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.app.core.clustering import NewsClustertizer
+
+TOPICS = [
+    "central bank raises interest rates inflation",
+    "storm floods coastal towns evacuation",
+    "election results parliament coalition talks",
+    "championship final striker scores winner",
+    "vaccine trial results regulators approval",
+    "wildfire spreads forest firefighters wind",
+]
+FILLER = "report says officials monday statement local sources update latest news week".split()
+
+
+def _feed(rng, size):
+    articles = []
+    for i in range(size):
+        topic = rng.choice(TOPICS).split()
+        words = rng.sample(topic, k=rng.randint(3, len(topic))) + rng.sample(FILLER, k=rng.randint(0, 4))
+        rng.shuffle(words)
+        articles.append({"title": " ".join(words[:6]), "description": " ".join(words[6:]), "id": i})
+    return articles
+
+
+def _partition(groups):
+    return sorted(sorted(a["id"] for a in group) for group in groups)
+
+
+def test_sparse_linkage_matches_dense_agglomerative():
+    rng = random.Random(7)
+    sparse = NewsClustertizer(similarity_threshold=0.45)
+    dense = NewsClustertizer(similarity_threshold=0.45, sparse=False)
+    merged_feeds = 0
+    for _ in range(60):
+        articles = _feed(rng, rng.randint(2, 30))
+        expected = _partition(dense.group_articles(articles))
+        assert _partition(sparse.group_articles(articles)) == expected
+        merged_feeds += len(expected) < len(articles)
+    assert merged_feeds > 30  # The feeds really exercise merging
+
+
+def test_unrelated_articles_stay_apart():
+    articles = [{"title": topic, "description": "", "id": i} for i, topic in enumerate(TOPICS)]
+    assert _partition(NewsClustertizer().group_articles(articles)) == [[i] for i in range(len(TOPICS))]
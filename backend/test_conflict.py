@@ -0,0 +1,54 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.app.core.conflict import ConflictResolver
+
+
+def _fact(actor, action, obj):
+    return {"actor": actor, "action": action, "object": obj}
+
+
+LAUNCH = _fact("SpaceX", "launched", "Starship from Texas")
+LAUNCH_COPY = _fact("SpaceX", "launched", "Starship from Texas on Tuesday")
+LAUNCH_THIRD = _fact("SpaceX", "launched", "its Starship rocket from Texas")
+BUDGET = _fact("NASA", "requested", "a larger budget for 2026")
+WEATHER = _fact("Forecasters", "expect", "clear skies for the landing")
+
+
+def test_resolve_cluster_groups_agreeing_facts_across_sources():
+    table = ConflictResolver().resolve_cluster([
+        [LAUNCH, BUDGET],
+        [LAUNCH_COPY],
+        [LAUNCH_THIRD, WEATHER],
+    ])
+
+    assert len(table["agreements"]) == 1
+    agreement = table["agreements"][0]
+    assert agreement["support"] == 3
+    assert agreement["sources"] == [0, 1, 2]
+    assert agreement["facts"] == [LAUNCH, LAUNCH_COPY, LAUNCH_THIRD]  # Lead source first
+    assert agreement["fact"] == "SpaceX launched Starship from Texas"
+    assert float(agreement["score"]) >= 0.5
+
+    unique = {item["fact"]: item["source"] for item in table["unique_facts"]}
+    assert unique == {"NASA requested a larger budget for 2026": 0,
+                      "Forecasters expect clear skies for the landing": 2}
+
+
+def test_facts_from_the_same_source_never_agree():
+    table = ConflictResolver().resolve_cluster([[LAUNCH, LAUNCH_COPY], [BUDGET]])
+    assert table["agreements"] == []
+    assert [item["source"] for item in table["unique_facts"]] == [0, 0, 1]
+
+
+def test_each_source_contributes_at_most_one_fact_per_agreement():
+    table = ConflictResolver().resolve_cluster([[LAUNCH], [LAUNCH_COPY, LAUNCH_THIRD]], refine=True)
+    assert [a["support"] for a in table["agreements"]] == [2]
+    assert table["agreements"][0]["facts"][0] == LAUNCH
+    assert len(table["unique_facts"]) == 1 and table["unique_facts"][0]["source"] == 1
+
+
+def test_empty_input():
+    assert ConflictResolver().resolve_cluster([[], None]) == {"agreements": [], "unique_facts": []}
@@ -0,0 +1,90 @@
+import sys
+import os
+import asyncio
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.config import Config
+from backend.app.core.article_store import ArticleBatch
+from backend.app.services.registry import resources
+from backend.app.workflows import graph
+
+SLOW = 1.5
+LAUNCH = {"actor": "SpaceX", "action": "launched", "object": "Starship from Texas"}
+BUDGET = {"actor": "NASA", "action": "requested", "object": "a larger budget"}
+
+
+class _Extractor:
+    """Lead facts at once; outlets whose text says 'slow' answer after SLOW seconds."""
+
+    def extract_facts(self, text, target_topic=None):
+        return [LAUNCH, BUDGET]
+
+    def extract_facts_batch(self, texts, target_topic=None):
+        if any("slow" in text for text in texts):
+            time.sleep(SLOW)
+        return {idx: [LAUNCH] for idx in range(len(texts))}
+
+    async def aextract_facts(self, text, target_topic=None):
+        return self.extract_facts(text, target_topic)
+
+    async def aextract_facts_batch(self, texts, target_topic=None):
+        if any("slow" in text for text in texts):
+            await asyncio.sleep(SLOW)
+        return {idx: [LAUNCH] for idx in range(len(texts))}
+
+
+class _Compressor:
+    def generate_summary(self, title, facts):
+        return f"{title}: {len(facts)} facts"
+
+    async def agenerate_summary(self, title, facts):
+        return self.generate_summary(title, facts)
+
+
+def _state():
+    batch = ArticleBatch()
+    body = "Starship lifted off from the Texas coast on Tuesday morning. " * 5
+    rows = [
+        batch.append("Fast story", "u1", "Lead One", None, body, ""),
+        batch.append("Fast story", "u2", "Outlet Two", None, body, ""),
+        batch.append("Slow story", "u3", "Lead Three", None, body, ""),
+        batch.append("Slow story", "u4", "Outlet Four", None, "slow " + body, ""),
+    ]
+    return {"articles": batch, "clustered_feed": [rows[0], rows[2]], "clusters": [rows[:2], rows[2:]]}
+
+
+def _setup(monkeypatch):
+    monkeypatch.setattr(Config, "CONSOLIDATE_ENABLED", True)
+    monkeypatch.setattr(Config, "CONSOLIDATE_BUDGET", 0.3)
+    monkeypatch.setattr(Config, "CONTENT_REDUCER_ENABLED", False)
+    monkeypatch.setattr(Config, "EXTRACT_BATCHING", False)
+    fakes = {"extractor": _Extractor(), "compressor": _Compressor()}
+    real_get = resources.get
+    monkeypatch.setattr(resources, "get", lambda name: fakes.get(name) or real_get(name))
+
+
+def _check(feed, elapsed):
+    fast, slow = feed
+    # The fast story merged its outlet: the corroborated fact comes first
+    assert fast["sources_checked"] == ["Lead One", "Outlet Two"]
+    assert fast["facts"][0]["support"] == 2
+    # The slow outlet missed the budget: lead facts only, and nobody waited for it
+    assert slow["sources_checked"] == ["Lead Three"]
+    assert slow["facts"] == [LAUNCH, BUDGET]
+    assert elapsed < SLOW
+
+
+def test_consolidation_deadline_sync(monkeypatch):
+    _setup(monkeypatch)
+    started = time.monotonic()
+    feed = graph.node_process_feed(_state())["feed_items"]
+    _check(feed, time.monotonic() - started)
+
+
+def test_consolidation_deadline_async(monkeypatch):
+    _setup(monkeypatch)
+    started = time.monotonic()
+    feed = asyncio.run(graph.anode_process_feed(_state()))["feed_items"]
+    _check(feed, time.monotonic() - started)
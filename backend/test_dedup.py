@@ -0,0 +1,113 @@
+import sys
+import os
+import json
+import shutil
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.config import Config
+from backend.benchmarks.standins import StandInServer, DEFAULT_CORPUS
+from backend.app.core.dedup import MinHashIndex, NearDuplicateFilter, shingles, headline_text
+from backend.app.services.key_manager import news_keys
+from backend.app.services.registry import resources
+from backend.app.workflows import graph
+
+STORM = ("Storm knocks out power to thousands along the coast",
+         "Utility crews worked overnight after high winds downed lines across three counties.")
+MARKETS = ("Markets rally as tech shares rebound",
+           "Stocks closed higher on Thursday, led by a rebound in large technology companies.")
+
+
+def _article(title, description, source, url):
+    return {"title": f"{title} - {source}", "description": description, "url": url,
+            "source": {"id": None, "name": source}, "urlToImage": None, "content": description}
+
+
+def test_prefilter_sets_aside_syndicated_copies():
+    deduper = NearDuplicateFilter()
+    first = _article(*STORM, "Wire One", "https://one.example/storm")
+    copy = _article(*STORM, "Wire Two", "https://two.example/storm")
+    other = _article(*MARKETS, "Wire One", "https://one.example/markets")
+
+    kept, scrape_urls, copies = deduper.prefilter([first, copy, other])
+    assert kept == [first, other]
+    assert scrape_urls == [first["url"], other["url"]]
+    assert copies == [[copy], []]
+
+    # The first page was a paywall stub: only that story moves on to its copy
+    retry = deduper.next_copies(kept, scrape_urls, copies, ["Subscribe to read.", "x" * 400])
+    assert retry == [0]
+    assert kept[0] is copy and scrape_urls[0] == copy["url"]
+    assert deduper.next_copies(kept, scrape_urls, copies, ["still short", "x" * 400]) == []
+
+
+def test_remember_indexes_a_headline_once_under_concurrency():
+    deduper = NearDuplicateFilter()
+    article = _article(*STORM, "Wire One", "https://one.example/storm")
+    start = threading.Barrier(8)
+
+    def remember():
+        start.wait()
+        deduper.remember([article], [article["url"]], ["x" * 400])
+
+    threads = [threading.Thread(target=remember) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(deduper.headlines) == 1
+
+
+def test_add_if_absent():
+    index = MinHashIndex(threshold=0.8)
+    signature = index.signature(shingles(headline_text({"title": STORM[0], "description": STORM[1]}), 2))
+    assert index.add_if_absent(signature, "first") is True
+    assert index.add_if_absent(signature, "second") is False
+    assert index.query(signature)[0] == "first"
+
+
+def _corpus(tmp_path):
+    corpus = tmp_path / "corpus"
+    shutil.copytree(DEFAULT_CORPUS, corpus)
+    (corpus / "pages" / "paywall.html").write_text(
+        "<html><body><p>Subscribe to keep reading.</p></body></html>", encoding="utf-8")
+    articles = [
+        _article(*STORM, "Wire One", "{BASE}/pages/paywall.html?id=storm-1"),
+        _article(*STORM, "Wire Two", "{BASE}/pages/wire_story_article.html?id=storm-2"),
+        _article(*MARKETS, "Wire One", "{BASE}/pages/long_read_multi_chunk.html?id=markets-1"),
+    ]
+    (corpus / "newsapi" / "top-headlines.json").write_text(
+        json.dumps({"status": "ok", "totalResults": len(articles), "articles": articles}), encoding="utf-8")
+    return str(corpus)
+
+
+def test_ingest_falls_back_to_a_copy_against_standin(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "DEDUP_ENABLED", True)
+    monkeypatch.setattr(news_keys, "keys", ["dedup-test-key"])
+    monkeypatch.setattr(news_keys, "current_index", 0)
+    deduper = NearDuplicateFilter()
+    real_get = resources.get
+    monkeypatch.setattr(resources, "get", lambda name: deduper if name == "deduper" else real_get(name))
+    state = {"query": "", "category": "general", "page": 1, "mode": "feed"}
+
+    with StandInServer(corpus=_corpus(tmp_path)) as standins:
+        monkeypatch.setattr(Config, "NEWS_API_BASE_URL", f"{standins.base_url}/v2")
+        result = graph.node_ingest(state)
+        batch = result["articles"]
+
+        # The copy was scraped only because the first outlet's page was a stub
+        assert standins.requests["page"] == 3
+        assert [batch[row]["url"] for row in batch.ids()] == [
+            f"{standins.base_url}/pages/wire_story_article.html?id=storm-2",
+            f"{standins.base_url}/pages/long_read_multi_chunk.html?id=markets-1",
+        ]
+        assert batch[0].content_length() >= 150
+        assert deduper.stats()["dropped_headlines"] == 1
+        assert deduper.stats()["fallbacks"] == 1
+
+        # A later request for the same feed starts from the copy that scraped cleanly
+        _, scrape_urls, _ = deduper.prefilter(json.loads(
+            standins.newsapi_payload("top-headlines"))["articles"])
+        assert scrape_urls[0] == f"{standins.base_url}/pages/wire_story_article.html?id=storm-2"
+        assert deduper.stats()["redirected"] == 1
@@ -0,0 +1,95 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.app.core.compression import CAPACITY_SUMMARY, NO_FACTS_SUMMARY
+from backend.app.services.feed_cache import FeedCache, is_degraded
+
+GOOD = [{"title": "A", "summary": "A real summary."}]
+NO_FACTS = [{"title": "B", "summary": NO_FACTS_SUMMARY}]
+OVER_CAPACITY = [{"title": "C", "summary": CAPACITY_SUMMARY}]
+
+
+def _age(cache, key, seconds):
+    value, stored_at = cache._entries[key]
+    cache._entries[key] = (value, stored_at - seconds)
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = FeedCache(fresh_ttl=60, stale_ttl=600)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return GOOD
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while not cache._inflight:
+        time.sleep(0.01)
+    time.sleep(0.05)  # Let the followers join the flight
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(status for _, status in results) == ["coalesced"] * 7 + ["miss"]
+    assert all(value == GOOD for value, _ in results)
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    cache = FeedCache(fresh_ttl=60, stale_ttl=600)
+    cache.put("k", GOOD)
+    _age(cache, "k", 120)
+
+    release = threading.Event()
+    newer = [{"title": "A", "summary": "Newer summary."}]
+
+    def compute():
+        release.wait(5)
+        return newer
+
+    # Both callers get the stale feed at once; only the first starts a refresh
+    assert cache.get_or_compute("k", compute) == (GOOD, "stale")
+    assert cache.get_or_compute("k", compute) == (GOOD, "stale")
+    release.set()
+    for _ in range(200):
+        if cache.peek("k") == newer:
+            break
+        time.sleep(0.01)
+    assert cache.get_or_compute("k", compute) == (newer, "hit")
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_only_transient_placeholders_are_degraded():
+    assert not is_degraded(GOOD)
+    assert not is_degraded(NO_FACTS)  # A final answer: the article has no facts
+    assert is_degraded(OVER_CAPACITY)
+    assert is_degraded([])
+
+
+def test_degraded_feed_keeps_the_good_one_and_expires_quickly():
+    cache = FeedCache(fresh_ttl=60, stale_ttl=600, degraded_ttl=5)
+    cache.put("k", GOOD)
+    assert cache.put("k", OVER_CAPACITY) is False
+    assert cache.peek("k") == GOOD
+
+    # With nothing good to keep it is stored, but only fresh for degraded_ttl
+    assert cache.put("other", OVER_CAPACITY) is True
+    assert cache.peek("other") == OVER_CAPACITY
+    _age(cache, "other", 6)
+    assert cache.peek("other") is None
+    assert cache.peek("other", allow_stale=True) == OVER_CAPACITY
+
+    # Facts-less stories are cached like any other feed
+    assert cache.put("quiet", NO_FACTS) is True
+    _age(cache, "quiet", 30)
+    assert cache.peek("quiet") == NO_FACTS
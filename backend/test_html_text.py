@@ -0,0 +1,31 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.app.core.html_text import html_to_text
+
+PAGES = os.path.join(os.path.dirname(__file__), "benchmarks", "corpus", "pages")
+
+
+def test_words_survive_chunk_boundaries():
+    html = "<html><body><p>hello world, caf&eacute; &amp; bar</p><p>second<br>line</p></body></html>"
+    whole = html_to_text(html, prefer_main=False)
+    assert whole == "hello world, café & bar second line"
+    for chunk_size in (3, 7, 20):
+        assert html_to_text(html, prefer_main=False, chunk_size=chunk_size) == whole
+
+
+def test_multi_chunk_page_matches_single_feed():
+    with open(os.path.join(PAGES, "long_read_multi_chunk.html"), encoding="utf-8") as fh:
+        html = fh.read()
+    assert len(html) > 32768
+    single = len(html) + 1
+    for prefer_main in (False, True):
+        assert html_to_text(html, prefer_main=prefer_main) == html_to_text(html, prefer_main=prefer_main, chunk_size=single)
+
+
+if __name__ == "__main__":
+    test_words_survive_chunk_boundaries()
+    test_multi_chunk_page_matches_single_feed()
+    print("✅ HTML text checks passed")
@@ -0,0 +1,134 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from backend.config import Config
+from backend.app.services.jobs import JobManager, JobQueueFull
+
+
+def _manager(monkeypatch, tmp_path, **kwargs):
+    monkeypatch.setattr(Config, "DATA_DIR", str(tmp_path))
+    return JobManager(**kwargs)
+
+
+def _wait(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+def test_same_key_shares_one_run(monkeypatch, tmp_path):
+    manager = _manager(monkeypatch, tmp_path, max_workers=2)
+    release = threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        release.wait(5)
+        return {"answer": 42}
+
+    first, coalesced = manager.submit(("analyze", "mars"), work)
+    assert not coalesced
+    second, coalesced = manager.submit(("analyze", "mars"), work)
+    assert coalesced and second is first
+    assert manager.get(first.job_id)["subscribers"] == 2
+
+    release.set()
+    assert _wait(manager, first.job_id)["status"] == "done"
+    assert manager.result(first.job_id) == {"answer": 42}
+    assert len(runs) == 1
+
+    # Once finished, the same key starts a fresh run
+    third, coalesced = manager.submit(("analyze", "mars"), work)
+    assert not coalesced and third.job_id != first.job_id
+    _wait(manager, third.job_id)
+
+
+def test_queue_full_and_failures(monkeypatch, tmp_path):
+    manager = _manager(monkeypatch, tmp_path, max_workers=1, max_pending=1)
+    release = threading.Event()
+    busy, _ = manager.submit("busy", lambda: release.wait(5))
+    with pytest.raises(JobQueueFull):
+        manager.submit("other", lambda: None)
+    release.set()
+    _wait(manager, busy.job_id)
+
+    def boom():
+        raise ValueError("boom")
+
+    failed, _ = manager.submit("boom", boom)
+    job = _wait(manager, failed.job_id)
+    assert job["status"] == "failed" and job["error"] == "boom"
+    assert manager.result(failed.job_id) is None
+    assert manager.stats()["jobs"] == {"done": 1, "failed": 1}
+
+
+def test_results_outlive_the_in_memory_job(monkeypatch, tmp_path):
+    manager = _manager(monkeypatch, tmp_path, max_workers=1)
+    job, _ = manager.submit("k", lambda: {"feed": []})
+    _wait(manager, job.job_id)
+
+    # A fresh manager (new worker process) still finds the stored result
+    other = JobManager(max_workers=1)
+    assert other.get(job.job_id)["status"] == "done"
+    assert other.result(job.job_id) == {"feed": []}
+
+
+class _Agent:
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def invoke(self, inputs):
+        self.calls.append(inputs["query"])
+        self.release.wait(5)
+        return {"feed_items": [{"title": inputs["query"]}]}
+
+
+def test_analyze_jobs_api(monkeypatch, tmp_path):
+    from backend.main import create_app
+    # main.py registers the blueprint through the `app.` package path
+    from app.api import routes
+
+    agent = _Agent()
+    manager = _manager(monkeypatch, tmp_path, max_workers=1, max_pending=1)
+    monkeypatch.setattr(routes, "job_manager", manager)
+    monkeypatch.setattr(routes, "sigma_agent", agent)
+    client = create_app().test_client()
+
+    resp = client.post("/api/analyze", json={"topic": "Mars", "async": True})
+    assert resp.status_code == 202
+    body = resp.get_json()
+    job_id = body["job_id"]
+    assert not body["coalesced"]
+    assert body["status_url"] == f"/api/jobs/{job_id}"
+    assert body["result_url"] == f"/api/jobs/{job_id}/result"
+
+    # Same topic (any case) while running -> same job; a new topic finds the queue full
+    again = client.post("/api/analyze?async=1", json={"topic": " mars "}).get_json()
+    assert again["job_id"] == job_id and again["coalesced"]
+    full = client.post("/api/analyze", json={"topic": "Venus", "async": True})
+    assert full.status_code == 503 and full.get_json()["code"] == "QUEUE_FULL"
+
+    pending = client.get(body["result_url"])
+    assert pending.status_code == 202 and pending.get_json()["status"] in ("queued", "running")
+
+    agent.release.set()
+    _wait(manager, job_id)
+    assert client.get(body["status_url"]).get_json()["status"] == "done"
+    result = client.get(body["result_url"])
+    assert result.status_code == 200
+    assert result.get_json() == {"feed": [{"title": "Mars"}], "status": "success"}
+    assert agent.calls == ["Mars"]
+
+    assert client.get("/api/jobs/nope").status_code == 404
+    assert client.get("/api/jobs/nope/result").status_code == 404
@@ -0,0 +1,68 @@
+import sys
+import os
+import asyncio
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.app.services.key_manager import GroqKeyManager
+
+
+def _manager(*keys):
+    manager = GroqKeyManager()
+    manager.keys = list(keys)
+    manager._states = {}
+    manager.current_index = 0
+    return manager
+
+
+def _headers(requests_left, tokens_left, limit_requests=100, limit_tokens=10000):
+    return {
+        "x-ratelimit-limit-requests": str(limit_requests),
+        "x-ratelimit-remaining-requests": str(requests_left),
+        "x-ratelimit-reset-requests": "60s",
+        "x-ratelimit-limit-tokens": str(limit_tokens),
+        "x-ratelimit-remaining-tokens": str(tokens_left),
+        "x-ratelimit-reset-tokens": "60s",
+    }
+
+
+def test_picks_the_key_with_most_headroom():
+    manager = _manager("key-a", "key-b")
+    manager.record_headers("key-a", _headers(10, 9000))
+    manager.record_headers("key-b", _headers(80, 9000))
+    assert manager.acquire(tokens=100, timeout=0) == "key-b"
+    assert 0.75 < manager.headroom() <= 0.8
+
+    # A request larger than key-b's token budget goes to a key that can take it
+    manager.record_headers("key-b", _headers(80, 50))
+    assert manager.acquire(tokens=500, timeout=0) == "key-a"
+
+
+def test_rate_limited_key_is_parked_until_reset():
+    manager = _manager("key-a", "key-b")
+    manager.report_rate_limited("key-a", {"retry-after": "30"})
+    assert [manager.acquire(timeout=0) for _ in range(3)] == ["key-b"] * 3
+
+    manager.report_rate_limited("key-b", {"retry-after": "20"})
+    assert manager.acquire(timeout=0) is None
+    assert manager.headroom() == 0.0
+    assert 19 < manager.retry_after() <= 20
+
+
+def test_waiters_get_a_key_once_the_park_ends():
+    manager = _manager("key-a")
+    manager.report_rate_limited("key-a", {"retry-after": "0.2"})
+    started = time.monotonic()
+    assert manager.acquire(timeout=2) == "key-a"
+    assert 0.15 < time.monotonic() - started < 1.0
+
+    manager.report_rate_limited("key-a", {"retry-after": "0.2"})
+    started = time.monotonic()
+    assert asyncio.run(manager.aacquire(timeout=2)) == "key-a"
+    assert 0.15 < time.monotonic() - started < 1.0
+
+    # Past the wait budget the caller gets None (-> GroqCapacityError)
+    manager.report_rate_limited("key-a", {"retry-after": "5"})
+    assert manager.acquire(timeout=0.1) is None
+    assert asyncio.run(manager.aacquire(timeout=0.1)) is None
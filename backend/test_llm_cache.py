@@ -0,0 +1,34 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.config import Config
+from backend.app.services.llm_cache import LLMCache
+
+
+def _cache(monkeypatch, tmp_path, ttl=60):
+    monkeypatch.setattr(Config, "DATA_DIR", str(tmp_path))
+    return LLMCache(capacity=8, ttl=ttl, enabled=True)
+
+
+def test_memory_tier_expires_with_ttl(monkeypatch, tmp_path):
+    cache = _cache(monkeypatch, tmp_path)
+    cache.put("key", ["fact"])
+    assert cache.get("key") == ["fact"]
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("key") is None  # Neither tier serves it past the TTL
+
+
+def test_short_ttl_entries_stay_in_memory(monkeypatch, tmp_path):
+    cache = _cache(monkeypatch, tmp_path)
+    cache.put("empty", [], ttl=5)
+    assert cache.get("empty") == []
+    assert cache._store.get("empty") is None
+
+    later = time.time() + 6
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("empty") is None
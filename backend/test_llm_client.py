@@ -0,0 +1,46 @@
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.benchmarks.standins import StandInServer, StandInConfig
+from backend.app.services import llm_client
+from backend.app.services.key_manager import groq_keys, GroqSlots
+from backend.app.services.llm_client import chat_completion, achat_completion
+
+MESSAGES = [{"role": "system", "content": "Return the key facts as JSON."},
+            {"role": "user", "content": "The council approved the budget on Tuesday."}]
+
+
+def test_sync_and_async_completions_against_standin(monkeypatch):
+    with StandInServer() as standins:
+        # Clients are built lazily per key and read GROQ_BASE_URL when they are created
+        monkeypatch.setenv("GROQ_BASE_URL", standins.base_url)
+        monkeypatch.setattr(groq_keys, "keys", ["smoke-test-groq-key"])
+
+        completion = chat_completion(MESSAGES, model="llama-3.1-8b-instant")
+        assert completion.choices[0].message.content
+
+        completion = asyncio.run(achat_completion(MESSAGES, model="llama-3.1-8b-instant"))
+        assert completion.choices[0].message.content
+        assert standins.requests["llm"] == 2
+
+
+def test_threads_and_coroutines_share_groq_slots(monkeypatch):
+    slots = GroqSlots(2)
+    monkeypatch.setattr(llm_client, "groq_slots", slots)
+    with StandInServer(config=StandInConfig(llm_latency=50)) as standins:
+        monkeypatch.setenv("GROQ_BASE_URL", standins.base_url)
+        # A key of its own so the clients are built against this stand-in
+        monkeypatch.setattr(groq_keys, "keys", ["slots-test-groq-key"])
+
+        async def main():
+            threaded = [asyncio.to_thread(chat_completion, MESSAGES, "llama-3.1-8b-instant") for _ in range(2)]
+            awaited = [achat_completion(MESSAGES, model="llama-3.1-8b-instant") for _ in range(6)]
+            return await asyncio.gather(*threaded, *awaited)
+
+        completions = asyncio.run(main())
+        assert all(c.choices[0].message.content for c in completions)
+        assert standins.requests["llm"] == 8
+        assert slots._free == 2 and not slots._async_waiters
@@ -0,0 +1,68 @@
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.app.core import story_index
+from backend.app.core.story_index import StoryIndex
+
+ARTICLE = {"title": "Central bank raises interest rates",
+           "description": "The central bank raised interest rates by half a point to fight inflation."}
+
+
+def _index(directory):
+    return StoryIndex(ttl=3600, filename=os.path.join(directory, "story_index.pkl"))
+
+
+def check_repeated_updates(index):
+    # Enough updates to leave tombstones behind and then force a compaction
+    first = index.assign([ARTICLE])[0]
+    for _ in range(300):
+        assert index.assign([ARTICLE]) == [first]
+    assert len(index.stories) == 1
+    assert index.stories[first].count == 301
+
+
+def check_growth_and_expiry(index):
+    # Unrelated articles (no shared words) past the fallback matrix's initial capacity
+    articles = [{"title": f"w{i}a w{i}b w{i}c", "description": f"w{i}d w{i}e"} for i in range(150)]
+    ids = index.assign(articles)
+    assert len(set(ids)) == len(articles)
+    assert index.assign(articles) == ids
+
+    # Age out half of the stories; the rest keep matching their own IDs
+    expired = set(ids[::2])
+    for story_id in expired:
+        index.stories[story_id].updated_at = 0
+    index._last_expiry = 0
+    kept = [(article, sid) for article, sid in zip(articles, ids) if sid not in expired]
+    assert index.assign([a for a, _ in kept]) == [sid for _, sid in kept]
+    assert not expired & set(index.stories)
+
+
+def test_repeated_updates_keep_story_id():
+    with tempfile.TemporaryDirectory() as directory:
+        index = _index(directory)
+        check_repeated_updates(index)
+        if index._index is not None:
+            assert index._index.ntotal <= 2 * len(index.stories) + 256
+        check_growth_and_expiry(_index(directory))
+
+
+def test_repeated_updates_keep_story_id_numpy():
+    saved, story_index.faiss = story_index.faiss, None
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            index = _index(directory)
+            check_repeated_updates(index)
+            assert index._size == 1
+            check_growth_and_expiry(_index(directory))
+    finally:
+        story_index.faiss = saved
+
+
+if __name__ == "__main__":
+    test_repeated_updates_keep_story_id()
+    test_repeated_updates_keep_story_id_numpy()
+    print("✅ Story index checks passed")